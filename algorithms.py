@@ -1,8 +1,37 @@
 from collections import deque
-from utils import print_matrix, annotate_matrix, bold
+from heapq import heappush, heappop
+from graph import SparseGraphic
+from tracing import make_tracer, display_bfs_trace, display_augmenting_path, display_residual_graph, path_from_parent, NULL_TRACER
+from metrics import NULL_METRICS
+from utils import is_array, np
 import sys
 
-def bfs(residual, source, sink, parent):
+def solve_on_lists(solver, graph, *args, **kwargs):
+    """
+        Runs a solver that walks the matrices one entry at a time on a graph of the numpy backend,
+        through list copies of its matrices: reading a NumPy scalar is several times slower than
+        reading a list item. The flow and residual arrays are updated in place afterwards, so the
+        graph keeps its backend.
+
+        Args:
+            solver: The solver to run, called as solver(graph, *args, **kwargs).
+            graph (Graphic): A graph whose matrices are NumPy arrays.
+
+        Returns:
+            The result of the solver.
+    """
+    arrays = graph.capacity, graph.cost, graph.residual, graph.flow
+    graph.capacity, graph.residual, graph.flow = graph.capacity.tolist(), graph.residual.tolist(), graph.flow.tolist()
+    graph.cost = graph.cost.tolist() if graph.has_costs() else None
+    try:
+        return solver(graph, *args, **kwargs)
+    finally:
+        residual, flow = graph.residual, graph.flow
+        graph.capacity, graph.cost, graph.residual, graph.flow = arrays
+        graph.residual[:] = residual
+        graph.flow[:] = flow
+
+def bfs(residual, source, sink, parent, metrics=NULL_METRICS):
     """
         Breadth-First Search to find an augmenting path from source to sink in the residual graph.
 
@@ -11,10 +40,14 @@ def bfs(residual, source, sink, parent):
             source (int): The source node.
             sink (int): The sink node.
             parent (list[int]): Array to store the path.
+            metrics: Metrics counting the arcs scanned (see metrics.NullMetrics).
 
         Returns:
             bool: True if a path from source to sink is found, False otherwise.
     """
+    if is_array(residual):
+        return bfs_numpy(residual, source, sink, parent, metrics)
+
     n = len(residual)
     visited = [False] * n  # List to follow the visited vertices
     queue = deque([source])  # Waiting queue initialized with the source vertex
@@ -22,6 +55,8 @@ def bfs(residual, source, sink, parent):
 
     while queue:
         u = queue.popleft()
+        if metrics.enabled:
+            metrics.count("arcs_scanned", n)
         for v in range(n):  # Go through all adjacent vertices
             if not visited[v] and residual[u][v] > 0:
                 parent[v] = u
@@ -31,54 +66,269 @@ def bfs(residual, source, sink, parent):
                     return True
     return False
 
-def ford_fulkerson(graph, output=sys.stdout):
+def bfs_numpy(residual, source, sink, parent, metrics=NULL_METRICS):
+    """
+        Level-synchronous Breadth-First Search on a NumPy residual matrix: the whole frontier is
+        expanded at once with boolean masks. The frontier is kept in the order bfs would dequeue it
+        (by the position of the first frontier vertex reaching each new vertex, then by vertex), and
+        the search stops at the sink like bfs, so parent is filled exactly as bfs fills it.
+
+        Args:
+            residual (numpy.ndarray): The residual capacity graph.
+            source (int): The source node.
+            sink (int): The sink node.
+            parent (list[int]): Array to store the path.
+
+        Returns:
+            bool: True if a path from source to sink is found, False otherwise.
+    """
+    n = len(residual)
+    visited = np.zeros(n, dtype=bool)
+    visited[source] = True
+    frontier = np.array([source])
+    open_arcs = residual > 0
+
+    while len(frontier) > 0:
+        reachable = open_arcs[frontier]  # One row per frontier vertex
+        new = np.flatnonzero(reachable.any(axis=0) & ~visited)
+        first = reachable[:, new].argmax(axis=0)  # Position of the first frontier vertex reaching each one
+        order = np.lexsort((new, first))
+        new, first = new[order], first[order]
+        found = sink in new
+        if found:  # bfs stops as soon as it reaches the sink
+            end = int(np.flatnonzero(new == sink)[0]) + 1
+            new, first = new[:end], first[:end]
+        if metrics.enabled:
+            metrics.count("arcs_scanned", (int(first[-1]) + 1 if found else len(frontier)) * n)
+        for v, u in zip(new.tolist(), frontier[first].tolist()):
+            parent[v] = u
+        if found:
+            return True
+        visited[new] = True
+        frontier = new
+    return False
+
+def build_neighbours(capacity):
+    """
+        Builds the neighbour index of a capacity matrix: for each vertex u, the sorted list of
+        vertices v such that u → v or v → u is an arc. Residual capacity can only ever appear
+        between such pairs, so searches never need to look at the other vertices.
+
+        Args:
+            capacity (list[list[int]]): The capacity matrix.
+
+        Returns:
+            list[list[int]]: The neighbours of each vertex, in increasing order.
+    """
+    if is_array(capacity):
+        linked = (capacity > 0) | (capacity.T > 0)
+        return [np.flatnonzero(row).tolist() for row in linked]
+
+    n = len(capacity)
+    neighbours = [[] for _ in range(n)]
+    for u in range(n):
+        row = capacity[u]
+        for v in range(n):
+            if row[v] > 0 or capacity[v][u] > 0:
+                neighbours[u].append(v)
+    return neighbours
+
+def bfs_adjacent(residual, source, sink, parent, neighbours, visited, metrics=NULL_METRICS):
+    """
+        Breadth-First Search restricted to the neighbour index, so that each dequeued vertex
+        costs O(deg) instead of O(n). Neighbours are scanned in increasing order, which yields
+        exactly the same BFS tree as bfs.
+
+        Args:
+            residual (list[list[int]]): The residual capacity graph.
+            source (int): The source node.
+            sink (int): The sink node.
+            parent (list[int]): Array to store the path.
+            neighbours (list[list[int]]): The index built by build_neighbours.
+            visited (list[bool]): All-False buffer of size n, reused across calls and
+                cleared again before returning.
+            metrics: Metrics counting the arcs scanned (see metrics.NullMetrics).
+
+        Returns:
+            bool: True if a path from source to sink is found, False otherwise.
+    """
+    order = [source]  # Vertices in the order they were reached, also used as the waiting queue
+    visited[source] = True
+    found = False
+    i = 0
+
+    while i < len(order) and not found:
+        u = order[i]
+        i += 1
+        row = residual[u]
+        for v in neighbours[u]:
+            if not visited[v] and row[v] > 0:
+                parent[v] = u
+                visited[v] = True
+                order.append(v)
+                if v == sink:
+                    found = True
+                    break
+
+    # Only the vertices that were reached have to be cleared for the next search
+    for v in order:
+        visited[v] = False
+    if metrics.enabled:
+        metrics.count("arcs_scanned", sum(len(neighbours[u]) for u in order[:i]))  # Arcs of the dequeued vertices
+    return found
+
+def ford_fulkerson(graph, output=sys.stdout, verbose_mode=True, edmonds_karp=True, tracer=None, metrics=None):
     """
         Implements the Ford-Fulkerson method using BFS to compute the maximum flow.
 
         Args:
             graph: A graph object with residual and flow matrices.
+            verbose_mode (bool): Whether each iteration is traced to output.
+            tracer: Tracer receiving the events of the solve (see tracing.NullTracer). Overrides
+                output and verbose_mode when given.
+            edmonds_karp (bool): Whether the BFS only walks the neighbour index (O(VE²) overall)
+                instead of every vertex. Both modes find the same paths. Graphs using the numpy
+                backend always use the vectorized bfs instead.
+            metrics: Metrics filled with the operation counts and phase times (see metrics.NullMetrics).
 
         Returns:
-            int: The value of the maximum flow from source to sink.
+            int: The value of the maximum flow from source to sink. Augmenting paths are searched
+                from the flow already in the graph, if any (see Graphic.set_capacity), and only
+                the flow they add is returned.
     """
+    tracer = make_tracer(tracer, output, verbose_mode)
+    metrics = metrics or NULL_METRICS
+    if isinstance(graph, SparseGraphic):
+        return ford_fulkerson_sparse(graph, tracer=tracer, metrics=metrics)
+
     source = 0
     sink = graph.n - 1
     parent = [-1] * graph.n
     max_flow = 0
     iteration = 1
 
+    if edmonds_karp and not is_array(graph.residual):
+        neighbours = build_neighbours(graph.capacity)
+        visited = [False] * graph.n
+        search = lambda: bfs_adjacent(graph.residual, source, sink, parent, neighbours, visited, metrics)
+    else:
+        search = lambda: bfs(graph.residual, source, sink, parent, metrics)
+    search = metrics.timed("bfs", search)
+
+    tracer.start("FF", graph.n, graph.residual_arcs)
+
     # Looping while there is a path from source to sink in the residual graph
-    while bfs(graph.residual, source, sink, parent):
-        if output != sys.stdout:
-            print(f"\nITERATION {iteration}", file=output)
-        else:
-            print(bold(f"\nITERATION {iteration}"), file=output)
-        display_bfs_trace(parent, source, sink, graph.n, output)  # Showing BFS tree
+    while search():
+        tracer.iteration(iteration)
+        tracer.bfs_tree(parent)  # Showing BFS tree
         path_flow = get_path_flow(graph.residual, parent, source, sink)  # Finding the bottleneck
-        display_augmenting_path(parent, source, sink, graph.n, path_flow, output)  # Showing the augmenting path and its flow
+        if tracer.enabled:
+            tracer.augmenting_path(path_from_parent(parent, source, sink), path_flow)  # Showing the augmenting path and its flow
         update_residual_and_flow(graph, parent, source, sink, path_flow)  # Updating residual and flow graphs with new flows
-        display_residual_graph(graph.residual, output)  # Displaying updated residual graph
+        tracer.residual(lambda: graph.residual)  # Displaying updated residual graph
         max_flow += path_flow
         iteration += 1
+        metrics.count("augmentations")
 
     return max_flow
 
-def display_bfs_trace(parent, source, sink, n, output=sys.stdout):
+def bfs_sparse(graph, source, sink, parent, parent_arc, visited, metrics=NULL_METRICS, minimum=1):
     """
-        Displays the BFS tree from the last successful augmenting path search.
+        Breadth-First Search over the arcs of a SparseGraphic, only following arcs with
+        a residual capacity of at least minimum (1, i.e. any positive one, by default).
+
+        Args:
+            graph (SparseGraphic): The graph to search.
+            source (int): The source node.
+            sink (int): The sink node.
+            parent (list[int]): Array to store the predecessor vertex of each vertex.
+            parent_arc (list[int]): Array to store the arc used to reach each vertex.
+            visited (list[bool]): All-False buffer of size n, reused across calls and
+                cleared again before returning.
+            metrics: Metrics counting the arcs scanned (see metrics.NullMetrics).
+            minimum (int): Smallest residual capacity of the arcs followed.
+
+        Returns:
+            bool: True if a path from source to sink is found, False otherwise.
     """
-    if output != sys.stdout:
-        print(f"\nBFS trace:", file=output)
-    else:
-        print(bold(f"\nBFS trace:"), file=output)
-    visited_nodes = []
-    for i in range(n):
-        if parent[i] != -1 and i != source:
-            # Convert indices to labels
-            node = 't' if i == sink else chr(i + 96)
-            pred = 's' if parent[i] == source else ('t' if parent[i] == sink else chr(parent[i] + 96))
-            visited_nodes.append(f"Π({node}) = {pred}")
-    print(" → ".join(visited_nodes), file=output)
+    head = graph.head
+    residual = graph.residual
+    adjacency = graph.adjacency
+    order = [source]  # Vertices in the order they were reached, also used as the waiting queue
+    visited[source] = True
+    found = False
+    i = 0
+
+    while i < len(order) and not found:
+        u = order[i]
+        i += 1
+        for e in adjacency[u]:  # Only the arcs leaving u are scanned
+            v = head[e]
+            if not visited[v] and residual[e] >= minimum:
+                parent[v] = u
+                parent_arc[v] = e
+                visited[v] = True
+                order.append(v)
+                if v == sink:
+                    found = True
+                    break
+
+    for v in order:
+        visited[v] = False
+    if metrics.enabled:
+        metrics.count("arcs_scanned", sum(len(adjacency[u]) for u in order[:i]))  # Arcs of the dequeued vertices
+    return found
+
+def ford_fulkerson_sparse(graph, output=sys.stdout, verbose_mode=True, tracer=None, metrics=None):
+    """
+        Ford-Fulkerson method on a SparseGraphic, with the same traces as ford_fulkerson.
+
+        Args:
+            graph (SparseGraphic): A sparse graph.
+
+        Returns:
+            int: The value of the maximum flow from source to sink.
+    """
+    source = 0
+    sink = graph.n - 1
+    parent = [-1] * graph.n
+    parent_arc = [-1] * graph.n
+    visited = [False] * graph.n
+    max_flow = 0
+    iteration = 1
+    tracer = make_tracer(tracer, output, verbose_mode)
+    metrics = metrics or NULL_METRICS
+    search = metrics.timed("bfs", bfs_sparse)
+    tracer.start("FF", graph.n, graph.residual_arcs)
+
+    while search(graph, source, sink, parent, parent_arc, visited, metrics):
+        tracer.iteration(iteration)
+        tracer.bfs_tree(parent)
+
+        # Finding the bottleneck
+        path_flow = float('inf')
+        v = sink
+        while v != source:
+            path_flow = min(path_flow, graph.residual[parent_arc[v]])
+            v = parent[v]
+
+        if tracer.enabled:
+            tracer.augmenting_path(path_from_parent(parent, source, sink), path_flow)
+
+        # Updating the residual capacities of the arcs of the path and of their reverse arcs
+        v = sink
+        while v != source:
+            e = parent_arc[v]
+            graph.residual[e] -= path_flow
+            graph.residual[e ^ 1] += path_flow
+            v = parent[v]
+
+        tracer.residual(graph.residual_matrix)
+        max_flow += path_flow
+        iteration += 1
+        metrics.count("augmentations")
+
+    return max_flow
 
 def get_path_flow(residual, parent, source, sink):
     """
@@ -95,24 +345,6 @@ def get_path_flow(residual, parent, source, sink):
         v = u
     return flow
 
-def display_augmenting_path(parent, source, sink, n, path_flow, output=sys.stdout):
-    """
-        Displays the path found during BFS and the corresponding flow.
-    """
-    path = []
-    v = sink
-    while v != source:
-        path.append(v)
-        v = parent[v]
-    path.append(source)
-    path = path[::-1]  # Reverse to get path from source to sink
-    # Convert node indices to readable labels
-    labels = ['s' if i == 0 else 't' if i == n - 1 else chr(i + 96) for i in path]
-    if output != sys.stdout:
-        print(f"Improving chain : {'[' + ' → '.join(labels) + ']'} with a flow {path_flow}.", file=output)
-    else:
-        print(f"Improving chain : {bold('[' + ' → '.join(labels) + ']')} with a flow {bold(path_flow)}.", file=output)
-
 def update_residual_and_flow(graph, parent, source, sink, path_flow):
     """
         Updates the residual and flow matrices along the augmenting path.
@@ -126,28 +358,27 @@ def update_residual_and_flow(graph, parent, source, sink, path_flow):
         graph.flow[v][u] -= path_flow  # Substracting flow in reverse direction
         v = u
 
-def display_residual_graph(residual, output=sys.stdout):
-    """
-        Displays the current residual graph.
-    """
-    if output != sys.stdout:
-        print(f"\nRESIDUAL GRAPH", file=output)
-    else:
-        print(bold(f"\nRESIDUAL GRAPH"), file=output)
-
-    annotated = annotate_matrix(residual)
-    print_matrix(annotated, output_file=output)
-
-def push_relabel(graph, output=sys.stdout, verbose_mode=True):
+def push_relabel(graph, output=sys.stdout, verbose_mode=True, tracer=None, metrics=None):
     """
         Computes the maximum flow using the Push-Relabel algorithm.
 
         Args:
             graph: Graph object with capacity and flow matrices.
+            verbose_mode (bool): Whether pushes and relabels are traced to output.
+            tracer: Tracer receiving the events of the solve (see tracing.NullTracer). Overrides
+                output and verbose_mode when given.
+            metrics: Metrics filled with the operation counts and phase times (see metrics.NullMetrics).
 
         Returns:
             int: Maximum flow value from source to sink.
     """
+    tracer = make_tracer(tracer, output, verbose_mode)
+    metrics = metrics or NULL_METRICS
+    if isinstance(graph, SparseGraphic):
+        return push_relabel_sparse(graph, tracer=tracer, metrics=metrics)
+    if is_array(graph.residual):
+        return solve_on_lists(push_relabel, graph, tracer=tracer, metrics=metrics)
+
     n = graph.n
     source = 0
     sink = n - 1
@@ -155,6 +386,7 @@ def push_relabel(graph, output=sys.stdout, verbose_mode=True):
     height = [0] * n
     excess = [0] * n
     seen = [0] * n
+    tracer.start("PR", n, graph.residual_arcs)
     
     # Initializing the free float
     height[source] = n
@@ -162,40 +394,38 @@ def push_relabel(graph, output=sys.stdout, verbose_mode=True):
         if graph.capacity[source][v] > 0:  # If the capacity of the source at vertex v is positive
             graph.flow[source][v] = graph.capacity[source][v]
             graph.flow[v][source] = -graph.flow[source][v]
+            graph.residual[source][v] = 0
+            graph.residual[v][source] = graph.capacity[v][source] + graph.capacity[source][v]
             excess[v] = graph.capacity[source][v]
             excess[source] -= graph.capacity[source][v]
 
     # Function to push the flow from u to v
-    def char_to(vertex, n):
-        if vertex == 0 :
-            return 's'
-        elif vertex == (n-1):
-            return 't'
-        else :
-            return chr(vertex+ord('a')-1)
-
-    def push(u, v, output=sys.stdout):
+    def push(u, v):
         delta = min(excess[u], graph.capacity[u][v] - graph.flow[u][v])
+        if metrics.enabled:
+            metrics.count("pushes_saturating" if delta == graph.capacity[u][v] - graph.flow[u][v] else "pushes_non_saturating")
         graph.flow[u][v] += delta  # Updating the flow from u to v
         graph.flow[v][u] -= delta  # Updating the flow from v to u
+        graph.residual[u][v] -= delta
+        graph.residual[v][u] += delta
         excess[u] -= delta  # Reducing the excess flow at u
         excess[v] += delta  # Increasing the excess flow at v
-        if verbose_mode:
-            print(f"\nPush from {char_to(u, graph.n)} to {char_to(v, graph.n)} (excess diff = {delta}):")
+        tracer.push(u, v, delta)
 
 
 
     # Function to relabel a vertex u
-    def relabel(u, output=sys.stdout):
+    def relabel(u):
         min_height = float('Inf')
         for v in range(n):
             if graph.capacity[u][v] > graph.flow[u][v]:  # If the residual capacity is positive
                 min_height = min(min_height, height[v])  # Find the minimal height trough neighbours
         old_height = height[u]
         height[u] = min_height + 1  # Relabel u with new height
-        if verbose_mode:
-            print(f"\nRelabel node {char_to(u, graph.n)} (height {old_height} → {height[u]}):")
+        tracer.relabel(u, old_height, height[u])
 
+    push = metrics.timed("push", push)
+    relabel = metrics.timed("relabel", relabel)
 
     # Function to discharge a vertex u
     def discharge(u):
@@ -203,16 +433,18 @@ def push_relabel(graph, output=sys.stdout, verbose_mode=True):
             if seen[u] < n:
                 v = seen[u]
                 if graph.capacity[u][v] > graph.flow[u][v] and height[u] > height[v]:
-                    push(u, v, output)
+                    push(u, v)
                 else:
                     seen[u] += 1
             else:
-                relabel(u, output)  # Relabelling u if all neighbours have been iterated through
+                relabel(u)  # Relabelling u if all neighbours have been iterated through
                 seen[u] = 0
 
     active = [i for i in range(n) if i != source and i != sink]
+    has_active = metrics.timed("active_scan", lambda: any(excess[i] > 0 for i in active))
 
-    while any(excess[i] > 0 for i in active):  # Until there are vertices with exceeding flows
+    while has_active():  # Until there are vertices with exceeding flows
+        metrics.count("active_scans")
         for u in active:
             if excess[u] > 0:
                 discharge(u)
@@ -220,7 +452,465 @@ def push_relabel(graph, output=sys.stdout, verbose_mode=True):
     # Returning the maximum flow
     return sum(graph.flow[v][sink] for v in range(n))
 
-def bellman_ford(residual, cost, source, n):
+def push_relabel_sparse(graph, output=sys.stdout, verbose_mode=True, tracer=None, metrics=None):
+    """
+        Push-Relabel algorithm on a SparseGraphic. Pushes go along arcs and the current
+        neighbour pointer of each vertex walks its adjacency list instead of all n vertices.
+
+        Args:
+            graph (SparseGraphic): A sparse graph.
+
+        Returns:
+            int: Maximum flow value from source to sink.
+    """
+    n = graph.n
+    source = 0
+    sink = n - 1
+    head = graph.head
+    residual = graph.residual
+    adjacency = graph.adjacency
+
+    height = [0] * n
+    excess = [0] * n
+    seen = [0] * n
+    tracer = make_tracer(tracer, output, verbose_mode)
+    metrics = metrics or NULL_METRICS
+    tracer.start("PR", n, graph.residual_arcs)
+
+    # Initializing the preflow by saturating every arc leaving the source
+    height[source] = n
+    for e in adjacency[source]:
+        delta = residual[e]
+        if delta > 0:
+            residual[e] = 0
+            residual[e ^ 1] += delta
+            excess[head[e]] += delta
+            excess[source] -= delta
+
+    # Function to push the flow along the arc e leaving u
+    def push(u, e):
+        v = head[e]
+        delta = min(excess[u], residual[e])
+        if metrics.enabled:
+            metrics.count("pushes_saturating" if delta == residual[e] else "pushes_non_saturating")
+        residual[e] -= delta
+        residual[e ^ 1] += delta
+        excess[u] -= delta
+        excess[v] += delta
+        tracer.push(u, v, delta)
+
+    # Function to relabel a vertex u
+    def relabel(u):
+        min_height = float('Inf')
+        for e in adjacency[u]:
+            if residual[e] > 0:
+                min_height = min(min_height, height[head[e]])
+        old_height = height[u]
+        height[u] = min_height + 1
+        tracer.relabel(u, old_height, height[u])
+
+    push = metrics.timed("push", push)
+    relabel = metrics.timed("relabel", relabel)
+
+    # Function to discharge a vertex u
+    def discharge(u):
+        arcs = adjacency[u]
+        while excess[u] > 0:
+            if seen[u] < len(arcs):
+                e = arcs[seen[u]]
+                if residual[e] > 0 and height[u] > height[head[e]]:
+                    push(u, e)
+                else:
+                    seen[u] += 1
+            else:
+                relabel(u)
+                seen[u] = 0
+
+    active = [i for i in range(n) if i != source and i != sink]
+    has_active = metrics.timed("active_scan", lambda: any(excess[i] > 0 for i in active))
+
+    while has_active():
+        metrics.count("active_scans")
+        for u in active:
+            if excess[u] > 0:
+                discharge(u)
+
+    return graph.flow_value(source)
+
+def push_relabel_fifo(graph, output=sys.stdout, verbose_mode=True, global_relabel_frequency=1.0, tracer=None, metrics=None):
+    """
+        Computes the maximum flow with the FIFO Push-Relabel algorithm, in O(n³).
+
+        Active vertices wait in a FIFO queue instead of being found by rescanning every vertex,
+        relabels only look at the arcs of the vertex, and two heuristics keep the heights tight:
+            - gap: when no vertex is left at some height h < n, every vertex above h can no
+              longer reach the sink and is lifted straight to n + 1.
+            - global relabel: every n * global_relabel_frequency relabels, all heights are reset
+              to the exact residual distance to the sink with a reverse BFS from it (or to n plus
+              the distance to the source for vertices that can only send their excess back).
+
+        Dense graphs are solved on their SparseGraphic version, and the resulting flow is written
+        back into their flow and residual matrices. A flow already in the graph is kept as the
+        starting preflow, and the value returned is still that of the whole flow.
+
+        Args:
+            graph: A Graphic or a SparseGraphic.
+            verbose_mode (bool): Whether pushes, relabels and heuristics are traced to output.
+            global_relabel_frequency (float): Number of relabels between two global relabels,
+                as a fraction of n.
+            tracer: Tracer receiving the events of the solve (see tracing.NullTracer). Overrides
+                output and verbose_mode when given.
+            metrics: Metrics filled with the operation counts and phase times (see metrics.NullMetrics).
+
+        Returns:
+            int: Maximum flow value from source to sink.
+    """
+    network = graph if isinstance(graph, SparseGraphic) else SparseGraphic.from_graphic(graph)
+    n = network.n
+    source = 0
+    sink = n - 1
+    head = network.head
+    residual = network.residual
+    adjacency = network.adjacency
+
+    height = [0] * n
+    excess = [0] * n
+    current = [0] * n
+    count = [0] * (2 * n + 1)  # count[h]: number of vertices at height h
+    queue = deque()
+    in_queue = [False] * n
+    relabels_since_global = 0
+    global_relabel_threshold = max(1, int(n * global_relabel_frequency))
+    tracer = make_tracer(tracer, output, verbose_mode)
+    metrics = metrics or NULL_METRICS
+    tracer.start("PR", n, network.residual_arcs)
+
+    # Function to reset every height to the exact residual distance to the sink, or to the source
+    def global_relabel():
+        for v in range(n):
+            height[v] = 2 * n  # Vertices that reach neither terminal hold no excess
+            current[v] = 0
+        for h in range(len(count)):
+            count[h] = 0
+        reached = 0
+        for root, root_height in ((sink, 0), (source, n)):
+            height[root] = root_height
+            order = [root]
+            i = 0
+            while i < len(order):
+                v = order[i]
+                i += 1
+                for e in adjacency[v]:
+                    u = head[e]
+                    # u can reach v if the arc u → v, i.e. the reverse of e, has residual capacity
+                    if height[u] == 2 * n and residual[e ^ 1] > 0:
+                        height[u] = height[v] + 1
+                        order.append(u)
+            if root == sink:
+                reached = len(order)
+        for v in range(n):
+            count[height[v]] += 1
+        tracer.global_relabel(reached)
+
+    # Function to lift every vertex above an empty height to n + 1
+    def gap(h):
+        lifted = 0
+        for v in range(n):
+            if h < height[v] < n:
+                count[height[v]] -= 1
+                height[v] = n + 1
+                count[n + 1] += 1
+                current[v] = 0
+                lifted += 1
+        tracer.gap(h, lifted)
+
+    # Function to push the flow along the arc e leaving u
+    def push(u, e):
+        v = head[e]
+        delta = min(excess[u], residual[e])
+        if metrics.enabled:
+            metrics.count("pushes_saturating" if delta == residual[e] else "pushes_non_saturating")
+        residual[e] -= delta
+        residual[e ^ 1] += delta
+        excess[u] -= delta
+        excess[v] += delta
+        if not in_queue[v] and v != source and v != sink:
+            queue.append(v)
+            in_queue[v] = True
+        tracer.push(u, v, delta)
+
+    # Function to relabel a vertex u
+    def relabel(u):
+        nonlocal relabels_since_global
+        old_height = height[u]
+        count[old_height] -= 1
+        if count[old_height] == 0 and old_height < n:
+            gap(old_height)
+        min_height = 2 * n
+        for e in adjacency[u]:
+            if residual[e] > 0 and height[head[e]] < min_height:
+                min_height = height[head[e]]
+        height[u] = min_height + 1
+        count[height[u]] += 1
+        current[u] = 0
+        relabels_since_global += 1
+        tracer.relabel(u, old_height, height[u])
+
+    global_relabel = metrics.timed("global_relabel", global_relabel)
+    gap = metrics.timed("gap", gap)
+    push = metrics.timed("push", push)
+    relabel = metrics.timed("relabel", relabel)
+
+    # Function to discharge a vertex u
+    def discharge(u):
+        arcs = adjacency[u]
+        while excess[u] > 0:
+            if current[u] < len(arcs):
+                e = arcs[current[u]]
+                if residual[e] > 0 and height[u] == height[head[e]] + 1:
+                    push(u, e)
+                else:
+                    current[u] += 1
+            else:
+                relabel(u)
+
+    # Initializing the preflow by saturating every arc leaving the source
+    for e in adjacency[source]:
+        delta = residual[e]
+        if delta > 0:
+            v = head[e]
+            residual[e] = 0
+            residual[e ^ 1] += delta
+            excess[v] += delta
+            excess[source] -= delta
+            if not in_queue[v] and v != sink:
+                queue.append(v)
+                in_queue[v] = True
+    global_relabel()
+
+    while queue:
+        u = queue.popleft()
+        in_queue[u] = False
+        discharge(u)
+        if relabels_since_global >= global_relabel_threshold:
+            global_relabel()
+            relabels_since_global = 0
+
+    if network is not graph:
+        network.copy_flow_to(graph)
+    # excess[sink] only holds what this run brought, not the flow the graph already had
+    return network.flow_value(source)
+
+def build_levels(graph, source, sink, level, metrics=NULL_METRICS):
+    """
+        Breadth-First Search from the source computing the level (BFS distance) of every vertex
+        in the residual graph of a SparseGraphic.
+
+        Args:
+            graph (SparseGraphic): The graph to search.
+            source (int): The source node.
+            sink (int): The sink node.
+            level (list[int]): Array filled with the level of each vertex (-1 if unreachable).
+            metrics: Metrics counting the arcs scanned (see metrics.NullMetrics).
+
+        Returns:
+            bool: True if the sink is reachable, False otherwise.
+    """
+    head = graph.head
+    residual = graph.residual
+    adjacency = graph.adjacency
+    for v in range(graph.n):
+        level[v] = -1
+    level[source] = 0
+    order = [source]
+    i = 0
+
+    while i < len(order):
+        u = order[i]
+        i += 1
+        for e in adjacency[u]:
+            v = head[e]
+            if residual[e] > 0 and level[v] < 0:
+                level[v] = level[u] + 1
+                order.append(v)
+    if metrics.enabled:
+        metrics.count("arcs_scanned", sum(len(adjacency[u]) for u in order))
+    return level[sink] >= 0
+
+def find_blocking_path(graph, source, sink, level, current):
+    """
+        Depth-First Search for a source → sink path in the level graph, going through each
+        vertex's current arc. Arcs that lead nowhere are skipped for good, which is what bounds
+        a whole blocking flow to O(VE).
+
+        Args:
+            graph (SparseGraphic): The graph to search.
+            source (int): The source node.
+            sink (int): The sink node.
+            level (list[int]): Levels computed by build_levels (dead ends are set to -1).
+            current (list[int]): Index of the current arc of each vertex in its adjacency list.
+
+        Returns:
+            list[int] or None: The arcs of the path, or None if the flow is blocking.
+    """
+    head = graph.head
+    residual = graph.residual
+    adjacency = graph.adjacency
+    path = []
+    u = source
+
+    while u != sink:
+        arcs = adjacency[u]
+        while current[u] < len(arcs):
+            e = arcs[current[u]]
+            if residual[e] > 0 and level[head[e]] == level[u] + 1:
+                break
+            current[u] += 1
+
+        if current[u] < len(arcs):  # Advancing along the current arc
+            e = arcs[current[u]]
+            path.append(e)
+            u = head[e]
+        else:  # Dead end: u is removed from the level graph and we retreat
+            if u == source:
+                return None
+            level[u] = -1
+            e = path.pop()
+            u = head[e ^ 1]
+            current[u] += 1
+    return path
+
+def dinic(graph, output=sys.stdout, verbose_mode=True, tracer=None, metrics=None):
+    """
+        Computes the maximum flow with Dinic's algorithm: each phase builds the BFS level graph
+        and saturates it with a blocking flow, using current-arc pointers. There are at most
+        n phases, each costing O(VE).
+
+        Dense graphs are solved on their SparseGraphic version, and the resulting flow is written
+        back into their flow and residual matrices.
+
+        Args:
+            graph: A Graphic or a SparseGraphic.
+            verbose_mode (bool): Whether each phase is traced to output.
+            tracer: Tracer receiving the events of the solve (see tracing.NullTracer). Overrides
+                output and verbose_mode when given.
+            metrics: Metrics filled with the operation counts and phase times (see metrics.NullMetrics).
+
+        Returns:
+            int: The value of the maximum flow from source to sink, or what it adds to the flow
+                already in the graph, like ford_fulkerson.
+    """
+    network = graph if isinstance(graph, SparseGraphic) else SparseGraphic.from_graphic(graph)
+    n = network.n
+    source = 0
+    sink = n - 1
+    residual = network.residual
+    level = [-1] * n
+    max_flow = 0
+    phase = 1
+    tracer = make_tracer(tracer, output, verbose_mode)
+    metrics = metrics or NULL_METRICS
+    levels = metrics.timed("bfs", build_levels)
+    blocking_path = metrics.timed("blocking_path", find_blocking_path)
+    tracer.start("DINIC", n, network.residual_arcs)
+
+    while levels(network, source, sink, level, metrics):
+        tracer.phase(phase, level)
+
+        current = [0] * n
+        path = blocking_path(network, source, sink, level, current)
+        while path is not None:
+            path_flow = min(residual[e] for e in path)  # Finding the bottleneck
+            for e in path:
+                residual[e] -= path_flow
+                residual[e ^ 1] += path_flow
+            if tracer.enabled:
+                tracer.augmenting_path([source] + [network.head[e] for e in path], path_flow)
+            max_flow += path_flow
+            metrics.count("augmentations")
+            path = blocking_path(network, source, sink, level, current)
+
+        tracer.residual(network.residual_matrix)
+        phase += 1
+
+    if network is not graph:
+        network.copy_flow_to(graph)
+    return max_flow
+
+def capacity_scaling(graph, output=sys.stdout, verbose_mode=True, tracer=None, metrics=None):
+    """
+        Computes the maximum flow by capacity scaling: augmenting paths are only looked for among
+        the arcs with a residual capacity of at least Δ, starting with the largest power of 2 not
+        above the largest capacity U, and Δ is halved when there are none left. Each phase does at
+        most 2m augmentations, so there are O(m log U) of them in all, instead of up to the value
+        of the flow for plain augmenting paths when capacities are large.
+
+        Dense graphs are solved on their SparseGraphic version, and the resulting flow is written
+        back into their flow and residual matrices.
+
+        Args:
+            graph: A Graphic or a SparseGraphic.
+            verbose_mode (bool): Whether each phase and iteration is traced to output.
+            tracer: Tracer receiving the events of the solve (see tracing.NullTracer). Overrides
+                output and verbose_mode when given.
+            metrics: Metrics filled with the operation counts and phase times (see metrics.NullMetrics).
+
+        Returns:
+            int: The value of the maximum flow from source to sink.
+    """
+    network = graph if isinstance(graph, SparseGraphic) else SparseGraphic.from_graphic(graph)
+    n = network.n
+    source = 0
+    sink = n - 1
+    residual = network.residual
+    parent = [-1] * n
+    parent_arc = [-1] * n
+    visited = [False] * n
+    max_flow = 0
+    iteration = 1
+    tracer = make_tracer(tracer, output, verbose_mode)
+    metrics = metrics or NULL_METRICS
+    search = metrics.timed("bfs", bfs_sparse)
+    tracer.start("FF", n, network.residual_arcs)
+
+    delta = 1
+    while delta * 2 <= max(residual, default=0):
+        delta *= 2
+
+    while delta >= 1 and max(residual, default=0) > 0:
+        tracer.message(f"\nScaling phase Δ = {delta}")
+        while search(network, source, sink, parent, parent_arc, visited, metrics, delta):
+            tracer.iteration(iteration)
+            tracer.bfs_tree(parent)
+
+            # Finding the bottleneck, which is at least Δ
+            path_flow = float('inf')
+            v = sink
+            while v != source:
+                path_flow = min(path_flow, residual[parent_arc[v]])
+                v = parent[v]
+
+            if tracer.enabled:
+                tracer.augmenting_path(path_from_parent(parent, source, sink), path_flow)
+
+            v = sink
+            while v != source:
+                e = parent_arc[v]
+                residual[e] -= path_flow
+                residual[e ^ 1] += path_flow
+                v = parent[v]
+
+            tracer.residual(network.residual_matrix)
+            max_flow += path_flow
+            iteration += 1
+            metrics.count("augmentations")
+        delta //= 2
+
+    if network is not graph:
+        network.copy_flow_to(graph)
+    return max_flow
+
+def bellman_ford(residual, cost, source, n, head=None, metrics=NULL_METRICS):
     """
         Runs the Bellman-Ford algorithm to find shortest paths from source.
 
@@ -229,52 +919,347 @@ def bellman_ford(residual, cost, source, n):
             cost (list[list[int]]): Cost matrix.
             source (int): Source node.
             n (int): Number of nodes.
+            head (list[int]): Arc heads of a SparseGraphic. When given, residual and cost are
+                per-arc arrays and the predecessors are arc ids instead of vertices.
+            metrics: Metrics counting the passes and relaxations (see metrics.NullMetrics).
 
         Returns:
             tuple: (distances, predecessors)
     """
+    if is_array(residual):
+        return bellman_ford_numpy(residual, cost, source, n, metrics)
+
     dist = [float('Inf')] * n
     pred = [-1] * n
     dist[source] = 0
+    relaxations = 0
+
+    if head is not None:
+        for _ in range(n - 1):
+            for e in range(len(head)):
+                u = head[e ^ 1]
+                if residual[e] > 0 and dist[u] + cost[e] < dist[head[e]]:
+                    dist[head[e]] = dist[u] + cost[e]
+                    pred[head[e]] = e
+                    relaxations += 1
+    else:
+        for _ in range(n - 1):
+            for u in range(n):
+                for v in range(n):
+                    if residual[u][v] > 0 and dist[u] + cost[u][v] < dist[v]:  # If there's a residual capacity and a shorter path
+                        dist[v] = dist[u] + cost[u][v]
+                        pred[v] = u
+                        relaxations += 1
+
+    if metrics.enabled:
+        metrics.count("bellman_ford_passes", max(0, n - 1))
+        metrics.count("relaxations", relaxations)
+    return dist, pred
+
+def bellman_ford_numpy(residual, cost, source, n, metrics=NULL_METRICS):
+    """
+        Bellman-Ford on NumPy matrices: each pass relaxes every arc at once as a min-plus product
+        of the distance vector with the residual cost matrix. Passes stop as soon as no distance improves.
+
+        The predecessors are then those bellman_ford picks among paths of the same cost. It scans the
+        arcs by tail then head in every pass, so the predecessor of v is the tail u of the first
+        tight arc (dist[u] + cost[u][v] == dist[v]) scanned once u has its final distance. When that
+        happens is found by a search over the tight arcs, like Dijkstra's algorithm on the (pass,
+        position) at which each vertex gets its final distance.
+
+        Returns:
+            tuple: (distances, predecessors), the same lists as bellman_ford when the residual graph
+                has no negative cycle.
+    """
+    weights = np.where(residual > 0, cost, np.inf)  # Arcs without residual capacity can't be used
+    dist = np.full(n, np.inf)
+    dist[source] = 0
 
     for _ in range(n - 1):
-        for u in range(n):
-            for v in range(n):
-                if residual[u][v] > 0 and dist[u] + cost[u][v] < dist[v]:  # If there's a residual capacity and a shorter path
-                    dist[v] = dist[u] + cost[u][v]
+        best_dist = (dist[:, None] + weights).min(axis=0)  # Best dist[u] + cost[u][v] of every column v
+        improved = best_dist < dist
+        if metrics.enabled:
+            metrics.count("bellman_ford_passes")
+            metrics.count("relaxations", int(improved.sum()))
+        if not improved.any():
+            break
+        dist[improved] = best_dist[improved]
+
+    tight = np.isfinite(dist)[None, :] & (dist[:, None] + weights == dist[None, :])  # inf == inf is not tight
+    tight[:, source] = False
+    tight_arcs = [[] for _ in range(n)]
+    for u, v in zip(*(index.tolist() for index in np.nonzero(tight))):
+        tight_arcs[u].append(v)
+
+    pred = [-1] * n
+    settled = [False] * n
+    heap = [(0, -1, source)]  # (pass, tail scanned, vertex) of the relaxation giving its final distance
+    while heap:
+        p, u, v = heappop(heap)
+        if settled[v]:
+            continue
+        settled[v] = True
+        pred[v] = u
+        scan = p if u < v else p + 1  # First pass scanning v after it got its final distance
+        for w in tight_arcs[v]:
+            if not settled[w]:
+                heappush(heap, (scan, v, w))
+
+    return [int(d) if d != np.inf else float('Inf') for d in dist.tolist()], pred
+
+def has_negative_cycle(residual, cost, dist, head=None):
+    """
+        Checks whether some residual arc can still be relaxed after Bellman-Ford, which means
+        that the residual graph contains a negative cycle.
+
+        Args:
+            residual (list[list[int]]): Residual capacities.
+            cost (list[list[int]]): Cost matrix.
+            dist (list): Distances returned by bellman_ford.
+            head (list[int]): Arc heads of a SparseGraphic, as in bellman_ford.
+
+        Returns:
+            bool: True if a negative cycle exists, False otherwise.
+    """
+    if head is not None:
+        return any(residual[e] > 0 and dist[head[e ^ 1]] + cost[e] < dist[head[e]] for e in range(len(head)))
+    if is_array(residual):
+        dist = np.array(dist)
+        return bool(((residual > 0) & (dist[:, None] + cost < dist[None, :])).any())
+    n = len(dist)
+    for u in range(n):
+        for v in range(n):
+            if residual[u][v] > 0 and dist[u] + cost[u][v] < dist[v]:
+                return True
+    return False
+
+def spfa(residual, cost, source, neighbours, head=None, metrics=NULL_METRICS):
+    """
+        Shortest paths from source with a FIFO queue of the vertices whose distance just improved
+        (Shortest Path Faster Algorithm): only the residual arcs of those vertices are scanned again,
+        and the search stops as soon as the queue is empty, instead of always making n - 1 passes over
+        all the arcs like bellman_ford. On most residual graphs that is close to linear.
+
+        Every distance is the cost of a walk recorded with its number of arcs. A walk of n arcs goes
+        twice through a vertex, and its distance only improved the second time if the cycle between
+        is negative, so negative cycles are detected as soon as such a walk appears.
+
+        Args:
+            residual (list[list[int]]): Residual capacities.
+            cost (list[list[int]]): Cost matrix.
+            source (int): Source node.
+            neighbours (list[list[int]]): The index built by build_neighbours, or the adjacency
+                lists of a SparseGraphic when head is given.
+            head (list[int]): Arc heads of a SparseGraphic, as in bellman_ford.
+            metrics: Metrics counting the arcs scanned and relaxations (see metrics.NullMetrics).
+
+        Returns:
+            tuple: (distances, predecessors), as bellman_ford.
+
+        Raises:
+            ValueError: If a negative cycle is reachable from source.
+    """
+    n = len(neighbours)
+    dist = [float('Inf')] * n
+    pred = [-1] * n
+    length = [0] * n  # Number of arcs of the walk giving dist
+    queued = [False] * n
+    dist[source] = 0
+    queue = deque([source])
+    queued[source] = True
+    scanned = 0
+    relaxations = 0
+
+    while queue:
+        u = queue.popleft()
+        queued[u] = False
+        d = dist[u]
+        scanned += len(neighbours[u])
+        if head is not None:
+            for e in neighbours[u]:
+                if residual[e] > 0:
+                    v = head[e]
+                    if d + cost[e] < dist[v]:
+                        dist[v] = d + cost[e]
+                        pred[v] = e
+                        length[v] = length[u] + 1
+                        relaxations += 1
+                        if length[v] >= n:
+                            raise ValueError("Negative cycle detected in the graph.")
+                        if not queued[v]:
+                            queue.append(v)
+                            queued[v] = True
+        else:
+            residual_row = residual[u]
+            cost_row = cost[u]
+            for v in neighbours[u]:
+                if residual_row[v] > 0 and d + cost_row[v] < dist[v]:
+                    dist[v] = d + cost_row[v]
                     pred[v] = u
+                    length[v] = length[u] + 1
+                    relaxations += 1
+                    if length[v] >= n:
+                        raise ValueError("Negative cycle detected in the graph.")
+                    if not queued[v]:
+                        queue.append(v)
+                        queued[v] = True
 
+    if metrics.enabled:
+        metrics.count("arcs_scanned", scanned)
+        metrics.count("relaxations", relaxations)
     return dist, pred
 
-def min_cost_flow(graph, target_flow, output=sys.stdout):
+def dijkstra(residual, cost, source, potential, neighbours, head=None, metrics=NULL_METRICS, minimum=1, targets=None):
+    """
+        Dijkstra's algorithm with a binary heap on the reduced costs cost[u][v] + potential[u] - potential[v],
+        which must be non-negative on every residual arc with a residual capacity of at least minimum.
+
+        Args:
+            residual (list[list[int]]): Residual capacities.
+            cost (list[list[int]]): Cost matrix.
+            source (int): Source node.
+            potential (list[int]): Vertex potentials.
+            neighbours (list[list[int]]): The index built by build_neighbours, or the adjacency
+                lists of a SparseGraphic when head is given.
+            head (list[int]): Arc heads of a SparseGraphic. When given, residual and cost are
+                per-arc arrays and the predecessors are arc ids instead of vertices.
+            metrics: Metrics counting the arcs scanned and relaxations (see metrics.NullMetrics).
+            minimum (int): Smallest residual capacity of the arcs followed.
+            targets (list[bool]): If given, the search stops at the first vertex v with targets[v]
+                taken out of the heap. The distances of the vertices not taken out yet are then
+                upper bounds, none of them below the distance of that vertex.
+
+        Returns:
+            tuple: (reduced distances, predecessors)
+    """
+    n = len(potential)
+    dist = [float('Inf')] * n
+    pred = [-1] * n
+    done = [False] * n
+    dist[source] = 0
+    heap = [(0, source)]
+    relaxations = 0
+
+    while heap:
+        d, u = heappop(heap)
+        if done[u]:
+            continue
+        if targets is not None and targets[u]:
+            break
+        done[u] = True
+        d += potential[u]
+        if head is not None:
+            for e in neighbours[u]:
+                v = head[e]
+                if residual[e] >= minimum and not done[v]:
+                    new_dist = d + cost[e] - potential[v]
+                    if new_dist < dist[v]:
+                        dist[v] = new_dist
+                        pred[v] = e
+                        heappush(heap, (new_dist, v))
+                        relaxations += 1
+        else:
+            residual_row = residual[u]
+            cost_row = cost[u]
+            for v in neighbours[u]:
+                if residual_row[v] >= minimum and not done[v]:
+                    new_dist = d + cost_row[v] - potential[v]
+                    if new_dist < dist[v]:
+                        dist[v] = new_dist
+                        pred[v] = u
+                        heappush(heap, (new_dist, v))
+                        relaxations += 1
+
+    if metrics.enabled:
+        metrics.count("arcs_scanned", sum(len(neighbours[u]) for u in range(n) if done[u]))
+        metrics.count("relaxations", relaxations)
+    return dist, pred
+
+def residual_costs(graph):
+    """
+        Builds the unit costs of the residual arcs of a dense graph. Sending flow from u to v first
+        undoes the flow already sent from v to u, which gives its cost back, and only then uses the
+        arc u → v: the residual arc u → v costs -cost[v][u] while there is flow from v to u (for at
+        most that flow, see residual_segment), and cost[u][v] otherwise, like the paired arcs of a
+        SparseGraphic.
+
+        Returns:
+            list[list[int]]: The residual cost matrix (a NumPy array for the NumPy backend).
+    """
+    cost, flow = graph.cost, graph.flow
+    if is_array(cost):
+        return np.where(flow.T > 0, -cost.T, cost)
+    n = graph.n
+    return [[-cost[v][u] if flow[v][u] > 0 else cost[u][v] for v in range(n)] for u in range(n)]
+
+def update_residual_costs(costs, graph, u, v):
+    """Updates the residual costs between u and v after the flow between them changed."""
+    costs[u][v] = -graph.cost[v][u] if graph.flow[v][u] > 0 else graph.cost[u][v]
+    costs[v][u] = -graph.cost[u][v] if graph.flow[u][v] > 0 else graph.cost[v][u]
+
+def residual_segment(graph, u, v):
+    """Returns how much can be sent from u to v at the current residual cost of the arc (see residual_costs)."""
+    return graph.flow[v][u] if graph.flow[v][u] > 0 else graph.residual[u][v]
+
+def min_cost_flow(graph, target_flow, output=sys.stdout, shortest_path="spfa", verbose_mode=True, tracer=None, metrics=None,
+                  scaling=False):
     """
         Computes the minimum-cost maximum flow for a given flow target using successive shortest augmenting paths.
 
         Args:
             graph: Graph object with residual, cost, and flow matrices.
             target_flow (int): Desired flow to reach.
+            shortest_path (str): "spfa" to run the queue-based Bellman-Ford (see spfa) for every
+                augmentation, "bellman_ford" to run the plain one followed by a negative cycle
+                check, or "dijkstra" to run SPFA once for potentials and then Dijkstra on reduced costs.
+            verbose_mode (bool): Whether each augmentation is traced to output.
+            tracer: Tracer receiving the events of the solve (see tracing.NullTracer). Overrides
+                output and verbose_mode when given.
+            metrics: Metrics filled with the operation counts and phase times (see metrics.NullMetrics).
+            scaling (bool): Whether to send the flow by capacity scaling (see min_cost_flow_scaling),
+                in chunks of Δ units, instead of one augmenting path at a time. shortest_path is
+                then ignored, the scaling phases always using Dijkstra.
 
         Returns:
             int or None: Total cost of achieving target_flow, or None if impossible.
     """
+    tracer = make_tracer(tracer, output, verbose_mode)
+    metrics = metrics or NULL_METRICS
+    if shortest_path not in ("spfa", "bellman_ford", "dijkstra"):
+        raise ValueError(f"Unknown shortest path mode {shortest_path}.")
+    if scaling:
+        return min_cost_flow_scaling(graph, target_flow, tracer=tracer, metrics=metrics)
+    if shortest_path == "dijkstra":
+        return min_cost_flow_dijkstra(graph, target_flow, tracer=tracer, metrics=metrics)
+    if isinstance(graph, SparseGraphic):
+        return min_cost_flow_sparse(graph, target_flow, shortest_path=shortest_path, tracer=tracer, metrics=metrics)
+    if is_array(graph.residual) and shortest_path == "spfa":  # Only the Bellman-Ford passes are vectorized
+        return solve_on_lists(min_cost_flow, graph, target_flow, tracer=tracer, metrics=metrics)
+
     n = graph.n
     source = 0
     sink = n - 1
     total_cost = 0
     flow = 0
+    costs = residual_costs(graph)
+    neighbours = build_neighbours(graph.capacity)
+    shortest_paths = metrics.timed(shortest_path, spfa if shortest_path == "spfa" else bellman_ford)
+    negative_cycle_check = metrics.timed("negative_cycle_check", has_negative_cycle)
+    tracer.start("MCF", n, graph.residual_arcs)
 
     while flow < target_flow:
-        dist, pred = bellman_ford(graph.residual, graph.cost, source, n)
+        if shortest_path == "spfa":
+            dist, pred = shortest_paths(graph.residual, costs, source, neighbours, metrics=metrics)
+        else:
+            dist, pred = shortest_paths(graph.residual, costs, source, n, metrics=metrics)
 
-        # Checking for the presence of a negative cycle
-        for u in range(n):
-            for v in range(n):
-                if graph.residual[u][v] > 0 and dist[u] + graph.cost[u][v] < dist[v]:
-                    raise ValueError("Negative cycle detected in the graph.")
+            # Checking for the presence of a negative cycle
+            if negative_cycle_check(graph.residual, costs, dist):
+                raise ValueError("Negative cycle detected in the graph.")
 
         # Checking for a new path
         if dist[sink] == float('Inf'):
-            print("No path is available to reach the target flow. ", file=output)
+            tracer.message("No path is available to reach the target flow. ")
             break
 
         # Finding the maximum flow to push in this path
@@ -284,7 +1269,7 @@ def min_cost_flow(graph, target_flow, output=sys.stdout):
             u = pred[v]
             if u == -1:
                 raise ValueError("Invalid path. ")
-            path_flow = min(path_flow, graph.residual[u][v])
+            path_flow = min(path_flow, residual_segment(graph, u, v))
             v = u
 
         # Limiting the flow for it not to exceed the target flow left
@@ -301,16 +1286,404 @@ def min_cost_flow(graph, target_flow, output=sys.stdout):
             graph.flow[u][v] += path_flow
             graph.flow[v][u] -= path_flow
 
-            # Updating total cost
-            total_cost += path_flow * graph.cost[u][v]
+            # Updating total cost, then the costs of the residual arcs between u and v
+            total_cost += path_flow * costs[u][v]
+            update_residual_costs(costs, graph, u, v)
             v = u
 
         flow += path_flow
-        print(f"Added flow: {path_flow}, Total flow : {flow}, Total cost : {total_cost}", file=output)
+        metrics.count("augmentations")
+        tracer.augmentation(path_flow, flow, total_cost)
+
+    # Checking if target flow has been reached
+    if flow < target_flow:
+        tracer.message("Reaching the target flow is impossible with the current capacities. ")
+        return None
+
+    return total_cost
+
+
+def min_cost_flow_sparse(graph, target_flow, output=sys.stdout, verbose_mode=True, tracer=None, metrics=None, shortest_path="spfa"):
+    """
+        Successive shortest augmenting paths on a SparseGraphic, with the same output as min_cost_flow.
+
+        Args:
+            graph (SparseGraphic): A sparse graph with costs.
+            target_flow (int): Desired flow to reach.
+            shortest_path (str): "spfa" or "bellman_ford", as in min_cost_flow.
+
+        Returns:
+            int or None: Total cost of achieving target_flow, or None if impossible.
+    """
+    n = graph.n
+    source = 0
+    sink = n - 1
+    head = graph.head
+    total_cost = 0
+    flow = 0
+    tracer = make_tracer(tracer, output, verbose_mode)
+    metrics = metrics or NULL_METRICS
+    shortest_paths = metrics.timed(shortest_path, spfa if shortest_path == "spfa" else bellman_ford)
+    negative_cycle_check = metrics.timed("negative_cycle_check", has_negative_cycle)
+    tracer.start("MCF", n, graph.residual_arcs)
+
+    while flow < target_flow:
+        if shortest_path == "spfa":
+            dist, pred = shortest_paths(graph.residual, graph.cost, source, graph.adjacency, head, metrics)
+        else:
+            dist, pred = shortest_paths(graph.residual, graph.cost, source, n, head, metrics)
+
+            # Checking for the presence of a negative cycle
+            if negative_cycle_check(graph.residual, graph.cost, dist, head):
+                raise ValueError("Negative cycle detected in the graph.")
+
+        # Checking for a new path
+        if dist[sink] == float('Inf'):
+            tracer.message("No path is available to reach the target flow. ")
+            break
+
+        # Finding the maximum flow to push in this path
+        path_flow = float('Inf')
+        v = sink
+        while v != source:
+            e = pred[v]
+            if e == -1:
+                raise ValueError("Invalid path. ")
+            path_flow = min(path_flow, graph.residual[e])
+            v = head[e ^ 1]
+
+        # Limiting the flow for it not to exceed the target flow left
+        path_flow = min(path_flow, target_flow - flow)
+
+        v = sink
+        while v != source:
+            e = pred[v]
+            graph.residual[e] -= path_flow
+            graph.residual[e ^ 1] += path_flow
+            total_cost += path_flow * graph.cost[e]
+            v = head[e ^ 1]
+
+        flow += path_flow
+        metrics.count("augmentations")
+        tracer.augmentation(path_flow, flow, total_cost)
+
+    # Checking if target flow has been reached
+    if flow < target_flow:
+        tracer.message("Reaching the target flow is impossible with the current capacities. ")
+        return None
+
+    return total_cost
+
+
+def min_cost_flow_dijkstra(graph, target_flow, output=sys.stdout, verbose_mode=True, tracer=None, metrics=None):
+    """
+        Successive shortest augmenting paths with Johnson potentials: SPFA runs once to get
+        the potentials, then every augmentation uses Dijkstra with a binary heap on the reduced costs,
+        in O(m log n) instead of O(n³). Potentials are updated with the distances after each path
+        so that reduced costs stay non-negative. Output and total cost are the same as min_cost_flow;
+        the flow may differ when several shortest paths have the same cost.
+
+        Args:
+            graph: A Graphic or a SparseGraphic with costs.
+            target_flow (int): Desired flow to reach.
+
+        Returns:
+            int or None: Total cost of achieving target_flow, or None if impossible.
+    """
+    tracer = make_tracer(tracer, output, verbose_mode)
+    metrics = metrics or NULL_METRICS
+    if is_array(graph.residual):
+        return solve_on_lists(min_cost_flow_dijkstra, graph, target_flow, tracer=tracer, metrics=metrics)
+
+    n = graph.n
+    source = 0
+    sink = n - 1
+    total_cost = 0
+    flow = 0
+    tracer.start("MCF", n, graph.residual_arcs)
+
+    if isinstance(graph, SparseGraphic):
+        head = graph.head
+        neighbours = graph.adjacency
+        costs = graph.cost
+    else:
+        head = None
+        neighbours = build_neighbours(graph.capacity)
+        costs = residual_costs(graph)
+
+    # Computing the initial potentials with a single SPFA run
+    dist, _ = metrics.timed("spfa", spfa)(graph.residual, costs, source, neighbours, head, metrics)
+    potential = [d if d != float('Inf') else 0 for d in dist]
+
+    shortest_paths = metrics.timed("dijkstra", dijkstra)
+    while flow < target_flow:
+        dist, pred = shortest_paths(graph.residual, costs, source, potential, neighbours, head, metrics)
+
+        # Checking for a new path
+        if dist[sink] == float('Inf'):
+            tracer.message("No path is available to reach the target flow. ")
+            break
+
+        # Keeping the reduced costs non-negative for the next search
+        for v in range(n):
+            if dist[v] != float('Inf'):
+                potential[v] += dist[v]
+
+        # Collecting the path, as arc ids for a sparse graph and (u, v) pairs otherwise
+        path = []
+        v = sink
+        while v != source:
+            if head is not None:
+                path.append(pred[v])
+                v = head[pred[v] ^ 1]
+            else:
+                path.append((pred[v], v))
+                v = pred[v]
+
+        # Finding the maximum flow to push in this path, limited by the target flow left
+        if head is not None:
+            path_flow = min(graph.residual[e] for e in path)
+        else:
+            path_flow = min(residual_segment(graph, u, v) for u, v in path)
+        path_flow = min(path_flow, target_flow - flow)
+
+        for arc in path:
+            if head is not None:
+                graph.residual[arc] -= path_flow
+                graph.residual[arc ^ 1] += path_flow
+                total_cost += path_flow * graph.cost[arc]
+            else:
+                u, v = arc
+                graph.residual[u][v] -= path_flow
+                graph.residual[v][u] += path_flow
+                graph.flow[u][v] += path_flow
+                graph.flow[v][u] -= path_flow
+                total_cost += path_flow * costs[u][v]
+                update_residual_costs(costs, graph, u, v)
+
+        flow += path_flow
+        metrics.count("augmentations")
+        tracer.augmentation(path_flow, flow, total_cost)
 
     # Checking if target flow has been reached
     if flow < target_flow:
-        print("Reaching the target flow is impossible with the current capacities. ", file=output)
+        tracer.message("Reaching the target flow is impossible with the current capacities. ")
         return None
 
     return total_cost
+
+
+def min_cost_flow_scaling(graph, target_flow, output=sys.stdout, verbose_mode=True, tracer=None, metrics=None):
+    """
+        Minimum cost flow by capacity scaling (Edmonds-Karp scaling, as in Ahuja, Magnanti and Orlin).
+        The source starts with target_flow units of excess and the sink with as much deficit. Each
+        Δ-phase first saturates the arcs with at least Δ residual capacity and a negative reduced cost,
+        then repeatedly sends at least Δ units from a vertex with an excess of at least Δ to the nearest
+        vertex with a deficit of at least Δ, along a shortest path of the arcs with at least Δ residual
+        capacity, found with Dijkstra on the reduced costs (stopped at the first deficit reached).
+        Δ starts at the largest power of 2 not above the largest capacity or target_flow and is halved
+        after each phase, so there are O(m log U) augmentations whatever the bottlenecks, where plain
+        successive shortest paths can need one per unit of flow.
+
+        Since arcs with a negative reduced cost are saturated rather than searched, negative costs need
+        no Bellman-Ford run, and negative cycles are saturated instead of raising an error. Dense graphs
+        are solved on their SparseGraphic version (with the opposite cost on reverse arcs), and the
+        resulting flow is written back into their flow and residual matrices.
+
+        Args:
+            graph: A Graphic or a SparseGraphic with costs.
+            target_flow (int): Desired flow to reach.
+
+        Returns:
+            int or None: Total cost of achieving target_flow, or None if impossible, the graph being
+                then left as it was.
+    """
+    network = graph if isinstance(graph, SparseGraphic) else SparseGraphic.from_graphic(graph)
+    state = network.snapshot()
+    n = network.n
+    source = 0
+    sink = n - 1
+    head = network.head
+    residual = network.residual
+    cost = network.cost
+    adjacency = network.adjacency
+    excess = [0] * n
+    excess[source] += target_flow
+    excess[sink] -= target_flow
+    potential = [0] * n
+    total_cost = 0
+    tracer = make_tracer(tracer, output, verbose_mode)
+    metrics = metrics or NULL_METRICS
+    shortest_paths = metrics.timed("dijkstra", dijkstra)
+    tracer.start("MCF", n, network.residual_arcs)
+
+    delta = 1
+    while delta * 2 <= max(target_flow, max(residual, default=0)):
+        delta *= 2
+
+    while delta >= 1:
+        tracer.message(f"Scaling phase Δ = {delta}")
+
+        # Saturating the arcs that would break the optimality of the Δ-residual graph
+        for e in range(len(head)):
+            u, v = head[e ^ 1], head[e]
+            if residual[e] >= delta and cost[e] + potential[u] - potential[v] < 0:
+                amount = residual[e]
+                residual[e] = 0
+                residual[e ^ 1] += amount
+                excess[u] -= amount
+                excess[v] += amount
+                total_cost += amount * cost[e]
+
+        # Sending Δ units at a time from the excesses to the deficits
+        stuck = [False] * n  # Vertices whose excess can't reach any deficit in this phase
+        while True:
+            u = next((v for v in range(n) if excess[v] >= delta and not stuck[v]), None)
+            if u is None:
+                break
+            deficit = [excess[v] <= -delta for v in range(n)]
+            dist, pred = shortest_paths(residual, cost, u, potential, adjacency, head, metrics, delta, deficit)
+            deficits = [v for v in range(n) if deficit[v] and dist[v] != float('Inf')]
+            if not deficits:
+                stuck[u] = True
+                continue
+            target = min(deficits, key=lambda v: dist[v])
+
+            # Keeping the reduced costs of the Δ-residual arcs non-negative
+            for v in range(n):
+                potential[v] += min(dist[v], dist[target])
+
+            # Sending as much as the path allows, which is at least Δ
+            path_flow = min(excess[u], -excess[target])
+            v = target
+            while v != u:
+                path_flow = min(path_flow, residual[pred[v]])
+                v = head[pred[v] ^ 1]
+
+            v = target
+            while v != u:
+                e = pred[v]
+                residual[e] -= path_flow
+                residual[e ^ 1] += path_flow
+                total_cost += path_flow * cost[e]
+                v = head[e ^ 1]
+            excess[u] -= path_flow
+            excess[target] += path_flow
+            metrics.count("augmentations")
+            tracer.augmentation(path_flow, target_flow + excess[sink], total_cost)
+        delta //= 2
+
+    # Checking if target flow has been reached: the excesses left are no flow, so they are dropped
+    if any(excess):
+        if network is graph:
+            network.restore(state)
+        tracer.message("Reaching the target flow is impossible with the current capacities. ")
+        return None
+
+    if network is not graph:
+        network.copy_flow_to(graph)
+    return total_cost
+
+
+def min_cost_flow_cost_scaling(graph, target_flow, output=sys.stdout, verbose_mode=True, tracer=None, metrics=None,
+                               scaling_factor=8):
+    """
+        Minimum cost flow by cost scaling (Goldberg and Tarjan), whose running time does not depend on
+        target_flow: O(n² m log(nC)) for the FIFO version. Costs are multiplied by n + 1 so that a flow
+        that is 1-optimal for them is optimal. Each refine phase divides ε by scaling_factor, saturates
+        the residual arcs with a reduced cost cost[e] + potential[u] - potential[v] below 0, then
+        discharges the excesses in FIFO order by pushing along those arcs and relabeling, as in
+        Push-Relabel, which keeps every reduced cost above -ε.
+
+        Same interface and output as min_cost_flow: the flow is left in the graph (written back into
+        the flow and residual matrices of a dense graph, solved on its SparseGraphic version) and the
+        total cost is returned. The optimal flow may differ from the one of min_cost_flow when several
+        have the same cost. Negative cycles are saturated instead of raising an error.
+
+        Args:
+            graph: A Graphic or a SparseGraphic with costs.
+            target_flow (int): Desired flow to reach.
+            scaling_factor (int): Division of ε between two refine phases.
+
+        Returns:
+            int or None: Total cost of achieving target_flow, or None if impossible.
+    """
+    network = graph if isinstance(graph, SparseGraphic) else SparseGraphic.from_graphic(graph)
+    n = network.n
+    source = 0
+    sink = n - 1
+    head = network.head
+    adjacency = network.adjacency
+    tracer = make_tracer(tracer, output, verbose_mode)
+    metrics = metrics or NULL_METRICS
+    tracer.start("MCF", n, network.residual_arcs)
+
+    # Refine only terminates if the target flow can be reached, which a max flow tells beforehand
+    state = network.snapshot()
+    max_flow = dinic(network, tracer=NULL_TRACER)
+    network.restore(state)
+    if max_flow < target_flow:
+        tracer.message("Reaching the target flow is impossible with the current capacities. ")
+        return None
+
+    residual = network.residual
+    cost = [c * (n + 1) for c in network.cost]
+    potential = [0] * n
+    excess = [0] * n
+    excess[source] += target_flow
+    excess[sink] -= target_flow
+
+    def refine(epsilon):
+        # Saturating the arcs with a negative reduced cost makes the flow 0-optimal, but unbalanced
+        for e in range(len(head)):
+            u, v = head[e ^ 1], head[e]
+            if residual[e] > 0 and cost[e] + potential[u] - potential[v] < 0:
+                amount = residual[e]
+                residual[e] = 0
+                residual[e ^ 1] += amount
+                excess[u] -= amount
+                excess[v] += amount
+
+        active = deque(u for u in range(n) if excess[u] > 0)
+        current = [0] * n
+        while active:
+            u = active.popleft()
+            arcs = adjacency[u]
+            while excess[u] > 0:
+                if current[u] == len(arcs):
+                    # Relabel: the cheapest residual arc becomes admissible, with a reduced cost of -ε
+                    potential[u] = max(potential[head[e]] - cost[e] for e in arcs if residual[e] > 0) - epsilon
+                    current[u] = 0
+                    if metrics.enabled:
+                        metrics.count("relabels")
+                    continue
+                e = arcs[current[u]]
+                v = head[e]
+                if residual[e] > 0 and cost[e] + potential[u] - potential[v] < 0:
+                    amount = min(excess[u], residual[e])
+                    residual[e] -= amount
+                    residual[e ^ 1] += amount
+                    excess[u] -= amount
+                    excess[v] += amount
+                    if excess[v] > 0 and excess[v] <= amount:  # v just became active
+                        active.append(v)
+                    if metrics.enabled:
+                        metrics.count("pushes_saturating" if residual[e] == 0 else "pushes_non_saturating")
+                else:
+                    current[u] += 1
+
+    refine_phase = metrics.timed("refine", refine)
+    epsilon = max(max((abs(c) for c in cost), default=0), 1)
+    while True:
+        epsilon = max(1, epsilon // scaling_factor)
+        tracer.message(f"Refine phase ε = {epsilon}/{n + 1}")
+        refine_phase(epsilon)
+        if epsilon == 1:
+            break
+
+    if network is not graph:
+        network.copy_flow_to(graph)
+
+    total_cost = sum(network.cost[e] * (network.capacity[e] - residual[e]) for e in range(0, len(head), 2))
+    tracer.message(f"Total flow : {target_flow}, Total cost : {total_cost}")
+    return total_cost
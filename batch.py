@@ -0,0 +1,164 @@
+import argparse
+import csv
+import glob
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from graph import Graphic, SparseGraphic
+from algorithms import ford_fulkerson, push_relabel, push_relabel_fifo, dinic, capacity_scaling, min_cost_flow, \
+    min_cost_flow_cost_scaling
+from tracing import CountingTracer, NULL_TRACER
+from reduction import solve_reduced
+from certificate import check_max_flow, check_min_cost_flow
+
+MAX_FLOW_SOLVERS = {"ff": ford_fulkerson, "pr": push_relabel, "pr_fifo": push_relabel_fifo, "dinic": dinic,
+                    "cs": capacity_scaling}
+ALGORITHMS = list(MAX_FLOW_SOLVERS) + ["mcf", "mcf_cs"]
+FIELDS = ["instance", "algorithm", "n", "flow", "cost", "iterations", "pushes", "relabels", "time", "error"]
+
+
+DIMACS_EXTENSIONS = (".max", ".min", ".dimacs")
+EDGE_LIST_EXTENSIONS = (".edges",)
+
+def load_instance(filename, backend="list"):
+    """
+        Reads an instance as a Graphic ("list" or "numpy" backend) or a SparseGraphic ("sparse").
+        DIMACS files (.max, .min, .dimacs) and edge lists (.edges) are read as a SparseGraphic
+        whatever the backend, the other files as propositions.
+    """
+    if filename.endswith(DIMACS_EXTENSIONS):
+        return SparseGraphic.read_dimacs(filename)
+    if filename.endswith(EDGE_LIST_EXTENSIONS):
+        return SparseGraphic.read_edge_list(filename)
+    if backend == "sparse":
+        return SparseGraphic.read_graph(filename)
+    return Graphic.read_graph(filename, backend=backend)
+
+def solve_job(filename, algorithm, backend="list", target_flow=None, shortest_path="spfa", scaling=False, reduce=False):
+    """
+        Solves one instance with one algorithm, without any trace, and checks the flow it finds (see
+        certificate.py). Reading the file and the check are not timed.
+        The worker gets the path of the instance rather than the graph and reads the file itself, and
+        sends back the record alone, whose values are all numbers or strings.
+
+        Args:
+            filename (str): Path to the proposition file.
+            algorithm (str): One of ALGORITHMS.
+            backend (str): See load_instance.
+            target_flow (int): Target of the min cost flow, or None for the one of the file (DIMACS
+                min cost flow) or else the maximum flow.
+            shortest_path (str): Shortest path mode of the min cost flow.
+            scaling (bool): Whether the min cost flow uses capacity scaling.
+            reduce (bool): Whether the instance is reduced first (see reduction.py), which is timed.
+
+        Returns:
+            dict: A record with the FIELDS keys. On failure, "error" holds the message and the
+                results are None.
+    """
+    record = dict.fromkeys(FIELDS)
+    record.update(instance=filename, algorithm=algorithm)
+    try:
+        graph = load_instance(filename, backend)
+        record["n"] = graph.n
+        counter = CountingTracer()
+        run = solve_reduced if reduce else (lambda solver, graph, *args, **kwargs: solver(graph, *args, **kwargs))
+        if algorithm in MAX_FLOW_SOLVERS:
+            start = time.perf_counter()
+            record["flow"] = int(run(MAX_FLOW_SOLVERS[algorithm], graph, tracer=counter))
+            record["time"] = time.perf_counter() - start
+            check_max_flow(graph, record["flow"])
+        elif algorithm in ("mcf", "mcf_cs"):
+            if not graph.has_costs():
+                raise ValueError("The instance has no cost matrix.")
+            if target_flow is None:
+                target_flow = getattr(graph, "target_flow", None)
+            if target_flow is None:
+                target_flow = dinic(graph, tracer=NULL_TRACER)
+                graph.reset()
+            start = time.perf_counter()
+            if algorithm == "mcf_cs":
+                cost = run(min_cost_flow_cost_scaling, graph, target_flow, tracer=counter)
+            else:
+                cost = run(min_cost_flow, graph, target_flow, shortest_path=shortest_path, tracer=counter, scaling=scaling)
+            record["time"] = time.perf_counter() - start
+            if cost is None:
+                raise ValueError(f"The target flow {target_flow} exceeds the maximum flow.")
+            check_min_cost_flow(graph, target_flow, cost)
+            record["flow"] = target_flow
+            record["cost"] = int(cost)
+        else:
+            raise ValueError(f"Unknown algorithm {algorithm}.")
+        record["iterations"] = counter.iterations
+        record["pushes"] = counter.pushes
+        record["relabels"] = counter.relabels
+    except Exception as error:  # One bad instance must not stop the whole batch
+        record["error"] = f"{type(error).__name__}: {error}"
+    return record
+
+def solve_batch(filenames, algorithms, output=sys.stdout, output_format="jsonl", workers=None, **options):
+    """
+        Solves every (instance, algorithm) pair over a pool of worker processes, writing each record
+        to output as soon as it is done, so results are in completion order.
+
+        Args:
+            filenames (list): Paths to the proposition files.
+            algorithms (list): Algorithms to run on each file.
+            output_format (str): "jsonl" for one JSON object per line, or "csv".
+            workers (int): Number of worker processes, one per CPU if None.
+            options: backend, target_flow, shortest_path, scaling and reduce, given to solve_job.
+
+        Returns:
+            int: The number of failed jobs.
+    """
+    if output_format == "csv":
+        writer = csv.DictWriter(output, fieldnames=FIELDS)
+        writer.writeheader()
+        write = writer.writerow
+    else:
+        write = lambda record: output.write(json.dumps(record) + "\n")
+
+    failures = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(solve_job, filename, algorithm, **options): (filename, algorithm)
+                   for filename in filenames for algorithm in algorithms}
+        for future in as_completed(futures):
+            try:
+                record = future.result()
+            except Exception as error:  # Also BrokenProcessPool, raised by every job left when a worker dies
+                record = dict.fromkeys(FIELDS)
+                record.update(instance=futures[future][0], algorithm=futures[future][1],
+                              error=f"{type(error).__name__}: {error}")
+            failures += record["error"] is not None
+            write(record)
+            output.flush()
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solves proposition files without interaction and prints one record per instance and algorithm.")
+    parser.add_argument("patterns", nargs="+", help="proposition files or glob patterns, e.g. 'Propositions/*.txt'")
+    parser.add_argument("-a", "--algorithms", nargs="+", choices=ALGORITHMS, default=["ff", "pr"], help="algorithms to run on each file")
+    parser.add_argument("--target", type=int, default=None, help="target flow of the min cost flow (the maximum flow by default)")
+    parser.add_argument("--shortest-path", choices=["spfa", "bellman_ford", "dijkstra"], default="spfa", help="shortest path mode of the min cost flow")
+    parser.add_argument("--scaling", action="store_true", help="solve the min cost flow by capacity scaling")
+    parser.add_argument("--reduce", action="store_true", help="reduce each instance before solving it")
+    parser.add_argument("--backend", choices=["list", "numpy", "sparse"], default="list", help="graph representation")
+    parser.add_argument("--format", choices=["jsonl", "csv"], default="jsonl", help="output format")
+    parser.add_argument("-o", "--output", default=None, help="output file (standard output by default)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (one per CPU by default)")
+    args = parser.parse_args()
+
+    filenames = sorted({filename for pattern in args.patterns for filename in glob.glob(pattern)})
+    if not filenames:
+        parser.error("no file matches the given patterns")
+
+    output = open(args.output, "w", newline="", encoding="utf8") if args.output else sys.stdout
+    try:
+        failures = solve_batch(filenames, args.algorithms, output, args.format, args.workers, backend=args.backend,
+                               target_flow=args.target, shortest_path=args.shortest_path, scaling=args.scaling,
+                               reduce=args.reduce)
+    finally:
+        if args.output:
+            output.close()
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,174 @@
+from collections import deque
+from graph import SparseGraphic
+from algorithms import spfa
+from utils import is_array
+
+# Checks of the flows the solvers leave in a graph, which raise a ValueError saying what is wrong.
+# They only read the graph once, in O(n + m) (O(n²) on the matrices of a Graphic), so they can be left
+# on after every solve.
+
+
+def _matrices(graph):
+    """Returns the capacity, flow, residual and cost matrices of a Graphic as lists (cost None without costs)."""
+    def as_list(matrix):
+        return matrix.tolist() if is_array(matrix) else matrix
+    cost = as_list(graph.cost) if graph.has_costs() else None
+    return as_list(graph.capacity), as_list(graph.flow), as_list(graph.residual), cost
+
+def check_flow(graph, value=None):
+    """
+        Checks that the flow of a graph is feasible: no arc carries more than its capacity, the flow
+        from u to v is the opposite of the flow from v to u and agrees with the residual capacities,
+        and every vertex but the source and the sink keeps what it receives.
+
+        Args:
+            graph: A solved Graphic or SparseGraphic.
+            value (int): The flow value the solver returned, if it has to be checked too.
+
+        Returns:
+            int: The value of the flow, i.e. what leaves the source.
+    """
+    n = graph.n
+    balance = [0] * n
+    if isinstance(graph, SparseGraphic):
+        for e in range(0, len(graph.head), 2):
+            u, v = graph.head[e + 1], graph.head[e]
+            sent = graph.capacity[e] - graph.residual[e]
+            if graph.residual[e] < 0 or graph.residual[e + 1] < 0:
+                raise ValueError(f"The flow {sent} of the arc {u} → {v} exceeds its capacity.")
+            if graph.residual[e + 1] - graph.capacity[e + 1] != sent:
+                raise ValueError(f"The residual capacities of the arc {u} → {v} and of its reverse disagree.")
+            balance[u] -= sent
+            balance[v] += sent
+    else:
+        capacity, flow, residual, _ = _matrices(graph)
+        for u in range(n):
+            for v in range(n):
+                if flow[u][v] != -flow[v][u]:
+                    raise ValueError(f"The flows {u} → {v} and {v} → {u} are not opposite.")
+                if flow[u][v] > capacity[u][v]:
+                    raise ValueError(f"The flow {flow[u][v]} of the arc {u} → {v} exceeds its capacity.")
+                if residual[u][v] != capacity[u][v] - flow[u][v]:
+                    raise ValueError(f"The residual capacity of the arc {u} → {v} does not match its flow.")
+            balance[u] = -sum(flow[u])
+
+    for v in range(1, n - 1):
+        if balance[v] != 0:
+            raise ValueError(f"The flow is not conserved at vertex {v} ({balance[v]:+}).")
+    if value is not None and -balance[0] != value:
+        raise ValueError(f"The solver returned {value} but the flow leaving the source is {-balance[0]}.")
+    return -balance[0]
+
+def min_cut(graph):
+    """
+        Extracts the minimum cut of a solved graph from its residual graph: the source side is what
+        the source still reaches, with a BFS over the arcs with residual capacity.
+
+        Returns:
+            tuple: (sorted list of the vertices on the side of the source, list of the (u, v, capacity)
+                arcs going from that side to the other, capacity of the cut)
+    """
+    n = graph.n
+    sparse = isinstance(graph, SparseGraphic)
+    if not sparse:
+        capacity, _, residual, _ = _matrices(graph)
+    reached = [False] * n
+    reached[0] = True
+    queue = deque([0])
+    while queue:
+        u = queue.popleft()
+        if sparse:
+            ends = (graph.head[e] for e in graph.adjacency[u] if graph.residual[e] > 0)
+        else:
+            ends = (v for v in range(n) if residual[u][v] > 0)
+        for v in ends:
+            if not reached[v]:
+                reached[v] = True
+                queue.append(v)
+
+    if sparse:
+        arcs = [(graph.head[e + 1], graph.head[e], graph.capacity[e]) for e in range(0, len(graph.head), 2)]
+        arcs += [(graph.head[e], graph.head[e + 1], graph.capacity[e + 1]) for e in range(0, len(graph.head), 2)]
+    else:
+        arcs = [(u, v, capacity[u][v]) for u in range(n) if reached[u] for v in range(n)]
+    cut = [(u, v, c) for u, v, c in arcs if c > 0 and reached[u] and not reached[v]]
+    return [v for v in range(n) if reached[v]], cut, sum(c for _, _, c in cut)
+
+def check_max_flow(graph, value=None):
+    """
+        Checks that the flow of a graph is a maximum flow: it is feasible (see check_flow), the sink
+        is not reachable in the residual graph, and the flow value equals the capacity of the cut
+        this leaves.
+
+        Args:
+            graph: A Graphic or SparseGraphic solved by any max flow solver.
+            value (int): The max flow the solver returned, if it has to be checked too.
+
+        Returns:
+            tuple: The minimum cut, as min_cut.
+    """
+    flow = check_flow(graph, value)
+    side, arcs, capacity = min_cut(graph)
+    if graph.n - 1 in side:
+        raise ValueError("The sink is still reachable from the source: the flow is not maximum.")
+    if capacity != flow:
+        raise ValueError(f"The flow value {flow} differs from the capacity {capacity} of the cut.")
+    return side, arcs, capacity
+
+def check_min_cost_flow(graph, target_flow, cost=None, potential=None):
+    """
+        Checks that the flow of a graph is a min cost flow of value target_flow: it is feasible (see
+        check_flow), costs what the solver returned, and has potentials under which no residual arc
+        has a negative reduced cost cost(u, v) + potential[u] - potential[v], which proves that no
+        cheaper flow of the same value exists.
+
+        Args:
+            graph: A Graphic or SparseGraphic with costs, solved by any min cost flow solver.
+            target_flow (int): The flow value that was asked.
+            cost (int): The total cost the solver returned, if it has to be checked too.
+            potential (list[int]): Potentials of the vertices. When None, they are the distances
+                from a virtual vertex linked to every vertex by arcs of cost 0, found by spfa.
+
+        Returns:
+            list[int]: The potentials that certify the flow.
+    """
+    check_flow(graph, target_flow)
+    n = graph.n
+
+    # Residual arcs as a SparseGraphic would store them: head, cost and adjacency
+    head, arc_cost, neighbours = [], [], [[] for _ in range(n + 1)]
+    total = 0
+    if isinstance(graph, SparseGraphic):
+        head, arc_cost = graph.head[:], graph.cost[:]
+        neighbours = [[e for e in graph.adjacency[u] if graph.residual[e] > 0] for u in range(n)] + [[]]
+        total = sum(graph.cost[e] * (graph.capacity[e] - graph.residual[e]) for e in range(0, len(graph.head), 2))
+    else:
+        capacity, flow, _, costs = _matrices(graph)
+        for u in range(n):
+            for v in range(n):
+                if flow[u][v] > 0:  # Sending back the flow of u → v gives its cost back
+                    neighbours[v].append(len(head))
+                    head.append(u)
+                    arc_cost.append(-costs[u][v])
+                    total += costs[u][v] * flow[u][v]
+                if capacity[u][v] > max(flow[u][v], 0):
+                    neighbours[u].append(len(head))
+                    head.append(v)
+                    arc_cost.append(costs[u][v])
+    if cost is not None and total != cost:
+        raise ValueError(f"The solver returned a cost of {cost} but the flow costs {total}.")
+
+    if potential is None:
+        for v in range(n):
+            neighbours[n].append(len(head))
+            head.append(v)
+            arc_cost.append(0)
+        try:
+            potential, _ = spfa([1] * len(head), arc_cost, n, neighbours, head)
+        except ValueError:
+            raise ValueError("The residual graph has a negative cycle: the flow is not of minimum cost.")
+    for u in range(n):
+        for e in neighbours[u]:
+            if arc_cost[e] + potential[u] - potential[head[e]] < 0:
+                raise ValueError(f"The residual arc {u} → {head[e]} has a negative reduced cost.")
+    return potential[:n]
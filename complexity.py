@@ -1,155 +1,297 @@
+import argparse
 import random
-import math
 import os
-import re
+import statistics
 import time
-import copy
-from graph import Graphic
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from generators import FAMILIES, GENERATOR_VERSION, generate, to_graphic, to_sparse_graphic
 from algorithms import *
+from tracing import NULL_TRACER
+from metrics import Metrics
+from certificate import check_max_flow, check_min_cost_flow
+from result_store import append_runs, read_runs
 
 
 
-### Generation of random flow problem ###
-def generate_random_proposition(n: int, save: bool):
-    """
-        Creates the capacity and cost matrices to feed into a .txt file in the proposition_to_file fun
-        Args: integer n, the size of the matrix
-    """
-    capacity_matrix = [[0 for j in range(n)] for i in range(n)]
-    cost_matrix = [[0 for j in range(n)] for i in range(n)]
-
-    nb_values = math.floor((n**2)/2)
-    couples_edited = set()
-    
-    while nb_values > 0 :
-        i, j = 0,0
-        while (i==j or ((i,j) in couples_edited) or i==n-1) :
-            i, j = random.randint(0,n-1),  random.randint(0,n-1 )
-        capacity_matrix[i][j] = random.randint(1,100)
-        cost_matrix[i][j] = random.randint(1,100)
-        couples_edited.add((i,j))
-        nb_values-=1
-    
-    if save:
-        proposition_to_file(capacity_matrix, cost_matrix)
-
-    return capacity_matrix, cost_matrix 
-
-def proposition_to_file(capacity_matrix, cost_matrix):
-    """
-        Creates a proposal text file with the capacity and cost matrix following the required format
-        Args: the capacity matrix and cost matrix that have to be written in the file
-    """
-    n = len(capacity_matrix)
-    folder = "Propositions"
-
-    # Ensure the folder exists
-    os.makedirs(folder, exist_ok=True)
-
-    # Look for existing files inside the folder
-    existing_files = os.listdir(folder)
-    pattern = re.compile(r"Proposition(\d+)\.txt")
-    
-    numbers = []
-    for f in existing_files:
-        match = pattern.fullmatch(f)
-        if match:
-            numbers.append(int(match.group(1)))
-
-    next_index = max(numbers, default=0) + 1
-
-    # Build the full path
-    filename = os.path.join(folder, f"Random proposition{next_index}.txt")
-
-    # Write to file
-    with open(filename, "w") as f:
-        f.write(f"{n}\n")
-        for row in capacity_matrix:
-            f.write(' '.join(map(str, row)) + '\n')
-        for row in cost_matrix:
-            f.write(' '.join(map(str, row)) + '\n')
-    return filename
-
-def generate_random_graph(file):
-    graph = Graphic.read_graph(file)
-    return graph
-
 ### Time measurement ###
 
-def measure_ff(graph):
-    """Runs FF on a graph and returns the execution time"""
+def measure_ff(graph, metrics=None):
+    """Runs FF on a graph and returns the max flow and the execution time"""
     start_ff = time.perf_counter()
-    max_flow = ford_fulkerson(graph)
+    max_flow = ford_fulkerson(graph, tracer=NULL_TRACER, metrics=metrics)
     end_ff = time.perf_counter()
     return max_flow, (end_ff - start_ff) 
 
-def measure_pr(graph):
-    """Runs PR on a graph and returns the execution time"""
+def measure_pr(graph, metrics=None):
+    """Runs PR on a graph and returns the max flow and the execution time"""
     start_pr = time.perf_counter()
-    push_relabel(graph, output=sys.stdout, verbose_mode=False)
+    max_flow = push_relabel(graph, tracer=NULL_TRACER, metrics=metrics)
     end_pr = time.perf_counter()
-    return (end_pr - start_pr)
+    return max_flow, (end_pr - start_pr)
 
-def measure_mcf(graph, target_flow):
-    """Runs MCF on a graph, provided a target flow, and returns the execution time"""
-    start_mcf = time.perf_counter()
-    min_cost_flow(graph, target_flow)
-    end_mcf = time.perf_counter()
-    return (end_mcf - start_mcf)
+def measure_pr_fifo(graph, metrics=None):
+    """Runs FIFO PR (with heuristics) on a graph and returns the max flow and the execution time"""
+    start_pr = time.perf_counter()
+    max_flow = push_relabel_fifo(graph, tracer=NULL_TRACER, metrics=metrics)
+    end_pr = time.perf_counter()
+    return max_flow, (end_pr - start_pr)
 
-### Saving stuff ###
+def measure_dinic(graph, metrics=None):
+    """Runs Dinic on a graph and returns the max flow and the execution time"""
+    start_dinic = time.perf_counter()
+    max_flow = dinic(graph, tracer=NULL_TRACER, metrics=metrics)
+    end_dinic = time.perf_counter()
+    return max_flow, (end_dinic - start_dinic)
 
-def generate_execution_time_data(graph_sizes: list[int], nb_runs = 100) -> dict:
-    results = {}
-
-    for size in graph_sizes :
-        results[size] = {"thetas_ff":[], "thetas_pr" :[], "thetas_mcf":[]}
-        
-        print(f"Running the test for n = {size}")
-        for _ in range(nb_runs):
-            # initialize a random graph 
-            capacity_matrix, cost_matrix = generate_random_proposition(size, save=False)
-            n_vertices = len(capacity_matrix)
-            graph = Graphic(n_vertices)
-
-            graph.capacity = capacity_matrix
-            graph.cost = cost_matrix
-
-            #   Measure execution times for each algorithm
-            # Measure Ford-Fulkerson
-            max_ff_flow, theta_ff = measure_ff(graph)
-            results[size]["thetas_ff"].append(theta_ff)
-            
-            # Measure Push-Relabel
-            theta_pr = measure_pr(graph)
-            results[size]["thetas_pr"].append(theta_pr)
-
-            # Measure min-cost flow
-            theta_mcf = measure_mcf(graph, max_ff_flow//2)
-            results[size]["thetas_mcf"].append(theta_mcf)
-
-
-            # print(f"\nVALUE {size}: θFF={theta_ff} | θPR={theta_pr} | θMIN={theta_mcf} |\n")
-    return results
+def measure_mcf(graph, target_flow, metrics=None):
+    """Runs MCF on a graph, provided a target flow, and returns the total cost and the execution time"""
+    start_mcf = time.perf_counter()
+    total_cost = min_cost_flow(graph, target_flow, tracer=NULL_TRACER, metrics=metrics)
+    end_mcf = time.perf_counter()
+    return total_cost, (end_mcf - start_mcf)
 
-def save_execution_time_data(execution_time_data: dict, path_to_file) -> None:
-    # Write to file
-    new_file_path = path_to_file
-    while os.path.exists(new_file_path):
-        new_file_path = "execution_trace_" + str(int(new_file_path[-5])+1) + ".txt"
-    
-    with open(new_file_path, "w") as f:
-        f.write(str(execution_time_data))
+def measure_mcf_cs(graph, target_flow, metrics=None):
+    """Runs cost scaling MCF on a graph, provided a target flow, and returns the total cost and the execution time"""
+    start_mcf = time.perf_counter()
+    total_cost = min_cost_flow_cost_scaling(graph, target_flow, tracer=NULL_TRACER, metrics=metrics)
+    end_mcf = time.perf_counter()
+    return total_cost, (end_mcf - start_mcf)
 
+# Max flow solvers timed by the benchmark, which must all find the same flow value
+MAX_FLOW_MEASURES = {"ff": measure_ff, "pr": measure_pr, "pr_fifo": measure_pr_fifo, "dinic": measure_dinic}
+MIN_COST_MEASURES = {"mcf": measure_mcf, "mcf_cs": measure_mcf_cs}
+ALGORITHMS = list(MAX_FLOW_MEASURES) + list(MIN_COST_MEASURES)
 
+def repeat_measure(measure, graph, repeats = 3, warmup = 1):
+    """
+        Runs a measure function warmup times (at least once) without recording it, then repeats
+        times, each time on the graph reset to an empty flow outside of the timed section. The first
+        untimed run is traced by tracemalloc, which slows it down, to find the peak memory the
+        algorithm allocates on top of the graph.
 
+        Returns: the result of the last run, the list of recorded execution times and the peak memory in bytes
+    """
+    graph.reset()
+    tracemalloc.start()
+    try:
+        measure(graph)
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    for _ in range(warmup - 1):
+        graph.reset()
+        measure(graph)
+    times = []
+    for _ in range(repeats):
+        graph.reset()
+        result, theta = measure(graph)
+        times.append(theta)
+    return result, times, peak_memory
 
-# Juste pour les tests
-t1 = time.time()
+### Saving stuff ###
 
-time_results = generate_execution_time_data([10, 50, 100], 100)
-save_execution_time_data(time_results, "execution_trace_0.txt")
+def job_seed(base_seed: int, size: int, run: int) -> int:
+    """Deterministic seed of the run-th random instance of size n, independent of how jobs are scheduled"""
+    return random.Random(f"{base_seed}-{size}-{run}").getrandbits(32)
 
-t2 = time.time()
-print(f"whole process lasted {t2-t1}s")
+def run_benchmark_job(size: int, run: int, seed: int, repeats: int = 3, warmup: int = 1, family: str = "dense", backend: str = "list",
+                      collect_metrics: bool = False, algorithms: list[str] = None) -> dict:
+    """
+        Generates the random instance of a (size, seed) job and times every algorithm on it, each on
+        a freshly reset graph, keeping the minimum and the median of the repeated timings. The flow
+        each algorithm leaves is checked (see certificate.py), and so is the agreement of the solvers:
+        a wrong run gives a record with the error and what each solver found, and no timings.
+        Only the job tuple crosses to the worker process: the instance is drawn again there from its
+        seed, and the record sent back only holds numbers, strings, and lists or dicts of them.
+
+        Args:
+            family: the network family of the instance (see generators.FAMILIES)
+            backend: "list" to solve a Graphic, "sparse" to solve a SparseGraphic
+            collect_metrics: whether to add the operation counts and phase times of each algorithm
+                (metrics_<algorithm>), measured on one more run so that the timings are not affected
+            algorithms: the algorithms to time, all of ALGORITHMS if None
+    """
+    algorithms = algorithms or ALGORITHMS
+    n, arcs = generate(family, size, seed)
+    graph = to_sparse_graphic(n, arcs) if backend == "sparse" else to_graphic(n, arcs)
+    record = {"n": size, "run": run, "seed": seed, "family": family, "backend": backend, "generator": GENERATOR_VERSION,
+              "algorithms": algorithms, "vertices": n, "arcs": len(arcs)}
+
+    flows, costs = {}, {}
+    target_flow = None
+    max_flow_measures = {algorithm: measure for algorithm, measure in MAX_FLOW_MEASURES.items() if algorithm in algorithms}
+    target_measures = {algorithm: (lambda graph, metrics=None, measure=measure: measure(graph, target_flow, metrics))
+                       for algorithm, measure in MIN_COST_MEASURES.items() if algorithm in algorithms}
+    try:
+        for algorithm, measure in max_flow_measures.items():
+            flows[algorithm], times, record["memory_" + algorithm] = repeat_measure(measure, graph, repeats, warmup)
+            check_max_flow(graph, flows[algorithm])  # The flow of the last run must be a maximum flow
+            record["theta_" + algorithm] = min(times)
+            record["theta_" + algorithm + "_median"] = statistics.median(times)
+
+        # A solver that disagrees is wrong, and so would be its timings
+        if len(set(flows.values())) > 1:
+            raise ValueError(f"Max flow solvers disagree for n = {size}, seed = {seed}: {flows}")
+        if flows:
+            record["max_flow"] = next(iter(flows.values()))
+        else:  # The min cost flows still need the max flow for their target
+            graph.reset()
+            record["max_flow"] = dinic(graph, tracer=NULL_TRACER)
+
+        target_flow = record["max_flow"] // 2
+        for algorithm, measure in target_measures.items():
+            costs[algorithm], times, record["memory_" + algorithm] = repeat_measure(measure, graph, repeats, warmup)
+            check_min_cost_flow(graph, target_flow, costs[algorithm])
+            record["theta_" + algorithm] = min(times)
+            record["theta_" + algorithm + "_median"] = statistics.median(times)
+        if len(set(costs.values())) > 1:
+            raise ValueError(f"Min cost flow solvers disagree for n = {size}, seed = {seed}: {costs}")
+        record["cost"] = next(iter(costs.values()), None)
+    except ValueError as error:  # One wrong run must not stop the benchmark, and its timings are not kept
+        record = {key: value for key, value in record.items() if not key.startswith(("theta_", "memory_"))}
+        record.update(error=f"{type(error).__name__}: {error}", results={**flows, **costs})
+        return record
+
+    if collect_metrics:
+        for algorithm, measure in [*max_flow_measures.items(), *target_measures.items()]:
+            metrics = Metrics()
+            graph.reset()
+            measure(graph, metrics)
+            record["metrics_" + algorithm] = metrics.as_dict()
+    return record
+
+def job_runs(record) -> list[dict]:
+    """Splits the record of a benchmark job into the runs of its algorithms, as stored by result_store"""
+    if record.get("error"):
+        return [{"algorithm": algorithm, "n": record["n"], "seed": record["seed"], "run": record["run"],
+                 "family": record["family"], "backend": record["backend"], "generator": record["generator"],
+                 "result": record.get("results", {}).get(algorithm), "error": record["error"]}
+                for algorithm in record["algorithms"]]
+    return [{"algorithm": algorithm, "n": record["n"], "m": record["arcs"], "vertices": record["vertices"],
+             "seed": record["seed"], "run": record["run"], "family": record["family"], "backend": record["backend"],
+             "generator": record["generator"],
+             "time": record["theta_" + algorithm], "time_median": record["theta_" + algorithm + "_median"],
+             "peak_memory": record["memory_" + algorithm],
+             "result": record["max_flow"] if algorithm in MAX_FLOW_MEASURES else record["cost"],
+             "counters": record.get("metrics_" + algorithm)}
+            for algorithm in record["algorithms"]]
+
+def read_completed_runs(stream_path) -> dict:
+    """
+        Reads the runs already stored in stream_path by a previous, possibly interrupted, benchmark,
+        gathered back into records of their (size, run) jobs
+    """
+    completed = {}
+    if stream_path and os.path.exists(stream_path):
+        for run in read_runs(stream_path):
+            if run.get("error"):  # Failed runs are tried again
+                continue
+            record = completed.setdefault((run["n"], run["run"]), {})
+            instance = (run["seed"], run["family"], run["backend"], run.get("generator"))
+            if (record.get("seed"), record.get("family"), record.get("backend"), record.get("generator")) != instance:
+                # A run of another instance of the same job: only the last instance counts
+                record.clear()
+                record.update(n=run["n"], run=run["run"], seed=run["seed"], family=run["family"], backend=run["backend"],
+                              generator=run.get("generator"))
+            record["theta_" + run["algorithm"]] = run["time"]
+            if run.get("counters") is not None:
+                record["metrics_" + run["algorithm"]] = run["counters"]
+    return completed
+
+def generate_execution_time_data(graph_sizes: list[int], nb_runs = 100, workers = None, base_seed = 0, stream_path = None, repeats = 3, warmup = 1,
+                                 family = "dense", backend = "list", collect_metrics = False, algorithms = None) -> dict:
+    """
+        Times the algorithms on nb_runs random instances of each size, distributing the (size, seed)
+        jobs over a pool of worker processes.
+
+        Every finished job is appended to the result store stream_path (one JSON record per algorithm,
+        see result_store.py) as soon as it comes back, and runs already present in that file (with the
+        same seed and generator version) are not computed again: an interrupted benchmark resumes where it stopped. A job
+        that fails, or that a broken pool never ran, is stored as an error record and the others go
+        on. Results are ordered by run index, so they do not depend on workers.
+
+        Args:
+            graph_sizes: the sizes n to benchmark
+            nb_runs: the number of random instances per size
+            workers: the number of worker processes (None for one per CPU)
+            base_seed: the seed from which every instance seed is derived
+            stream_path: the result store where runs are appended, or None
+            repeats: the number of timed runs of each algorithm on each instance (min and median are kept)
+            warmup: the number of untimed runs of each algorithm before them
+            family: the network family of the instances (see generators.FAMILIES)
+            backend: "list" (Graphic) or "sparse" (SparseGraphic), the latter for large sparse families
+            collect_metrics: whether the runs also record the operation counts and phase times of
+                every algorithm (see run_benchmark_job)
+            algorithms: the algorithms to time, all of ALGORITHMS if None
+    """
+    algorithms = algorithms or ALGORITHMS
+    completed = read_completed_runs(stream_path)
+    jobs = [(size, run, job_seed(base_seed, size, run)) for size in graph_sizes for run in range(nb_runs)]
+    def is_done(job):
+        record = completed.get((job[0], job[1]), {})
+        instance = (record.get("seed"), record.get("family"), record.get("backend"), record.get("generator"))
+        return instance == (job[2], family, backend, GENERATOR_VERSION) \
+            and all("theta_" + algorithm in record and (not collect_metrics or "metrics_" + algorithm in record)
+                    for algorithm in algorithms)
+    pending = [job for job in jobs if not is_done(job)]
+    if len(pending) < len(jobs):
+        print(f"Resuming: {len(jobs) - len(pending)} runs already done")
+
+    executor = ProcessPoolExecutor(max_workers=workers)
+    failures = 0
+    try:
+        futures = {executor.submit(run_benchmark_job, *job, repeats, warmup, family, backend, collect_metrics, algorithms): job for job in pending}
+        for done, future in enumerate(as_completed(futures), start=1):
+            try:
+                record = future.result()
+            except Exception as error:  # Also BrokenProcessPool, raised by every job left when a worker dies
+                size, run, seed = futures[future]
+                record = {"n": size, "run": run, "seed": seed, "family": family, "backend": backend,
+                          "generator": GENERATOR_VERSION, "algorithms": algorithms, "error": f"{type(error).__name__}: {error}"}
+            if record.get("error"):
+                failures += 1
+                print(f"Run {record['run']} of n = {record['n']} failed: {record['error']}")
+            else:
+                completed[(record["n"], record["run"])] = record
+            if stream_path:
+                append_runs(stream_path, job_runs(record))
+            if done % max(1, len(pending) // 20) == 0 or done == len(pending):
+                print(f"{done}/{len(pending)} runs done")
+    except KeyboardInterrupt:
+        print("Interrupted: keeping the runs completed so far")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    if failures:
+        print(f"{failures} runs failed, they will be tried again on resume")
+
+    results = {size: {"thetas_" + algorithm: [] for algorithm in algorithms} for size in graph_sizes}
+    for job in jobs:  # In run order
+        if is_done(job):
+            record = completed[(job[0], job[1])]
+            for algorithm in algorithms:
+                results[job[0]]["thetas_" + algorithm].append(record["theta_" + algorithm])
+    return results
 
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Times the flow algorithms on random propositions.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 100], help="sizes n to benchmark")
+    parser.add_argument("--runs", type=int, default=100, help="random instances per size")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--seed", type=int, default=0, help="base seed of the random instances")
+    parser.add_argument("--stream", default="benchmark_runs.jsonl", help="result store where finished runs are appended")
+    parser.add_argument("--repeats", type=int, default=3, help="timed runs of each algorithm per instance")
+    parser.add_argument("--warmup", type=int, default=1, help="untimed runs of each algorithm per instance (at least one, which measures memory)")
+    parser.add_argument("--family", choices=FAMILIES, default="dense", help="network family of the random instances")
+    parser.add_argument("--backend", choices=["list", "sparse"], default="list", help="graph representation given to the solvers")
+    parser.add_argument("--metrics", action="store_true", help="also record operation counts and phase times in the stream")
+    parser.add_argument("-a", "--algorithms", nargs="+", choices=ALGORITHMS, default=ALGORITHMS, help="algorithms to time (all by default)")
+    args = parser.parse_args()
+
+    t1 = time.time()
+
+    generate_execution_time_data(args.sizes, args.runs, args.workers, args.seed, args.stream, args.repeats, args.warmup, args.family, args.backend, args.metrics, args.algorithms)
+    print(f"Runs stored in {args.stream}, see plot_complexity.py")
+
+    t2 = time.time()
+    print(f"whole process lasted {t2-t1}s")
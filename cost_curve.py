@@ -0,0 +1,138 @@
+import sys
+from bisect import bisect_left
+from algorithms import min_cost_flow
+from graph import SparseGraphic
+from tracing import make_tracer
+
+
+class _BreakpointTracer:
+    """
+        Tracer given to min_cost_flow by CostCurve: it records every augmentation as a breakpoint of
+        the curve and forwards all the events to the tracer of the curve, with the flow and cost
+        counted from zero flow instead of from the start of the current extension.
+    """
+
+    def __init__(self, curve, tracer):
+        self.curve = curve
+        self.tracer = tracer
+        self.enabled = tracer.enabled
+        self.base_flow = curve.flow
+        self.base_cost = curve.total_cost
+
+    def __getattr__(self, name):
+        return getattr(self.tracer, name)
+
+    def augmentation(self, path_flow, flow, total_cost):
+        self.curve._add_breakpoint(path_flow, self.base_flow + flow, self.base_cost + total_cost)
+        self.tracer.augmentation(path_flow, self.base_flow + flow, self.base_cost + total_cost)
+
+
+class CostCurve:
+    """
+        Minimum cost as a function of the flow value, for one graph. Successive shortest paths push
+        flow along paths of non-decreasing cost, so the cost is piecewise linear in the flow: each
+        augmentation is a segment whose slope is the unit cost of its path.
+
+        The curve is built by running min_cost_flow on the graph, and extended on demand: asking for
+        a flow higher than the current one resumes from the flow already in the graph instead of
+        starting over. After an extension, the graph holds the flow of the last target reached.
+
+        Attributes:
+            flows (list): Flow value at each breakpoint, starting with 0.
+            costs (list): Minimum cost at each breakpoint.
+            slopes (list): Unit cost of the segment starting at each breakpoint.
+            complete (bool): Whether the maximum flow has been reached.
+    """
+
+    def __init__(self, graph, shortest_path="spfa", output=sys.stdout, verbose_mode=False, tracer=None):
+        """
+            Args:
+                graph: A Graphic or a SparseGraphic with costs, without any flow yet.
+                shortest_path (str): Mode given to min_cost_flow, "spfa", "bellman_ford" or "dijkstra".
+                verbose_mode (bool): Whether each augmentation is traced to output.
+                tracer: Tracer receiving the events of every extension. Overrides output and
+                    verbose_mode when given.
+        """
+        if not graph.has_costs():
+            raise ValueError("A cost curve needs a graph with costs.")
+        self.graph = graph
+        self.shortest_path = shortest_path
+        self.tracer = make_tracer(tracer, output, verbose_mode)
+        self.flows = [0]
+        self.costs = [0]
+        self.slopes = []
+        self.complete = False
+
+    @property
+    def flow(self):
+        """Flow currently in the graph, i.e. the last breakpoint."""
+        return self.flows[-1]
+
+    @property
+    def total_cost(self):
+        """Cost of the flow currently in the graph."""
+        return self.costs[-1]
+
+    def _add_breakpoint(self, path_flow, flow, total_cost):
+        slope = (total_cost - self.costs[-1]) // path_flow
+        if self.slopes and self.slopes[-1] == slope:
+            # Same unit cost as the previous path: the segment goes on
+            self.flows[-1] = flow
+            self.costs[-1] = total_cost
+        else:
+            self.slopes.append(slope)
+            self.flows.append(flow)
+            self.costs.append(total_cost)
+
+    def _source_capacity(self):
+        """Upper bound of the maximum flow: the capacity leaving the source."""
+        if isinstance(self.graph, SparseGraphic):
+            return sum(self.graph.capacity[e] for e in self.graph.adjacency[0])
+        return int(sum(self.graph.capacity[0]))
+
+    def extend(self, target_flow=None):
+        """
+            Pushes more flow in the graph, from the current flow up to target_flow, recording the
+            new breakpoints.
+
+            Args:
+                target_flow (int): Flow to reach, or None to go up to the maximum flow.
+
+            Returns:
+                int: The flow reached, lower than target_flow if it exceeds the maximum flow.
+        """
+        if target_flow is None:
+            target_flow = self._source_capacity()
+        if self.complete or target_flow <= self.flow:
+            return self.flow
+
+        tracer = _BreakpointTracer(self, self.tracer)
+        if min_cost_flow(self.graph, target_flow - self.flow, shortest_path=self.shortest_path, tracer=tracer) is None:
+            self.complete = True  # No path left: the flow is maximal
+        elif self.flow == self._source_capacity():
+            self.complete = True
+        return self.flow
+
+    def cost(self, flow_value):
+        """
+            Minimum cost of a flow of value flow_value, in O(log k) for k breakpoints once the curve
+            reaches it. The curve is extended first if needed.
+
+            Returns:
+                int or None: The minimum cost, or None if flow_value exceeds the maximum flow.
+        """
+        if flow_value < 0:
+            raise ValueError("The flow value must be non-negative.")
+        if flow_value > self.flow:
+            self.extend(flow_value)
+            if flow_value > self.flow:
+                return None
+
+        i = bisect_left(self.flows, flow_value)
+        if self.flows[i] == flow_value:
+            return self.costs[i]
+        return self.costs[i - 1] + (flow_value - self.flows[i - 1]) * self.slopes[i - 1]
+
+    def breakpoints(self):
+        """Lists the curve as (flow, cost) pairs."""
+        return list(zip(self.flows, self.costs))
@@ -1,53 +1,77 @@
-# naming conventions are: 
+# naming conventions are:
 
 # "Group B - Team 4 - Problem 5 - Ford-Fulkerson"
 # "“B4-trace5-FF.txt”"
+import argparse
+import io
 import os
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from algorithms import ford_fulkerson, push_relabel, min_cost_flow
+from graph import Graphic
+from tracing import NULL_TRACER
 
+ALGORITHMS = ["FF", "PR", "MIN"]
 
 
-PATH_TO_PROPOSITIONS = r"Propositions"
+def trace_name(proposition_file, algo):
+    """Returns the name of the trace of an algorithm on a proposition, e.g. INT1_5-trace3-FF.txt."""
+    stem = os.path.splitext(os.path.basename(proposition_file))[0]
+    match = re.fullmatch(r"Proposition (\d+)", stem)
+    return f"INT1_5-trace{match.group(1) if match else stem}-{algo}.txt"
 
-propositions = os.listdir(PATH_TO_PROPOSITIONS)
-algorithms = ["FF", "PR", "MCF"]
+def generate_trace(proposition_file, algo, output_dir):
+    """
+        Writes the trace of one algorithm on one proposition. Every trace starts from a freshly read
+        graph, and is built in memory then written in a single write.
 
-try:
-    os.chdir("traces")
-except:
-    os.mkdir("traces")
-    os.chdir("traces")
+        Returns:
+            str: The path of the trace written.
+    """
+    graph = Graphic.read_graph(proposition_file)
+    trace = io.StringIO()
+    graph.display(trace)
+    match algo:
+        case "FF":
+            max_flow = ford_fulkerson(graph, output=trace)
+            graph.display_flow(output=trace)
+            trace.write(f"Value of max flow = {max_flow}")
+        case "PR":
+            max_flow = push_relabel(graph, output=trace)
+            trace.write(f"value of max flow = {max_flow}")
+        case "MIN":
+            if graph.has_costs():
+                max_flow = ford_fulkerson(graph, tracer=NULL_TRACER)
+                graph.reset()
+                min_cost_flow(graph, max_flow, output=trace)
+            else:
+                trace.write("MIN does not apply here")
 
+    path = os.path.join(output_dir, trace_name(proposition_file, algo))
+    with open(path, "w", encoding="utf8") as file:
+        file.write(trace.getvalue())
+    return path
 
-from algorithms import ford_fulkerson, push_relabel, min_cost_flow
+def generate_traces(input_dir="Propositions", output_dir="traces", algorithms=ALGORITHMS, workers=None):
+    """
+        Writes the traces of every algorithm on every proposition of input_dir into output_dir, one
+        (proposition, algorithm) pair per job over a pool of worker processes.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    propositions = sorted(os.path.join(input_dir, name) for name in os.listdir(input_dir) if name.endswith(".txt"))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(generate_trace, proposition, algo, output_dir)
+                   for proposition in propositions for algo in algorithms]
+        for future in as_completed(futures):
+            print(future.result())
 
-from graph import Graphic
 
-os.chdir("../Propositions")
-
-for i in range(1,11):
-    # open the graph
-    graph = Graphic(0)
-    graph = Graphic.read_graph(f"Proposition {i}.txt")
-
-    for algo in ["FF", "PR", "MIN"]:
-        with open(os.path.join("../traces/", f"INT1_5-trace{i}-{algo}.txt"), "w", encoding="utf8") as trace:
-            graph.display(trace)
-            match algo:
-                case "FF":
-                    max_flow = ford_fulkerson(graph, output=trace)
-                    graph.display_flow(output=trace)
-                    trace.write(f"Value of max flow = {max_flow}")
-                case "PR":
-                    max_flow = push_relabel(graph, output=trace)
-                    trace.write(f"value of max flow = {max_flow}")
-                case "MIN":
-                    if i > 5:
-                        min_cost_flow(graph, max_flow, output=trace)
-                    else:
-                        trace.write("MIN does not apply here")
-            
-        
-            
-
-        
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Writes the traces of the algorithms on every proposition.")
+    parser.add_argument("-i", "--input", default="Propositions", help="folder of the proposition files")
+    parser.add_argument("-o", "--output", default="traces", help="folder where the traces are written")
+    parser.add_argument("-a", "--algorithms", nargs="+", choices=ALGORITHMS, default=ALGORITHMS, help="algorithms to trace")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (one per CPU by default)")
+    args = parser.parse_args()
 
+    generate_traces(args.input, args.output, args.algorithms, args.workers)
@@ -0,0 +1,225 @@
+import argparse
+import random
+from graph import Graphic, SparseGraphic
+
+# Every family returns the number of vertices and the list of its arcs as (u, v, capacity, cost)
+# tuples, with the source 0 and the sink n - 1. There is at most one arc between two vertices, no
+# self loop and no arc leaving the sink, so that any instance fits in the matrix format. Arcs are
+# drawn in O(m), never by going through the n² pairs of vertices.
+
+# Version of the instances the families draw for a given seed, to bump whenever one of them draws
+# differently, so that a benchmark never resumes runs made on other instances (see complexity.py).
+# Version 1 was the original dense generator, which went through the n² pairs of vertices.
+GENERATOR_VERSION = 2
+
+
+def random_arcs(n, m, rng, max_capacity=100, max_cost=100):
+    """
+        Draws m distinct arcs uniformly among the (n - 1)² arcs that do not leave the sink and are not
+        loops, in O(m): random.sample picks distinct indices of a range without building it.
+    """
+    m = min(m, (n - 1) ** 2)
+    arcs = []
+    for index in rng.sample(range((n - 1) ** 2), m):
+        u, v = divmod(index, n - 1)
+        if v >= u:
+            v += 1  # Skipping the loop (u, u)
+        arcs.append((u, v, rng.randint(1, max_capacity), rng.randint(1, max_cost)))
+    return n, arcs
+
+def dense_family(n, rng, density=0.5, max_capacity=100, max_cost=100):
+    """Uniform random graph with density·n² arcs, the family of the original benchmark."""
+    return random_arcs(n, int(density * n * n), rng, max_capacity, max_cost)
+
+def sparse_family(n, rng, degree=4, max_capacity=100, max_cost=100):
+    """Uniform random graph with degree·n arcs."""
+    return random_arcs(n, degree * n, rng, max_capacity, max_cost)
+
+def grid_family(n, rng, max_capacity=100, max_cost=100):
+    """
+        Square grid of about n - 2 vertices, with arcs going right, up and down. The source feeds the
+        first column and the last column feeds the sink.
+    """
+    side = max(1, int((n - 2) ** 0.5))
+    n = side * side + 2
+    vertex = lambda row, column: 1 + row * side + column
+    arcs = []
+    for row in range(side):
+        arcs.append((0, vertex(row, 0), rng.randint(1, max_capacity), 0))
+        arcs.append((vertex(row, side - 1), n - 1, rng.randint(1, max_capacity), 0))
+        for column in range(side):
+            u = vertex(row, column)
+            neighbours = []
+            if column + 1 < side:
+                neighbours.append(vertex(row, column + 1))
+            if row > 0:
+                neighbours.append(vertex(row - 1, column))
+            if row + 1 < side:
+                neighbours.append(vertex(row + 1, column))
+            for v in neighbours:
+                arcs.append((u, v, rng.randint(1, max_capacity), rng.randint(1, max_cost)))
+    return n, arcs
+
+def layered_family(n, rng, layers=None, degree=3, max_capacity=100, max_cost=100):
+    """
+        Acyclic graph of layers of equal width: the source feeds the first layer, every vertex has
+        degree arcs to random vertices of the next layer, and the last layer feeds the sink.
+    """
+    layers = layers or max(1, int((n - 2) ** 0.5))
+    width = max(1, (n - 2) // layers)
+    n = layers * width + 2
+    degree = min(degree, width)
+    arcs = []
+    for i in range(width):
+        arcs.append((0, 1 + i, rng.randint(1, max_capacity), 0))
+        arcs.append((1 + (layers - 1) * width + i, n - 1, rng.randint(1, max_capacity), 0))
+    for layer in range(layers - 1):
+        first = 1 + layer * width
+        for u in range(first, first + width):
+            for v in rng.sample(range(first + width, first + 2 * width), degree):
+                arcs.append((u, v, rng.randint(1, max_capacity), rng.randint(1, max_cost)))
+    return n, arcs
+
+def bipartite_family(n, rng, degree=4, max_cost=100):
+    """
+        Assignment problem: (n - 2) / 2 workers and as many jobs, each worker able to do degree random
+        jobs at a random cost. Every arc has capacity 1, so a min cost max flow is a min cost assignment.
+    """
+    k = max(1, (n - 2) // 2)
+    n = 2 * k + 2
+    degree = min(degree, k)
+    arcs = []
+    for i in range(k):
+        arcs.append((0, 1 + i, 1, 0))
+        arcs.append((1 + k + i, n - 1, 1, 0))
+        for j in rng.sample(range(k), degree):
+            arcs.append((1 + i, 1 + k + j, 1, rng.randint(1, max_cost)))
+    return n, arcs
+
+def ak_family(n, rng, max_cost=100):
+    """
+        Hard instance in the spirit of the AK networks of Cherkassky and Goldberg, built from two
+        chains of k vertices. In the first, the source enters at the head and every chain vertex has
+        a unit arc to the sink, so augmenting path algorithms and Dinic need one phase per exit, at
+        increasing distances. In the second, the source has a unit arc to every chain vertex and only
+        the tail reaches the sink, so Push-Relabel keeps relabeling the whole chain.
+        The random part is only the costs.
+    """
+    k = max(1, (n - 2) // 2)
+    n = 2 * k + 2
+    sink = n - 1
+    first = lambda i: 1 + i
+    second = lambda i: 1 + k + i
+    arcs = [(0, first(0), k, rng.randint(1, max_cost)), (second(k - 1), sink, k, rng.randint(1, max_cost))]
+    for i in range(k):
+        arcs.append((first(i), sink, 1, rng.randint(1, max_cost)))
+        arcs.append((0, second(i), 1, rng.randint(1, max_cost)))
+        if i + 1 < k:
+            arcs.append((first(i), first(i + 1), k - i - 1, rng.randint(1, max_cost)))
+            arcs.append((second(i), second(i + 1), i + 1, rng.randint(1, max_cost)))
+    return n, arcs
+
+FAMILIES = {
+    "dense": dense_family,
+    "sparse": sparse_family,
+    "grid": grid_family,
+    "layered": layered_family,
+    "bipartite": bipartite_family,
+    "ak": ak_family,
+}
+
+def generate(family, n, seed=None, **parameters):
+    """
+        Generates an instance of a family. The same (family, n, seed, parameters) always gives the
+        same instance.
+
+        Args:
+            family (str): One of FAMILIES.
+            n (int): Requested number of vertices. Grid, layered, bipartite and AK instances round it
+                to fit their shape.
+            seed: Seed of the random generator.
+            parameters: Parameters of the family function, e.g. degree or max_capacity.
+
+        Returns:
+            tuple: (n, arcs), the actual number of vertices and the (u, v, capacity, cost) arcs.
+    """
+    if family not in FAMILIES:
+        raise ValueError(f"Unknown family {family}, expected one of {', '.join(FAMILIES)}.")
+    if n < 2:
+        raise ValueError("An instance needs at least a source and a sink.")
+    return FAMILIES[family](n, random.Random(seed), **parameters)
+
+
+### Conversions ###
+
+def to_matrices(n, arcs):
+    """Returns the capacity and cost matrices of an instance."""
+    capacity_matrix = [[0] * n for _ in range(n)]
+    cost_matrix = [[0] * n for _ in range(n)]
+    for u, v, capacity, cost in arcs:
+        capacity_matrix[u][v] = capacity
+        cost_matrix[u][v] = cost
+    return capacity_matrix, cost_matrix
+
+def to_graphic(n, arcs):
+    """Builds a Graphic from an instance."""
+    graph = Graphic(n)
+    graph.capacity, graph.cost = to_matrices(n, arcs)
+    graph.residual = [row[:] for row in graph.capacity]
+    return graph
+
+def to_sparse_graphic(n, arcs):
+    """Builds a SparseGraphic from an instance, in O(n + m)."""
+    graph = SparseGraphic(n)
+    for u, v, capacity, cost in arcs:
+        graph.add_edge(u, v, capacity, cost)
+    return graph
+
+
+### Writing instances ###
+
+def write_matrix(filename, n, arcs, with_costs=True):
+    """
+        Writes an instance in the proposition format, one row at a time, so that only one row of the
+        matrices is ever in memory.
+    """
+    rows = [[] for _ in range(n)]
+    for arc in arcs:
+        rows[arc[0]].append(arc)
+    with open(filename, "w") as file:
+        file.write(f"{n}\n")
+        for column in ([2, 3] if with_costs else [2]):
+            for u in range(n):
+                row = [0] * n
+                for arc in rows[u]:
+                    row[arc[1]] = arc[column]
+                file.write(' '.join(map(str, row)) + '\n')
+    return filename
+
+def write_edge_list(filename, n, arcs):
+    """
+        Writes an instance as an edge list: "n m" on the first line, then one "u v capacity cost"
+        line per arc. The file size grows with m instead of n².
+    """
+    with open(filename, "w") as file:
+        file.write(f"{n} {len(arcs)}\n")
+        file.writelines(f"{u} {v} {capacity} {cost}\n" for u, v, capacity, cost in arcs)
+    return filename
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Writes a seeded random instance of a network family.")
+    parser.add_argument("family", choices=FAMILIES, help="network family")
+    parser.add_argument("n", type=int, help="number of vertices (rounded by some families)")
+    parser.add_argument("output", help="file to write")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random generator")
+    parser.add_argument("--format", choices=["matrix", "edges"], default="matrix", help="proposition matrix or edge list")
+    parser.add_argument("--no-costs", action="store_true", help="write the capacity matrix only (matrix format)")
+    args = parser.parse_args()
+
+    n, arcs = generate(args.family, args.n, args.seed)
+    if args.format == "edges":
+        write_edge_list(args.output, n, arcs)
+    else:
+        write_matrix(args.output, n, arcs, with_costs=not args.no_costs)
+    print(f"{args.output}: {args.family} instance with {n} vertices and {len(arcs)} arcs")
@@ -0,0 +1,194 @@
+import argparse
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from graph import SparseGraphic
+from algorithms import dinic
+from tracing import NULL_TRACER
+from utils import annotate_matrix, print_matrix, is_array
+
+
+def undirected_edges(graph):
+    """
+        Lists the edges of the undirected view of a graph, where u and v are linked by the sum of the
+        capacities of u → v and v → u.
+
+        Args:
+            graph: A Graphic or a SparseGraphic.
+
+        Returns:
+            list: (u, v, capacity) triplets with u < v and a positive capacity.
+    """
+    n = graph.n
+    capacities = {}
+    if isinstance(graph, SparseGraphic):
+        arcs = ((graph.head[e + 1], graph.head[e], graph.capacity[e]) for e in range(0, len(graph.head), 2))
+    else:
+        capacity = graph.capacity.tolist() if is_array(graph.capacity) else graph.capacity
+        arcs = ((u, v, capacity[u][v]) for u in range(n) for v in range(n) if capacity[u][v] > 0)
+    for u, v, c in arcs:
+        if u != v and c > 0:
+            pair = (min(u, v), max(u, v))
+            capacities[pair] = capacities.get(pair, 0) + c
+    return [(u, v, c) for (u, v), c in capacities.items()]
+
+def min_cut(n, edges, s, t):
+    """
+        Computes a minimum s-t cut of an undirected graph with Dinic, on a SparseGraphic whose
+        vertices are renumbered so that s is the source and t the sink. The workers of GomoryHuTree
+        receive the edge list once through the pool initializer, each job then only carries s and t.
+
+        Returns:
+            tuple: (value of the cut, sorted list of the vertices on the side of s)
+    """
+    order = [s] + [x for x in range(n) if x not in (s, t)] + [t]
+    label = [0] * n
+    for index, x in enumerate(order):
+        label[x] = index
+
+    network = SparseGraphic(n)
+    network.cost = None
+    for u, v, c in edges:
+        e = network.add_edge(label[u], label[v], c)
+        # An undirected edge is an arc pair where both directions have the capacity
+        network.capacity[e + 1] = c
+        network.residual[e + 1] = c
+    value = dinic(network, tracer=NULL_TRACER)
+
+    # The side of s is what the residual graph still reaches from it
+    reached = [False] * n
+    reached[0] = True
+    queue = deque([0])
+    while queue:
+        u = queue.popleft()
+        for e in network.adjacency[u]:
+            if network.residual[e] > 0 and not reached[network.head[e]]:
+                reached[network.head[e]] = True
+                queue.append(network.head[e])
+    return value, sorted(order[x] for x in range(n) if reached[x])
+
+_instance = None  # (n, edges) of the worker processes, sent once instead of with every job
+
+def _set_instance(n, edges):
+    global _instance
+    _instance = (n, edges)
+
+def _min_cut_job(s, t):
+    return min_cut(*_instance, s, t)
+
+
+class GomoryHuTree:
+    """
+        Gusfield's equivalent flow tree of the undirected view of a graph (see undirected_edges): a
+        tree on the same vertices where the min cut between any two vertices is the lightest edge of
+        the path between them, built with n - 1 max flows instead of one per pair.
+
+        Vertex i > 0 is linked to parent[i] by an edge of weight weight[i]. The max flow of vertex i
+        is against the parent it has once the vertices before it are done, so the flows depend on one
+        another; they are computed speculatively in batches over a pool of worker processes, with the
+        parents known at that time, and the few whose parent changed in between are computed again.
+        The tree is the same as the one of the sequential algorithm.
+    """
+
+    def __init__(self, graph, workers=None, batch_size=None):
+        """
+            Args:
+                graph: A Graphic or a SparseGraphic.
+                workers (int): Number of worker processes, one per CPU if None. With 1, the flows
+                    are computed in this process, one at a time.
+                batch_size (int): Number of flows started at once, 4 per worker by default.
+        """
+        self.n = n = graph.n
+        edges = undirected_edges(graph)
+        self.parent = [0] * n
+        self.weight = [0] * n
+        self.flows = 0  # Max flows computed, speculative ones included
+
+        cuts = {}
+        workers = workers or os.cpu_count() or 1
+        executor = ProcessPoolExecutor(workers, initializer=_set_instance, initargs=(n, edges)) if workers > 1 else None
+        batch_size = batch_size or (4 * workers if executor else 1)
+        try:
+            s = 1
+            while s < n:
+                # Starting the flows of the next vertices with the parents they have so far
+                pairs = [(i, self.parent[i]) for i in range(s, n) if (i, self.parent[i]) not in cuts][:batch_size]
+                if executor:
+                    results = executor.map(_min_cut_job, *zip(*pairs))
+                else:
+                    results = (min_cut(n, edges, i, t) for i, t in pairs)
+                for pair, result in zip(pairs, results):
+                    cuts[pair] = result
+                self.flows += len(pairs)
+
+                # Going on with the vertices whose flow is against their actual parent
+                while s < n and (s, self.parent[s]) in cuts:
+                    t = self.parent[s]
+                    value, side = cuts[(s, t)]
+                    self.weight[s] = value
+                    for i in side:
+                        if i > s and self.parent[i] == t:
+                            self.parent[i] = s
+                    s += 1
+        finally:
+            if executor:
+                executor.shutdown()
+
+        self.depth = [0] * n
+        for i in range(1, n):  # A parent always comes before its children
+            self.depth[i] = self.depth[self.parent[i]] + 1
+
+    def min_cut(self, u, v):
+        """Returns the value of the minimum cut between u and v of the undirected graph, in O(n)."""
+        if u == v:
+            raise ValueError("A cut needs two different vertices.")
+        value = float('inf')
+        while u != v:
+            if self.depth[u] < self.depth[v]:
+                u, v = v, u
+            value = min(value, self.weight[u])
+            u = self.parent[u]
+        return value
+
+    def edges(self):
+        """Lists the edges of the tree as (vertex, parent, weight) triplets."""
+        return [(i, self.parent[i], self.weight[i]) for i in range(1, self.n)]
+
+    def all_pairs(self):
+        """
+            Returns the matrix of the minimum cut values between every two vertices, in O(n²) by
+            walking the tree from every vertex.
+        """
+        n = self.n
+        neighbours = [[] for _ in range(n)]
+        for i, p, w in self.edges():
+            neighbours[i].append((p, w))
+            neighbours[p].append((i, w))
+        matrix = [[0] * n for _ in range(n)]
+        for u in range(n):
+            row = matrix[u]
+            seen = [False] * n
+            seen[u] = True
+            stack = [(u, float('inf'))]
+            while stack:
+                x, value = stack.pop()
+                for y, w in neighbours[x]:
+                    if not seen[y]:
+                        seen[y] = True
+                        row[y] = min(value, w)
+                        stack.append((y, row[y]))
+        return matrix
+
+
+if __name__ == "__main__":
+    from batch import load_instance
+
+    parser = argparse.ArgumentParser(description="Builds the Gomory-Hu tree of the undirected view of an instance and prints its all-pairs min cuts.")
+    parser.add_argument("file", help="proposition, DIMACS or edge list file")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (one per CPU by default)")
+    args = parser.parse_args()
+
+    tree = GomoryHuTree(load_instance(args.file), workers=args.workers)
+    print(f"{tree.n - 1} tree edges from {tree.flows} max flows")
+    print_matrix(annotate_matrix(tree.all_pairs()), output_file=sys.stdout)
@@ -1,13 +1,125 @@
-from utils import print_matrix, annotate_matrix, bold
+from utils import print_matrix, annotate_matrix, bold, is_array, np
+from array import array
+from collections import deque
+import os
 import sys
 
+CACHE_SUFFIX = ".cache"
+CACHE_MAGIC = 0x4f5250524f51  # Marks the sidecar files written by load_matrix_values
+CACHE_TYPECODES = "bhiq"  # Integer types of the cached values, from the smallest
+
+def _read_cache(cache_path, stamp):
+    """Returns n and the values stored in a sidecar cache, or None if it is missing or outdated."""
+    try:
+        with open(cache_path, 'rb') as file:
+            header = array('q')
+            header.fromfile(file, 5)
+            magic, mtime, size, n, typecode = header
+            if [magic, mtime, size] != [CACHE_MAGIC, *stamp] or chr(typecode) not in CACHE_TYPECODES:
+                return None
+            values = array(chr(typecode))
+            values.frombytes(file.read())
+            return n, values
+    except (OSError, EOFError, ValueError):
+        return None
+
+def _write_cache(cache_path, stamp, n, rows):
+    """
+        Writes the rows of a matrix file to a sidecar cache, with the smallest integer type that
+        holds them, atomically so that a concurrent reader never sees half of it.
+    """
+    if is_array(rows):
+        low, high = int(rows.min(initial=0)), int(rows.max(initial=0))
+    else:
+        low, high = min(map(min, rows), default=0), max(map(max, rows), default=0)
+    for typecode in CACHE_TYPECODES:  # 'q' holds any value of an int64 matrix
+        bound = 2 ** (8 * array(typecode).itemsize - 1)
+        if -bound <= low and high < bound:
+            break
+    temporary_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary_path, 'wb') as file:
+            array('q', [CACHE_MAGIC, *stamp, n, ord(typecode)]).tofile(file)
+            if is_array(rows):
+                rows.astype(typecode).tofile(file)
+            else:
+                for row in rows:
+                    array(typecode, row).tofile(file)
+        os.replace(temporary_path, cache_path)
+    except OSError:
+        pass  # A read-only folder only means no cache
+
+def load_matrix_values(filename, cache=False, backend="list"):
+    """
+        Reads the matrices of a proposition file. The numpy backend parses the whole text at once
+        with numpy.fromstring; the list backend parses it line by line, each line going straight
+        into its row, so that no list of all the tokens is ever built.
+
+        Args:
+            filename (str): Path to the proposition file.
+            cache (bool): If True, the values are also stored in a binary sidecar file
+                (filename + ".cache"), keyed by the modification time and size of the file, from
+                which later loads of the same unchanged file are read directly.
+            backend (str): "list" or "numpy", see Graphic.
+
+        Returns:
+            tuple: (n, rows, has_costs), rows holding the n rows of the capacity matrix followed
+                by the n rows of the cost matrix if has_costs, as lists of ints for the list
+                backend and as a single int64 array for the numpy backend.
+    """
+    cached = None
+    if cache:
+        status = os.stat(filename)
+        stamp = (status.st_mtime_ns, status.st_size)
+        cached = _read_cache(filename + CACHE_SUFFIX, stamp)
+    if cached is not None:
+        n, values = cached
+        if backend == "numpy":
+            rows = np.frombuffer(values, dtype=values.typecode).astype(np.int64).reshape(-1, n)
+        else:
+            rows = [values[i:i + n].tolist() for i in range(0, len(values), n)]
+    elif backend == "numpy":
+        with open(filename, 'r') as file:
+            values = np.fromstring(file.read(), dtype=np.int64, sep=' ')
+        n = int(values[0])
+        if len(values) - 1 not in (n * n, 2 * n * n):
+            raise ValueError(f"{filename} holds {len(values) - 1} values, expected {n * n} or {2 * n * n} for n = {n}.")
+        rows = values[1:].reshape(-1, n)
+    else:
+        with open(filename, 'rb') as file:
+            n = int(file.readline())
+            rows = [list(map(int, line.split())) for line in file if not line.isspace()]
+        if any(len(row) != n for row in rows):
+            raise ValueError(f"{filename} has a row without exactly {n} values.")
+
+    if len(rows) not in (n, 2 * n):
+        raise ValueError(f"{filename} holds {len(rows)} rows, expected {n} or {2 * n} for n = {n}.")
+    if cache and cached is None:
+        _write_cache(filename + CACHE_SUFFIX, stamp, n, rows)
+    return n, rows, len(rows) == 2 * n
+
 class Graphic:
-    def __init__(self, n):
+    def __init__(self, n, backend="list"):
+        """
+            Args:
+                n (int): Number of vertices.
+                backend (str): "list" for nested Python lists, or "numpy" to store the four
+                    matrices as int64 arrays, on which bfs and bellman_ford run vectorized.
+        """
         self.n = n # Number of vertices
-        self.capacity = [[0] * n for _ in range(n)]
-        self.cost = [[0] * n for _ in range(n)]
-        self.residual = [[0] * n for _ in range(n)]
-        self.flow = [[0] * n for _ in range(n)]
+        self.backend = backend
+        if backend == "numpy":
+            if np is None:
+                raise ImportError("The numpy backend requires NumPy to be installed.")
+            self.capacity = np.zeros((n, n), dtype=np.int64)
+            self.cost = np.zeros((n, n), dtype=np.int64)
+            self.residual = np.zeros((n, n), dtype=np.int64)
+            self.flow = np.zeros((n, n), dtype=np.int64)
+        else:
+            self.capacity = [[0] * n for _ in range(n)]
+            self.cost = [[0] * n for _ in range(n)]
+            self.residual = [[0] * n for _ in range(n)]
+            self.flow = [[0] * n for _ in range(n)]
 
     # Checking if the graph has costs
     def has_costs(self):
@@ -36,10 +148,137 @@ class Graphic:
         self.capacity[u][v] = capacity
         self.residual[u][v] = capacity
 
+    def _copy_matrix(self, matrix):
+        """Copies a matrix row by row, which is all a matrix of numbers needs (no deepcopy)."""
+        return matrix.copy() if is_array(matrix) else [row[:] for row in matrix]
+
+    def snapshot(self):
+        """
+            Saves the state the solvers modify, i.e. the flow and residual matrices. Capacities and
+            costs are never modified by the solvers, so they are not copied.
+
+            Returns:
+                tuple: An opaque state to give back to restore.
+        """
+        return self._copy_matrix(self.flow), self._copy_matrix(self.residual)
+
+    def restore(self, state):
+        """
+            Puts the graph back in a state saved by snapshot. The state can be restored several times.
+        """
+        flow, residual = state
+        self.flow = self._copy_matrix(flow)
+        self.residual = self._copy_matrix(residual)
+
+    def reset(self):
+        """
+            Puts the graph back in its initial state: no flow, and a residual graph equal to the capacities.
+        """
+        self.residual = self._copy_matrix(self.capacity)
+        if is_array(self.flow):
+            self.flow = np.zeros_like(self.capacity)
+        else:
+            self.flow = [[0] * self.n for _ in range(self.n)]
+
+    def flow_value(self):
+        """Returns the value of the flow held by the graph, i.e. the net flow leaving the source."""
+        return int(sum(self.flow[0]))
+
+    def set_capacity(self, u, v, capacity):
+        """
+            Changes the capacity of the arc u → v of a graph that may hold a flow, keeping that flow
+            so that a max flow can be found again without starting over: ford_fulkerson and dinic
+            augment from the flow already in the graph, and return what they add to it.
+
+            Raising a capacity only adds residual capacity. Lowering it below the flow of the arc
+            takes the extra flow off, which leaves an excess at u and a deficit at v, repaired
+            locally: the excess is first rerouted to v along residual paths, which keeps the flow
+            value, and what can't be is sent back from u to the source and from the sink to v.
+
+            Args:
+                u (int): The tail of the arc.
+                v (int): The head of the arc.
+                capacity (int): The new capacity.
+
+            Returns:
+                int: How much the flow value dropped (0 if the flow could be rerouted).
+        """
+        if capacity < 0:
+            raise ValueError("A capacity can't be negative.")
+        if u == v:
+            raise ValueError("An arc can't be a loop.")
+        source, sink = 0, self.n - 1
+        value = self.flow_value()
+        self.residual[u][v] += capacity - self.capacity[u][v]
+        self.capacity[u][v] = capacity
+        excess = self.flow[u][v] - capacity
+        if excess <= 0:
+            return 0
+
+        # Taking the extra flow off the arc, which is left saturated
+        self.flow[u][v] -= excess
+        self.flow[v][u] += excess
+        self.residual[u][v] += excess
+        self.residual[v][u] -= excess
+
+        left = excess - self._send(u, v, excess)
+        if left:
+            # The source and the sink are the only vertices allowed an excess or a deficit
+            if u not in (source, sink):
+                self._send(u, source, left)
+            if v not in (source, sink):
+                self._send(sink, v, left)
+        return value - self.flow_value()
+
+    def _send(self, start, end, amount):
+        """
+            Sends up to amount units of flow from start to end along shortest residual paths.
+
+            Returns:
+                int: The amount sent, less than amount if the residual graph does not allow more.
+        """
+        n = self.n
+        sent = 0
+        while sent < amount:
+            parent = [-1] * n
+            parent[start] = start
+            queue = deque([start])
+            while queue and parent[end] == -1:
+                x = queue.popleft()
+                residual_row = self.residual[x]
+                for y in range(n):
+                    if parent[y] == -1 and residual_row[y] > 0:
+                        parent[y] = x
+                        queue.append(y)
+            if parent[end] == -1:
+                break
+
+            path_flow = amount - sent
+            y = end
+            while y != start:
+                path_flow = min(path_flow, self.residual[parent[y]][y])
+                y = parent[y]
+            y = end
+            while y != start:
+                x = parent[y]
+                self.residual[x][y] -= path_flow
+                self.residual[y][x] += path_flow
+                self.flow[x][y] += path_flow
+                self.flow[y][x] -= path_flow
+                y = x
+            sent += path_flow
+        return sent
+
+    def residual_arcs(self):
+        """
+            Lists the residual graph as (u, v, residual capacity) triplets.
+        """
+        residual = self.residual.tolist() if is_array(self.residual) else self.residual
+        return [(u, v, residual[u][v]) for u in range(self.n) for v in range(self.n) if residual[u][v] != 0]
 
     # Creates a graph from a txt file
     @classmethod
-    def read_graph(cls, filename):
+    def read_graph(cls, filename, backend="list", cache=False):
         """
             Reads a graph from a file. The file should contain:
             - The number of vertices in the first line.
@@ -48,35 +287,96 @@ class Graphic:
 
             Args:
                 filename (str): Path to the file from which the graph is to be read.
+                backend (str): "list" or "numpy", see Graphic.
+                cache (bool): If True, keep a binary copy of the file next to it, from which
+                    later loads are read without parsing (see load_matrix_values).
 
             Returns:
                 cls: An instance of the graph initialized with capacities and optional costs.
         """
-        with open(filename, 'r') as file:
-            # Reading the number of vertices
-            n = int(file.readline().strip())
-            
-            # Instantiating Graphic
-            graph = cls(n)
-            
-            # Reading the capacity matrix
-            for i in range(n):
-                row = list(map(int, file.readline().strip().split()))
-                graph.capacity[i] = row
-            
-            # Reads the n remaining lines, for the costs matrix if they exist
-            remaining_lines = file.readlines()
-            if len(remaining_lines) == n:
-                for i in range(n):
-                    row = list(map(int, remaining_lines[i].strip().split()))
-                    graph.cost[i] = row
-            else:
-                graph.cost = None  # There is no cost matrix
+        n, rows, has_costs = load_matrix_values(filename, cache, backend)
+        if backend == "numpy":
+            return cls._graph_from_array(n, rows, has_costs)
+
+        # Instantiating Graphic, without n×n matrices of zeros that would all be replaced but the flow
+        graph = cls(0)
+        graph.n = n
+        graph.flow = [[0] * n for _ in range(n)]
+
+        # The capacity matrix, and the costs matrix if it exists
+        graph.capacity = rows[:n]
+        graph.cost = rows[n:] if has_costs else None
 
         # Initializing the residual matrix so that it corresponds exactly to the capacity
         graph.residual = [row[:] for row in graph.capacity]
         return graph
 
+    @classmethod
+    def from_sparse(cls, sparse):
+        """
+            Builds the dense version of a SparseGraphic without flow. Parallel arcs are merged into
+            one arc with the sum of their capacities, which is only possible when they have the same
+            cost.
+
+            Raises:
+                ValueError: If two parallel arcs have different costs, which a cost matrix can't hold.
+        """
+        n = sparse.n
+        graph = cls(n)
+        if not sparse.has_costs():
+            graph.cost = None
+        for e in range(0, len(sparse.head), 2):
+            u, v = sparse.head[e + 1], sparse.head[e]
+            if sparse.capacity[e] == 0:
+                continue
+            if sparse.has_costs():
+                if graph.capacity[u][v] > 0 and graph.cost[u][v] != sparse.cost[e]:
+                    raise ValueError(f"The parallel arcs {u + 1} → {v + 1} have different costs "
+                                     f"({graph.cost[u][v]} and {sparse.cost[e]}): read the graph as a SparseGraphic.")
+                graph.cost[u][v] = sparse.cost[e]
+            graph.capacity[u][v] += sparse.capacity[e]
+        graph.residual = [row[:] for row in graph.capacity]
+        return graph
+
+    @classmethod
+    def read_dimacs(cls, filename):
+        """
+            Reads a DIMACS max flow or min cost flow file (see SparseGraphic.read_dimacs). The
+            matrices take O(n²) memory: large files should be read as a SparseGraphic.
+        """
+        return cls.from_sparse(SparseGraphic.read_dimacs(filename))
+
+    @classmethod
+    def read_edge_list(cls, filename):
+        """
+            Reads an edge list file (see SparseGraphic.read_edge_list). The matrices take O(n²)
+            memory: large files should be read as a SparseGraphic.
+        """
+        return cls.from_sparse(SparseGraphic.read_edge_list(filename))
+
+    def write_dimacs(self, filename, target_flow=None):
+        """Writes the graph in the DIMACS format (see SparseGraphic.write_dimacs)."""
+        return SparseGraphic.from_graphic(self).write_dimacs(filename, target_flow)
+
+    def write_edge_list(self, filename):
+        """Writes the graph as an edge list (see SparseGraphic.read_edge_list)."""
+        return SparseGraphic.from_graphic(self).write_edge_list(filename)
+
+    @classmethod
+    def _graph_from_array(cls, n, rows, has_costs):
+        """
+            Builds a numpy backed graph from the rows of load_matrix_values, the capacity and cost
+            matrices being views of them instead of copies.
+        """
+        # Instantiating Graphic without its n×n arrays of zeros, only the flow one would be kept
+        graph = cls(0, backend="numpy")
+        graph.n = n
+        graph.flow = np.zeros((n, n), dtype=np.int64)
+        graph.capacity = rows[:n]
+        graph.cost = rows[n:] if has_costs else None  # No cost matrix without its n rows
+        graph.residual = graph.capacity.copy()
+        return graph
+
     # Display of the flow matrix
     def display_flow(self, output=sys.stdout):
         """
@@ -104,7 +404,7 @@ class Graphic:
         annotated_capacity = annotate_matrix(self.capacity)
         print_matrix(annotated_capacity, output_file=output)
 
-        if self.cost:
+        if self.has_costs():
             if output != sys.stdout:
                 print(f"\nCOST MATRIX:", file=output)
             else:
@@ -122,3 +422,392 @@ class Graphic:
         annotated_residual = annotate_matrix(self.residual)
         print_matrix(annotated_residual)
 
+
+
+class SparseGraphic:
+    """
+        Sparse counterpart of Graphic, which only stores the arcs that actually exist.
+
+        Every arc u → v is stored as a pair of entries in flat arrays: the forward arc e
+        and its reverse arc e ^ 1 (v → u, capacity 0, opposite cost). The flow on an arc
+        is capacity[e] - residual[e], so it is skew-symmetric between e and e ^ 1.
+        Memory is O(n + m) and scanning the neighbours of a vertex is O(deg) instead of O(n).
+    """
+    def __init__(self, n):
+        self.n = n # Number of vertices
+        self.head = [] # head[e]: vertex the arc e points to
+        self.capacity = [] # capacity[e]: capacity of the arc e (0 for reverse arcs)
+        self.cost = [] # cost[e]: unit cost of the arc e (negated for reverse arcs)
+        self.residual = [] # residual[e]: residual capacity of the arc e
+        self.adjacency = [[] for _ in range(n)] # adjacency[u]: ids of the arcs leaving u
+        self.target_flow = None # Flow to send from the source to the sink, when the file gives one (DIMACS min)
+
+    # Checking if the graph has costs
+    def has_costs(self):
+        """
+            Checks whether the graph has associated arc costs.
+
+            Returns:
+                bool: True if costs exist, False otherwise.
+        """
+        return self.cost is not None
+
+    # Adding an edge with a given capacity (and cost) between vertices u and v
+    def add_edge(self, u, v, capacity, cost=0):
+        """
+            Adds a directed arc from vertex u to vertex v, along with its reverse arc.
+
+            Args:
+                u (int): The source vertex.
+                v (int): The destination vertex.
+                capacity (int): The capacity of the arc from u to v.
+                cost (int): The unit cost of the arc from u to v.
+
+            Returns:
+                int: The id of the forward arc (its reverse arc is id ^ 1).
+        """
+        e = len(self.head)
+        self.head += [v, u]
+        self.capacity += [capacity, 0]
+        self.residual += [capacity, 0]
+        if self.cost is not None:
+            self.cost += [cost, -cost]
+        self.adjacency[u].append(e)
+        self.adjacency[v].append(e + 1)
+        return e
+
+    def snapshot(self):
+        """
+            Saves the residual capacities, which hold the whole flow of a sparse graph, in O(m).
+
+            Returns:
+                list: An opaque state to give back to restore.
+        """
+        return self.residual[:]
+
+    def restore(self, state):
+        """
+            Puts the graph back in a state saved by snapshot. The state can be restored several times.
+        """
+        self.residual = state[:]
+
+    def reset(self):
+        """
+            Puts the graph back in its initial state, without any flow.
+        """
+        self.residual = self.capacity[:]
+
+    def arc_count(self):
+        """Returns the number of forward arcs of the graph."""
+        return len(self.head) // 2
+
+    def tail(self, e):
+        """Returns the vertex the arc e leaves from."""
+        return self.head[e ^ 1]
+
+    def residual_arcs(self):
+        """
+            Lists the residual graph as (u, v, residual capacity) triplets, one per arc.
+        """
+        return [(self.head[e ^ 1], self.head[e], self.residual[e]) for e in range(len(self.head))]
+
+    def flow_value(self, source=0):
+        """
+            Computes the net flow leaving the source.
+
+            Returns:
+                int: The value of the current flow.
+        """
+        return sum(self.capacity[e] - self.residual[e] for e in self.adjacency[source])
+
+    # Creates a graph from a txt file
+    @classmethod
+    def read_graph(cls, filename):
+        """
+            Reads a graph from a file in the same format as Graphic.read_graph, without ever
+            storing an n×n matrix: each row is turned into arcs as soon as it is read.
+
+            Args:
+                filename (str): Path to the file from which the graph is to be read.
+
+            Returns:
+                cls: An instance of the graph initialized with capacities and optional costs.
+        """
+        with open(filename, 'r') as file:
+            # Reading the number of vertices
+            n = int(file.readline().strip())
+
+            # Instantiating SparseGraphic
+            graph = cls(n)
+
+            # Reading the capacity matrix, one row at a time
+            for u in range(n):
+                row = file.readline().split()
+                for v, value in enumerate(row):
+                    if value != '0':
+                        graph.add_edge(u, v, int(value))
+
+            # Reading the costs matrix if it exists, assigning each cost to its arc
+            for u in range(n):
+                row = file.readline().split()
+                if not row:
+                    graph.cost = None  # There is no cost matrix
+                    break
+                for e in graph.adjacency[u]:
+                    if e % 2 == 0:
+                        graph.cost[e] = int(row[graph.head[e]])
+                        graph.cost[e + 1] = -graph.cost[e]
+        return graph
+
+    @classmethod
+    def read_dimacs(cls, filename):
+        """
+            Reads a graph in the DIMACS max flow ("p max") or min cost flow ("p min") format, in a
+            single pass over the file and O(n + m) memory. Vertices are renumbered so that the source
+            is 0 and the sink n - 1, the other ones keeping their order.
+
+            A max flow file names its source and sink with "n id s" and "n id t". In a min cost flow
+            file, the source and the sink are the vertices with a positive and a negative supply; if
+            there are several, a super source and a super sink are added around them. The total
+            supply is stored in target_flow. Lower bounds other than 0 are not supported.
+
+            Args:
+                filename (str): Path to the DIMACS file.
+
+            Returns:
+                cls: An instance of the graph, with costs for a min cost flow file only.
+        """
+        graph = problem = None
+        supplies = {}
+        with open(filename, 'r') as file:
+            for line in file:
+                fields = line.split()
+                if not fields or fields[0] == 'c':
+                    continue
+                if fields[0] == 'p':
+                    problem, n = fields[1], int(fields[2])
+                    if problem not in ("max", "min"):
+                        raise ValueError(f"Unsupported DIMACS problem {problem}.")
+                elif fields[0] == 'n':
+                    if problem == "max":
+                        supplies[int(fields[1])] = fields[2]  # "s" or "t"
+                    else:
+                        supplies[int(fields[1])] = int(fields[2])
+                elif fields[0] == 'a':
+                    if graph is None:
+                        # All the vertex lines come before the arcs, so the numbering is known now
+                        graph, renumber = cls._dimacs_graph(problem, n, supplies)
+                    u, v = renumber[int(fields[1])], renumber[int(fields[2])]
+                    if problem == "max":
+                        graph.add_edge(u, v, int(fields[3]))
+                    elif int(fields[3]) != 0:
+                        raise ValueError("Lower bounds are not supported.")
+                    else:
+                        graph.add_edge(u, v, int(fields[4]), int(fields[5]))
+                else:
+                    raise ValueError(f"Unexpected DIMACS line: {line.strip()}")
+        if graph is None:
+            graph, _ = cls._dimacs_graph(problem, n, supplies)
+        return graph
+
+    @classmethod
+    def _dimacs_graph(cls, problem, n, supplies):
+        """
+            Creates the graph of a DIMACS file once its vertex lines are read, and the list giving
+            the vertex of the graph of each DIMACS vertex (numbered from 1).
+        """
+        if problem is None:
+            raise ValueError("The DIMACS file has no problem line.")
+        if problem == "max":
+            terminals = {kind: vertex for vertex, kind in supplies.items()}
+            if set(terminals) != {"s", "t"}:
+                raise ValueError("A DIMACS max flow file needs one source and one sink.")
+            sources, sinks = [terminals["s"]], [terminals["t"]]
+        else:
+            sources = [vertex for vertex, supply in supplies.items() if supply > 0]
+            sinks = [vertex for vertex, supply in supplies.items() if supply < 0]
+            if sum(supplies.values()) != 0 or not sources:
+                raise ValueError("The supplies of a DIMACS min cost flow file must be balanced.")
+
+        if len(sources) == 1 and len(sinks) == 1:
+            source, sink = sources[0], sinks[0]
+            order = [source] + [v for v in range(1, n + 1) if v != source and v != sink] + [sink]
+            renumber = [0] * (n + 1)
+            for new, old in enumerate(order):
+                renumber[old] = new
+            graph = cls(n)
+        else:
+            # Super source 0 and super sink n + 1 around the DIMACS vertices 1 to n
+            renumber = list(range(n + 1))
+            graph = cls(n + 2)
+            for vertex in sources:
+                graph.add_edge(0, vertex, supplies[vertex])
+            for vertex in sinks:
+                graph.add_edge(vertex, n + 1, -supplies[vertex])
+
+        if problem == "max":
+            graph.cost = None  # There is no cost in a max flow file
+        else:
+            graph.target_flow = sum(supply for supply in supplies.values() if supply > 0)
+        return graph, renumber
+
+    @classmethod
+    def read_edge_list(cls, filename):
+        """
+            Reads a graph written as an edge list: "n m" on the first line, then one line
+            "u v capacity" or "u v capacity cost" per arc, the vertices being numbered from 0 with
+            the source 0 and the sink n - 1. The file is read in a single pass.
+
+            Args:
+                filename (str): Path to the edge list file.
+
+            Returns:
+                cls: An instance of the graph, with costs if the arcs have them.
+        """
+        with open(filename, 'r') as file:
+            n = int(file.readline().split()[0])
+            graph = cls(n)
+            has_costs = None
+            for line in file:
+                fields = line.split()
+                if not fields:
+                    continue
+                if has_costs is None:
+                    has_costs = len(fields) == 4
+                    if not has_costs:
+                        graph.cost = None
+                graph.add_edge(int(fields[0]), int(fields[1]), int(fields[2]), int(fields[3]) if has_costs else 0)
+        if has_costs is None:
+            graph.cost = None  # No arc to tell
+        return graph
+
+    def write_dimacs(self, filename, target_flow=None):
+        """
+            Writes the graph in the DIMACS format: as a max flow problem, or as a min cost flow
+            problem sending target_flow from the source to the sink if it is given.
+        """
+        forward_arcs = range(0, len(self.head), 2)
+        with open(filename, 'w') as file:
+            if target_flow is None:
+                file.write(f"p max {self.n} {len(forward_arcs)}\nn 1 s\nn {self.n} t\n")
+                file.writelines(f"a {self.head[e + 1] + 1} {self.head[e] + 1} {self.capacity[e]}\n" for e in forward_arcs)
+            else:
+                if not self.has_costs():
+                    raise ValueError("A min cost flow problem needs costs.")
+                file.write(f"p min {self.n} {len(forward_arcs)}\nn 1 {target_flow}\nn {self.n} {-target_flow}\n")
+                file.writelines(f"a {self.head[e + 1] + 1} {self.head[e] + 1} 0 {self.capacity[e]} {self.cost[e]}\n" for e in forward_arcs)
+        return filename
+
+    def write_edge_list(self, filename):
+        """
+            Writes the graph as an edge list (see read_edge_list), with costs if it has them.
+        """
+        with open(filename, 'w') as file:
+            file.write(f"{self.n} {len(self.head) // 2}\n")
+            for e in range(0, len(self.head), 2):
+                cost = f" {self.cost[e]}" if self.has_costs() else ""
+                file.write(f"{self.head[e + 1]} {self.head[e]} {self.capacity[e]}{cost}\n")
+        return filename
+
+    @classmethod
+    def from_graphic(cls, graph):
+        """
+            Builds the sparse version of a dense Graphic, carrying over its current flow.
+
+            Args:
+                graph (Graphic): The dense graph to convert.
+
+            Returns:
+                cls: The sparse graph, with one arc pair per positive capacity.
+        """
+        n = graph.n
+        sparse = cls(n)
+        capacity, cost, flow = graph.capacity, graph.cost, graph.flow
+        if is_array(capacity):  # Plain integers are much faster to work with than NumPy scalars
+            capacity, flow = capacity.tolist(), flow.tolist()
+            cost = cost.tolist() if graph.has_costs() else None
+        if not graph.has_costs():
+            sparse.cost = None
+        for u in range(n):
+            capacity_row = capacity[u]
+            for v in range(n):
+                if capacity_row[v] > 0:
+                    e = sparse.add_edge(u, v, capacity_row[v], cost[u][v] if cost is not None else 0)
+                    # The dense flow is a net flow: its positive part goes on the arc u → v
+                    if flow[u][v] > 0:
+                        sparse.residual[e] -= flow[u][v]
+                        sparse.residual[e + 1] += flow[u][v]
+        return sparse
+
+    def copy_flow_to(self, graph):
+        """
+            Writes the flow of this sparse graph into the flow and residual matrices of a dense
+            Graphic with the same capacities, so that it can be displayed the usual way.
+
+            Args:
+                graph (Graphic): The dense graph to update.
+        """
+        flow = self.flow_matrix()
+        capacity = self.capacity_matrix()
+        graph.flow[:] = flow  # Assigning in place keeps the storage type of the dense graph
+        graph.residual[:] = [[capacity[u][v] - flow[u][v] for v in range(self.n)] for u in range(self.n)]
+
+    def _to_matrix(self, values):
+        """Sums per-arc values into a dense n×n matrix, for display purposes only."""
+        matrix = [[0] * self.n for _ in range(self.n)]
+        for e in range(len(self.head)):
+            matrix[self.head[e ^ 1]][self.head[e]] += values(e)
+        return matrix
+
+    def capacity_matrix(self):
+        """Returns the dense capacity matrix of the graph."""
+        return self._to_matrix(lambda e: self.capacity[e])
+
+    def cost_matrix(self):
+        """Returns the dense cost matrix of the graph."""
+        return self._to_matrix(lambda e: self.cost[e] if e % 2 == 0 else 0)
+
+    def flow_matrix(self):
+        """Returns the dense (skew-symmetric) flow matrix of the graph."""
+        return self._to_matrix(lambda e: self.capacity[e] - self.residual[e])
+
+    def residual_matrix(self):
+        """Returns the dense residual matrix of the graph."""
+        return self._to_matrix(lambda e: self.residual[e])
+
+    # Display of the flow matrix
+    def display_flow(self, output=sys.stdout):
+        """
+            Displays the flow matrix in a formatted and annotated way.
+        """
+        if output != sys.stdout:
+            print(f"\nFLOW MATRIX:", file=output)
+        else:
+            print(bold(f"\nFLOW MATRIX:"))
+        print_matrix(annotate_matrix(self.flow_matrix()), output_file=output)
+
+    # Display of the capacity and cost matrices
+    def display(self, output=sys.stdout):
+        """
+            Displays the capacity matrix and, if available, the cost matrix in a human-readable format.
+        """
+        if output != sys.stdout:
+            print(f"\nCAPACITY MATRIX:", file=output)
+        else:
+            print(bold(f"\nCAPACITY MATRIX:"))
+        print_matrix(annotate_matrix(self.capacity_matrix()), output_file=output)
+
+        if self.has_costs():
+            if output != sys.stdout:
+                print(f"\nCOST MATRIX:", file=output)
+            else:
+                print(bold(f"\nCOST MATRIX:"))
+            print_matrix(annotate_matrix(self.cost_matrix()), output_file=output)
+
+    # Display of the residual matrix
+    def display_residual(self):
+        """
+            Displays the residual matrix of the graph, which is used in flow algorithms.
+        """
+        print(bold(f"\nRESIDUAL GRAPH:"))
+        print_matrix(annotate_matrix(self.residual_matrix()))
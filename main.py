@@ -1,7 +1,7 @@
 from graph import Graphic
 from algorithms import *
+from cost_curve import CostCurve
 from utils import print_matrix, bold
-import copy
 
 def main():
     print_matrix([['Ingé1 INT-1 • Group 5'], ['Adèle Chamoux'], ['Mattéo Launay'], ['Paul Leflon'], ['Iriantsoa Rasoloarivalona']], header_column=False)
@@ -41,8 +41,9 @@ def main():
         print("\nChoose an algorithm to treat the problem:")
         print("1. Ford-Fulkerson")
         print("2. Push-Relabel")
+        print("3. Dinic")
         if graph.has_costs():
-            print("3. Minimal cost flow (Bellman-Ford)")
+            print("4. Minimal cost flow (Bellman-Ford)")
         
         algo_choice_loop = True
         while algo_choice_loop:
@@ -52,14 +53,14 @@ def main():
                 if algo_choice == 0:
                     print("You choose to go back.")
                     algo_choice_loop = False
-                elif not graph.has_costs() and algo_choice in [1, 2]:
+                elif not graph.has_costs() and algo_choice in [1, 2, 3]:
                     break
-                elif graph.has_costs() and algo_choice in [1, 2, 3]:
+                elif graph.has_costs() and algo_choice in [1, 2, 3, 4]:
                     break
                 else:
                     print("Please enter a valid number.")
             except ValueError:
-                print("Invalid input. Please indicate a algorithm number between 1 and 2. ")
+                print(f"Invalid input. Please indicate a algorithm number between 1 and {4 if graph.has_costs() else 3}. ")
 
         # Executing the chosen algorithm
         if algo_choice == 1:
@@ -71,8 +72,12 @@ def main():
             graph.display_flow()
             print(f"\nMaximal flow with Push-Relabel : {bold(max_flow)}")
         elif algo_choice == 3:
-            copy_graph = copy.deepcopy(graph)
-            max_flow = ford_fulkerson(copy_graph)
+            max_flow = dinic(graph)
+            graph.display_flow()
+            print(f"\nMaximal flow with Dinic : {bold(max_flow)}")
+        elif algo_choice == 4:
+            max_flow = ford_fulkerson(graph)
+            graph.reset()  # The min cost flow starts again from an empty flow
             while True:
                 try:
                     print(f"\nThe maximum flow is of {bold(max_flow)}. \n")
@@ -84,9 +89,20 @@ def main():
                 except ValueError:
                     print("Invalid target number. Please enter a valid target number.")
             
-            total_cost = min_cost_flow(graph, target_flow)
-            graph.display_flow()
-            print(f"\nTotal cost of the flow :", bold(f"{total_cost}"))
+            curve = CostCurve(graph, verbose_mode=True)
+            while True:
+                total_cost = curve.cost(target_flow)
+                graph.display_flow()
+                print(f"\nTotal cost of the flow :", bold(f"{total_cost}"))
+
+                # Pushing more flow goes on from the current flow instead of starting over
+                try:
+                    target_flow = int(input(f"\nEnter a higher target flow, up to {max_flow} (0 to go back): "))
+                except ValueError:
+                    print("Invalid target number.")
+                    break
+                if not curve.flow < target_flow <= max_flow:
+                    break
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,64 @@
+import time
+from collections import Counter
+
+
+class NullMetrics:
+    """
+        Metrics given to the solvers when nothing has to be measured, which is the default. Solvers
+        only count inside `if metrics.enabled:` blocks, and timed() gives back the function itself,
+        so measuring nothing costs nothing.
+
+        Counters filled by the solvers of algorithms.py:
+            - arcs_scanned: arcs looked at by the breadth-first searches.
+            - augmentations: augmenting paths (Ford-Fulkerson, Dinic, capacity scaling, min cost flow).
+            - pushes_saturating / pushes_non_saturating: Push-Relabel pushes, depending on
+              whether they use up the residual capacity of the arc.
+            - relabels: relabels of the cost scaling min cost flow, which also counts its pushes.
+            - active_scans: passes of Push-Relabel over the vertices looking for an excess.
+            - bellman_ford_passes / relaxations: passes over the arcs and distance improvements
+              of Bellman-Ford (relaxations also counts those of SPFA and Dijkstra, arcs_scanned
+              the arcs they look at).
+        Timed phases, with their number of calls: bfs, blocking_path, push, relabel, gap,
+        global_relabel, active_scan, bellman_ford, negative_cycle_check, spfa, dijkstra, refine.
+    """
+    enabled = False
+
+    def count(self, name, amount=1):
+        pass
+
+    def timed(self, phase, function):
+        return function
+
+
+class Metrics(NullMetrics):
+    """
+        Operation counters and per-phase timers, filled by the solvers they are given to. The same
+        object can go through several solves, which add up.
+    """
+    enabled = True
+
+    def __init__(self):
+        self.counters = Counter()
+        self.calls = Counter()
+        self.times = Counter()
+
+    def count(self, name, amount=1):
+        self.counters[name] += amount
+
+    def timed(self, phase, function):
+        """Returns a version of function that adds its execution time and number of calls to phase."""
+        def timed_function(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.times[phase] += time.perf_counter() - start
+                self.calls[phase] += 1
+        return timed_function
+
+    def as_dict(self):
+        """Returns the metrics as plain dictionaries, e.g. to be saved as JSON."""
+        return {"counters": dict(self.counters), "calls": dict(self.calls), "times": dict(self.times)}
+
+
+NULL_METRICS = NullMetrics()
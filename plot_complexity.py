@@ -1,24 +1,80 @@
-import matplotlib.pyplot as plt
+import argparse
+import math
+import statistics
+try:
+    import matplotlib.pyplot as plt
+except ImportError:  # Matplotlib is only needed by the plots, not by the summary
+    plt = None
+from result_store import read_runs
 
-def read_execution_time_data(path_to_file) -> dict:
-    with open(path_to_file, "r") as f:
-        data = eval(f.read())
+def keep_run(run: dict, family=None, backend=None) -> bool:
+    """Whether a run succeeded and belongs to the family and backend asked for (all when None)"""
+    return not run.get("error") and (not family or run.get("family") == family) and (not backend or run.get("backend") == backend)
 
-    thetas_ff = {}
-    thetas_pr = {}
-    thetas_mcf = {}
-    
-    for size in data.keys():
-        thetas_ff[size] = []
-        thetas_pr[size] = []
-        thetas_mcf[size] = []
+def read_execution_time_data(path_to_file, family=None, backend=None) -> dict:
+    """
+        Streams the runs of a result store (see result_store.py) into their times, grouped by
+        algorithm then by size n, leaving out the failed runs. The records are read one at a time,
+        but every time is kept, since exact medians and percentiles need them all: the memory used
+        grows with the number of runs (one float each).
+        Args: the path of the store, and optionally the only family and backend to keep
+        Returns: {algorithm: {n: [times]}}
+    """
+    thetas = {}
+    for run in read_runs(path_to_file):
+        if keep_run(run, family, backend):
+            thetas.setdefault(run["algorithm"], {}).setdefault(run["n"], []).append(run["time"])
+    return thetas
+
+def read_time_ratios(path_to_file, numerator="ff", denominator="pr", family=None, backend=None) -> dict:
+    """
+        Pairs the runs of two algorithms on the same instance (same n, seed, family, backend and
+        generator) and gives the ratios of their times, e.g. θFF/θPR. The runs of a job are stored
+        together, so only the runs still waiting for their pair are kept while streaming.
+        Returns: {n: [ratios]}
+    """
+    waiting = {}
+    ratios = {}
+    for run in read_runs(path_to_file):
+        if run["algorithm"] not in (numerator, denominator) or not keep_run(run, family, backend):
+            continue
+        instance = (run["n"], run.get("seed"), run.get("family"), run.get("backend"), run.get("generator"))
+        other = waiting.pop(instance, None)
+        if other is None or other["algorithm"] == run["algorithm"]:
+            waiting[instance] = run  # A run made again replaces the older one
+            continue
+        times = {other["algorithm"]: other["time"], run["algorithm"]: run["time"]}
+        if times[denominator] > 0:
+            ratios.setdefault(run["n"], []).append(times[numerator] / times[denominator])
+    return ratios
 
-    for size in data.keys():
-        thetas_ff[size] = data[size]["thetas_ff"]
-        thetas_pr[size] = data[size]["thetas_pr"]
-        thetas_mcf[size] = data[size]["thetas_mcf"]
+def aggregate(thetas: dict) -> dict:
+    """
+        Summarizes the times of each size of one algorithm.
+        Returns: {n: (runs, min, median, p95)} sorted by n, p95 being the nearest-rank 95th percentile
+    """
+    summary = {}
+    for n in sorted(thetas):
+        times = sorted(thetas[n])
+        summary[n] = (len(times), times[0], statistics.median(times), times[math.ceil(0.95 * len(times)) - 1])
+    return summary
 
-    return thetas_ff, thetas_pr, thetas_mcf
+def fit_exponent(summary: dict):
+    """
+        Fits median time ≈ c·n^k by least squares on log n and log time (sizes with a zero median are
+        left out).
+        Returns: (k, c), or None with less than two sizes
+    """
+    points = [(math.log(n), math.log(median)) for n, (_, _, median, _) in summary.items() if n > 0 and median > 0]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    variance = sum((x - mean_x) ** 2 for x, _ in points)
+    if variance == 0:
+        return None
+    k = sum((x - mean_x) * (y - mean_y) for x, y in points) / variance
+    return k, math.exp(mean_y - k * mean_x)
     
 
 def plot_point_cloud(results:dict, algorithm_name:str):
@@ -30,9 +86,21 @@ def plot_point_cloud(results:dict, algorithm_name:str):
         case "pr":
             color = "red"
             label = "θPR(n)"
+        case "pr_fifo":
+            color = "orange"
+            label = "θPR-FIFO(n)"
+        case "dinic":
+            color = "purple"
+            label = "θDINIC(n)"
         case "mcf":
             color = "green"
             label = "θMCF(n, cost//2)"
+        case "mcf_cs":
+            color = "olive"
+            label = "θMCF-CS(n, cost//2)"
+        case "ff_over_pr":
+            color = "black"
+            label = "θFF(n) / θPR(n)"
         case _:
             color = "black"
             label = "?"
@@ -53,15 +121,55 @@ def plot_point_cloud(results:dict, algorithm_name:str):
 
 
 
+def plot_fits(summaries: dict):
+    """Plots the median time of every algorithm against n on log-log axes, with its fitted c·n^k"""
+    plt.figure(figsize=(10, 6))
+    for algorithm, summary in summaries.items():
+        sizes = list(summary)
+        line, = plt.loglog(sizes, [median for _, _, median, _ in summary.values()], "o", label=algorithm)
+        fit = fit_exponent(summary)
+        if fit:
+            k, c = fit
+            plt.loglog(sizes, [c * n ** k for n in sizes], "--", color=line.get_color(), label=f"{algorithm}: n^{k:.2f}")
+    plt.xlabel('n -> # vertices in the problem')
+    plt.ylabel('Median time (seconds)')
+    plt.title('Empirical complexity: median execution times in function of n')
+    plt.legend(title="Algorithm", loc='upper left', fontsize=10)
+    plt.grid(True, which="both")
+    plt.show()
+
+
 if __name__ == "__main__":
-    thetas_ff, thetas_pr, thetas_mcf = read_execution_time_data("execution_trace_up_to_1000.txt")
-    
-    for thetas, algoname in [[thetas_ff, "ff"], [thetas_pr, "pr"], [thetas_mcf, "mcf"]]:
-        print(f"\nPlot for {algoname}. Close the window to proceed.\n")
-        plot_point_cloud(thetas, algoname)
+    parser = argparse.ArgumentParser(description="Summarizes and plots the runs stored by complexity.py.")
+    parser.add_argument("store", nargs="?", default="benchmark_runs.jsonl", help="result store written by complexity.py")
+    parser.add_argument("--family", default=None, help="only keep the runs of this network family")
+    parser.add_argument("--backend", default=None, help="only keep the runs of this backend")
+    parser.add_argument("--no-plot", action="store_true", help="only print the summary")
+    args = parser.parse_args()
 
+    thetas = read_execution_time_data(args.store, args.family, args.backend)
+    summaries = {algorithm: aggregate(thetas[algorithm]) for algorithm in sorted(thetas)}
+    for algorithm, summary in summaries.items():
+        fit = fit_exponent(summary)
+        print(f"\n{algorithm}" + (f": time ≈ {fit[1]:.3g}·n^{fit[0]:.2f}" if fit else ""))
+        print(f"{'n':>8} {'runs':>6} {'min':>10} {'median':>10} {'p95':>10}")
+        for n, (runs, low, median, p95) in summary.items():
+            print(f"{n:>8} {runs:>6} {low:>10.4g} {median:>10.4g} {p95:>10.4g}")
 
-    thetas_ff_over_pr = {size: [ff / pr for ff, pr in zip(thetas_ff[size], thetas_pr[size])] for size in thetas_ff.keys()}
+    thetas_ff_over_pr = read_time_ratios(args.store, "ff", "pr", args.family, args.backend)
+    if thetas_ff_over_pr:
+        print("\nff / pr on the same instances")
+        print(f"{'n':>8} {'runs':>6} {'median':>10}")
+        for n, ratios in sorted(thetas_ff_over_pr.items()):
+            print(f"{n:>8} {len(ratios):>6} {statistics.median(ratios):>10.4g}")
 
-    print(f"\n Plot for FF/PR.\n")
-    plot_point_cloud(thetas_ff_over_pr, "shhhhhhhh")
+    if not args.no_plot:
+        if plt is None:
+            parser.error("plotting requires matplotlib (use --no-plot for the summary only)")
+        for algorithm in summaries:
+            print(f"\nPlot for {algorithm}. Close the window to proceed.\n")
+            plot_point_cloud(thetas[algorithm], algorithm)
+        if thetas_ff_over_pr:
+            print(f"\n Plot for FF/PR.\n")
+            plot_point_cloud(dict(sorted(thetas_ff_over_pr.items())), "ff_over_pr")
+        plot_fits(summaries)
@@ -0,0 +1,205 @@
+from collections import deque
+from graph import SparseGraphic
+from utils import is_array
+
+# Every arc of the reduced graph stands for a composite of arcs of the original graph, as a tuple
+# starting with its kind and capacity:
+#   ("arc", capacity, arc): an arc of the original graph, (u, v) for a Graphic or an arc id for
+#       a SparseGraphic;
+#   ("series", capacity, first, second): a path through a contracted vertex, every unit of flow
+#       going through both;
+#   ("parallel", capacity, first, second): two arcs with the same ends and cost, the flow filling
+#       the first one before the second.
+
+
+class Reduction:
+    """
+        Shrinks a flow instance before it is solved, keeping its max flow and min costs:
+            - vertices that the source can't reach, or that can't reach the sink, are removed with
+              their arcs (one forward and one reverse BFS);
+            - parallel arcs with the same cost are merged, adding up their capacities;
+            - a vertex other than the source and the sink with a single arc in and a single arc out
+              is contracted into one arc, with the smallest of their capacities and the sum of
+              their costs (a way there and straight back is dropped).
+        The last two are repeated until nothing changes. Any solver can then run on the reduced
+        SparseGraphic, and map_flow writes its flow back onto the arcs of the original graph.
+    """
+
+    def __init__(self, graph):
+        """
+            Args:
+                graph: The Graphic or SparseGraphic to reduce, which is not modified.
+        """
+        self.graph = graph
+        n = graph.n
+        source, sink = 0, n - 1
+        self.has_costs = graph.has_costs()
+
+        tail, head, cost, composite = [], [], [], []
+        if isinstance(graph, SparseGraphic):
+            arcs = ((graph.head[e + 1], graph.head[e], graph.capacity[e], graph.cost[e] if self.has_costs else 0, e)
+                    for e in range(0, len(graph.head), 2))
+        else:
+            capacity = graph.capacity.tolist() if is_array(graph.capacity) else graph.capacity
+            costs = (graph.cost.tolist() if is_array(graph.cost) else graph.cost) if self.has_costs else None
+            arcs = ((u, v, capacity[u][v], costs[u][v] if costs else 0, (u, v))
+                    for u in range(n) for v in range(n) if capacity[u][v] > 0)
+        for u, v, c, w, arc in arcs:
+            if u != v and c > 0:
+                tail.append(u)
+                head.append(v)
+                cost.append(w)
+                composite.append(("arc", c, arc))
+        self.original_arcs = len(tail)
+
+        arcs_out = [set() for _ in range(n)]
+        arcs_in = [set() for _ in range(n)]
+        for a in range(len(tail)):
+            arcs_out[tail[a]].add(a)
+            arcs_in[head[a]].add(a)
+
+        def remove_arc(a):
+            arcs_out[tail[a]].discard(a)
+            arcs_in[head[a]].discard(a)
+
+        def add_arc(u, v, w, parts):
+            tail.append(u)
+            head.append(v)
+            cost.append(w)
+            composite.append(parts)
+            arcs_out[u].add(len(tail) - 1)
+            arcs_in[v].add(len(tail) - 1)
+
+        # Keeping the vertices on some path from the source to the sink
+        def reached(start, arcs_from, end_of):
+            seen = [False] * n
+            seen[start] = True
+            queue = deque([start])
+            while queue:
+                u = queue.popleft()
+                for a in arcs_from[u]:
+                    if not seen[end_of[a]]:
+                        seen[end_of[a]] = True
+                        queue.append(end_of[a])
+            return seen
+        forward = reached(source, arcs_out, head)
+        backward = reached(sink, arcs_in, tail)
+        alive = [forward[v] and backward[v] for v in range(n)]
+        alive[source] = alive[sink] = True
+        for a in range(len(tail)):
+            if not (alive[tail[a]] and alive[head[a]]):
+                remove_arc(a)
+        self.removed_vertices = n - sum(alive)
+        self.merged_arcs = 0
+        self.contracted_vertices = 0
+
+        changed = True
+        while changed:
+            changed = False
+            for u in range(n):
+                if not alive[u]:
+                    continue
+
+                # Merging the parallel arcs leaving u with the same cost
+                by_end = {}
+                for a in list(arcs_out[u]):
+                    key = (head[a], cost[a])
+                    if key in by_end:
+                        b = by_end.pop(key)
+                        remove_arc(a)
+                        remove_arc(b)
+                        add_arc(u, head[a], cost[a], ("parallel", composite[a][1] + composite[b][1], composite[b], composite[a]))
+                        by_end[key] = len(tail) - 1
+                        self.merged_arcs += 1
+                        changed = True
+                    else:
+                        by_end[key] = a
+
+                if u in (source, sink):
+                    continue
+                if not arcs_in[u] or not arcs_out[u]:
+                    # A way back left nothing but a dead end
+                    for a in list(arcs_in[u]) + list(arcs_out[u]):
+                        remove_arc(a)
+                    alive[u] = False
+                    self.removed_vertices += 1
+                    changed = True
+                elif len(arcs_in[u]) == 1 and len(arcs_out[u]) == 1:
+                    a, = arcs_in[u]
+                    b, = arcs_out[u]
+                    remove_arc(a)
+                    remove_arc(b)
+                    if tail[a] != head[b]:
+                        add_arc(tail[a], head[b], cost[a] + cost[b],
+                                ("series", min(composite[a][1], composite[b][1]), composite[a], composite[b]))
+                    alive[u] = False
+                    self.contracted_vertices += 1
+                    changed = True
+
+        # Building the reduced graph on the vertices left, the source and the sink staying first and last
+        kept = [v for v in range(n) if alive[v]]
+        label = {v: index for index, v in enumerate(kept)}
+        self.reduced = SparseGraphic(len(kept))
+        if not self.has_costs:
+            self.reduced.cost = None
+        self.composites = []  # composites[i]: what the arc 2i of the reduced graph stands for
+        for u in kept:
+            for a in sorted(arcs_out[u]):
+                self.reduced.add_edge(label[u], label[head[a]], composite[a][1], cost[a])
+                self.composites.append(composite[a])
+
+    def summary(self):
+        """Returns a one line description of what the reduction removed."""
+        return (f"{self.graph.n} → {self.reduced.n} vertices, {self.original_arcs} → {self.reduced.arc_count()} arcs "
+                f"({self.removed_vertices} dead, {self.contracted_vertices} contracted, {self.merged_arcs} merged)")
+
+    def map_flow(self):
+        """
+            Writes the flow of the reduced graph onto the original graph: every arc of a series gets
+            the flow of their reduced arc, and parallel arcs are filled one after the other. The flow
+            and residual matrices of a Graphic, or the residual capacities of a SparseGraphic, are
+            updated as if the solver had run on the original graph.
+        """
+        graph = self.graph
+        reduced = self.reduced
+        sparse = isinstance(graph, SparseGraphic)
+        for index, parts in enumerate(self.composites):
+            stack = [(parts, reduced.capacity[2 * index] - reduced.residual[2 * index])]
+            while stack:
+                parts, amount = stack.pop()
+                if amount == 0:
+                    continue
+                if parts[0] == "series":
+                    stack += [(parts[2], amount), (parts[3], amount)]
+                elif parts[0] == "parallel":
+                    first = min(amount, parts[2][1])
+                    stack += [(parts[2], first), (parts[3], amount - first)]
+                elif sparse:
+                    e = parts[2]
+                    graph.residual[e] -= amount
+                    graph.residual[e ^ 1] += amount
+                else:
+                    u, v = parts[2]
+                    graph.flow[u][v] += amount
+                    graph.flow[v][u] -= amount
+                    graph.residual[u][v] -= amount
+                    graph.residual[v][u] += amount
+
+
+def solve_reduced(solver, graph, *args, **kwargs):
+    """
+        Runs a solver on the reduced version of a graph without flow (see Reduction), then writes the
+        flow it finds onto the graph.
+
+        Args:
+            solver: Any solver of algorithms.py, e.g. dinic or min_cost_flow.
+            graph: A Graphic or a SparseGraphic.
+            args, kwargs: The other arguments of the solver, e.g. the target flow.
+
+        Returns:
+            The result of the solver, e.g. the max flow or the total cost, which the reduction keeps.
+    """
+    reduction = Reduction(graph)
+    result = solver(reduction.reduced, *args, **kwargs)
+    reduction.map_flow()
+    return result
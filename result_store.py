@@ -0,0 +1,37 @@
+import json
+
+# Benchmark results are appended to a JSON lines file, one run of one algorithm on one instance per line,
+# so that runs are never rewritten and the file can be read back one line at a time, however many it holds.
+RUN_FIELDS = ["algorithm", "n", "m", "vertices", "seed", "run", "family", "backend", "generator", "time",
+              "time_median", "peak_memory", "result", "counters", "error"]
+
+
+def append_runs(path, runs):
+    """
+        Appends runs to a result store, creating it if needed.
+
+        Args:
+            path (str): The JSON lines file of the store.
+            runs (list[dict]): Records with the RUN_FIELDS keys. "counters" may be None, and so are the
+                measures of a failed run, whose "error" holds the message.
+    """
+    with open(path, "a", encoding="utf8") as f:
+        for run in runs:
+            f.write(json.dumps({field: run.get(field) for field in RUN_FIELDS}, separators=(",", ":")) + "\n")
+
+def read_runs(path):
+    """
+        Reads the runs of a result store one at a time. A line cut by a crash and the lines that are
+        not runs (e.g. the whole job records of older benchmark streams) are skipped.
+
+        Yields:
+            dict: The runs, in the order they were appended.
+    """
+    with open(path, "r", encoding="utf8") as f:
+        for line in f:
+            try:
+                run = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(run, dict) and "algorithm" in run:
+                yield run
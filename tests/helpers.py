@@ -0,0 +1,53 @@
+import itertools
+import os
+import random
+from graph import Graphic, SparseGraphic
+from utils import np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROPOSITIONS = [os.path.join(ROOT, "Propositions", f"Proposition {i}.txt") for i in range(1, 11)]
+BACKENDS = ["list", "numpy", "sparse"] if np is not None else ["list", "sparse"]
+
+
+def random_graph(n, density, seed, max_capacity=20, max_cost=20):
+    """Random Graphic with costs, where no arc leaves the sink."""
+    rng = random.Random(seed)
+    graph = Graphic(n)
+    for u in range(n - 1):
+        for v in range(n):
+            if u != v and rng.random() < density:
+                graph.capacity[u][v] = rng.randint(1, max_capacity)
+                graph.cost[u][v] = rng.randint(1, max_cost)
+    graph.reset()
+    return graph
+
+def with_backend(graph, backend):
+    """Copy of a Graphic without flow, in the given backend."""
+    if backend == "sparse":
+        sparse = SparseGraphic.from_graphic(graph)
+        sparse.reset()
+        return sparse
+    copy = Graphic(graph.n, backend)
+    if backend == "numpy":
+        copy.capacity = np.array(graph.capacity, dtype=np.int64)
+        copy.cost = np.array(graph.cost, dtype=np.int64) if graph.has_costs() else None
+    else:
+        copy.capacity = [row[:] for row in graph.capacity]
+        copy.cost = [row[:] for row in graph.cost] if graph.has_costs() else None
+    copy.reset()
+    return copy
+
+def brute_force_min_cost(graph, target_flow):
+    """Cheapest way to send target_flow, by trying every integer flow of every arc (tiny graphs only)."""
+    n = graph.n
+    arcs = [(u, v) for u in range(n) for v in range(n) if graph.capacity[u][v] > 0]
+    best = None
+    for flows in itertools.product(*(range(graph.capacity[u][v] + 1) for u, v in arcs)):
+        balance = [0] * n
+        for (u, v), f in zip(arcs, flows):
+            balance[u] -= f
+            balance[v] += f
+        if balance[0] == -target_flow and all(b == 0 for b in balance[1:-1]):
+            cost = sum(graph.cost[u][v] * f for (u, v), f in zip(arcs, flows))
+            best = cost if best is None else min(best, cost)
+    return best
@@ -0,0 +1,50 @@
+import io
+import json
+import multiprocessing
+import os
+import pytest
+import batch
+from graph import Graphic
+from algorithms import dinic
+from tracing import NULL_TRACER
+from helpers import PROPOSITIONS
+
+
+def read_records(output):
+    return [json.loads(line) for line in output.getvalue().splitlines()]
+
+def test_every_instance_and_algorithm_gets_a_record():
+    filenames = PROPOSITIONS[:3]
+    output = io.StringIO()
+    failures = batch.solve_batch(filenames, ["ff", "dinic", "mcf"], output, workers=2)
+    records = read_records(output)
+    assert len(records) == 9
+    has_costs = {filename: Graphic.read_graph(filename).has_costs() for filename in filenames}
+    assert failures == sum(not costs for costs in has_costs.values())
+    for record in records:
+        if record["algorithm"] == "mcf" and not has_costs[record["instance"]]:
+            assert "no cost matrix" in record["error"]
+        else:
+            assert record["error"] is None
+        if record["algorithm"] != "mcf":
+            assert record["flow"] == dinic(Graphic.read_graph(record["instance"]), tracer=NULL_TRACER)
+
+def test_csv_output_has_a_header():
+    output = io.StringIO()
+    batch.solve_batch(PROPOSITIONS[:1], ["dinic"], output, "csv", workers=1)
+    header, row = output.getvalue().splitlines()
+    assert header.split(",") == batch.FIELDS and row.startswith(PROPOSITIONS[0])
+
+def exit_worker(filename, algorithm, **options):
+    os._exit(1)
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != "fork", reason="the patched job must reach forked workers")
+def test_dead_worker_gives_error_records(monkeypatch):
+    monkeypatch.setattr(batch, "solve_job", exit_worker)
+    output = io.StringIO()
+    failures = batch.solve_batch(PROPOSITIONS[:2], ["ff", "pr"], output, workers=1)
+    records = read_records(output)
+    assert failures == len(records) == 4
+    assert {(record["instance"], record["algorithm"]) for record in records} == \
+        {(filename, algorithm) for filename in PROPOSITIONS[:2] for algorithm in ("ff", "pr")}
+    assert all("BrokenProcessPool" in record["error"] for record in records)
@@ -0,0 +1,76 @@
+from complexity import generate_execution_time_data, read_completed_runs, run_benchmark_job, job_runs
+from generators import GENERATOR_VERSION
+from plot_complexity import aggregate, fit_exponent, read_execution_time_data, read_time_ratios
+from result_store import append_runs, read_runs
+
+
+def test_benchmark_job_is_stored_per_algorithm(tmp_path):
+    store = str(tmp_path / "runs.jsonl")
+    record = run_benchmark_job(8, 0, 1, repeats=1, warmup=1)
+    append_runs(store, job_runs(record))
+    runs = list(read_runs(store))
+    assert {run["algorithm"] for run in runs} == {"ff", "pr", "pr_fifo", "dinic", "mcf", "mcf_cs"}
+    assert all(run["m"] == record["arcs"] and run["peak_memory"] > 0 and run["error"] is None for run in runs)
+    assert read_completed_runs(store)[(8, 0)]["seed"] == 1
+
+def test_failed_jobs_are_stored_and_the_others_go_on(tmp_path):
+    store = str(tmp_path / "runs.jsonl")
+    results = generate_execution_time_data([6], 2, 1, 0, store, 1, 0, family="unknown")
+    assert results[6]["thetas_ff"] == []
+    runs = list(read_runs(store))
+    assert len(runs) == 12 and all(run["error"] for run in runs)
+    assert read_completed_runs(store) == {}  # They are tried again on resume
+    assert read_execution_time_data(store) == {}
+
+def test_cut_lines_are_skipped(tmp_path):
+    store = tmp_path / "runs.jsonl"
+    store.write_text('{"algorithm":"ff","n":4,"time":1.0}\n{"algorithm":"ff","n":4,"ti')
+    assert read_execution_time_data(str(store)) == {"ff": {4: [1.0]}}
+
+def test_aggregate_and_fit():
+    summary = aggregate({n: [2e-6 * n ** 2.5 * factor for factor in (1, 1.1, 0.9, 3)] for n in (10, 100, 1000)})
+    runs, low, median, p95 = summary[100]
+    assert runs == 4 and low < median < p95
+    k, c = fit_exponent(summary)
+    assert abs(k - 2.5) < 1e-9 and abs(c - 2.1e-6) < 1e-12
+    assert fit_exponent({10: (1, 1.0, 1.0, 1.0)}) is None
+
+def test_disagreeing_solvers_give_an_error_record(monkeypatch):
+    import complexity
+    measure_dinic = complexity.MAX_FLOW_MEASURES["dinic"]
+    def wrong_dinic(graph, metrics=None):
+        max_flow, theta = measure_dinic(graph, metrics)
+        return max_flow + 1, theta
+    monkeypatch.setitem(complexity.MAX_FLOW_MEASURES, "dinic", wrong_dinic)
+    record = run_benchmark_job(8, 0, 1, repeats=1, warmup=1)
+    assert "solver returned" in record["error"]
+    assert record["results"]["dinic"] == record["results"]["ff"] + 1
+    assert not any(key.startswith("theta_") for key in record)
+    runs = job_runs(record)
+    assert all(run["error"] == record["error"] for run in runs)
+    assert {run["algorithm"]: run["result"] for run in runs}["dinic"] == record["results"]["dinic"]
+
+def test_selected_algorithms_and_resume(tmp_path):
+    store = str(tmp_path / "runs.jsonl")
+    results = generate_execution_time_data([8], 2, 1, 0, store, 1, 0, family="sparse", algorithms=["dinic", "mcf"])
+    assert set(results[8]) == {"thetas_dinic", "thetas_mcf"} and len(results[8]["thetas_mcf"]) == 2
+    assert {run["algorithm"] for run in read_runs(store)} == {"dinic", "mcf"}
+    generate_execution_time_data([8], 2, 1, 0, store, 1, 0, family="sparse", algorithms=["dinic"])
+    assert len(list(read_runs(store))) == 4  # Nothing left to do
+
+def test_runs_of_an_older_generator_are_not_resumed(tmp_path):
+    store = tmp_path / "runs.jsonl"
+    generate_execution_time_data([8], 1, 1, 0, str(store), 1, 0, algorithms=["ff"])
+    store.write_text(store.read_text().replace(f'"generator":{GENERATOR_VERSION}', f'"generator":{GENERATOR_VERSION - 1}'))
+    generate_execution_time_data([8], 1, 1, 0, str(store), 1, 0, algorithms=["ff"])
+    assert [run["generator"] for run in read_runs(str(store))] == [GENERATOR_VERSION - 1, GENERATOR_VERSION]
+
+def test_ff_over_pr_pairs_the_runs_of_each_instance(tmp_path):
+    store = str(tmp_path / "runs.jsonl")
+    run = {"n": 8, "family": "dense", "backend": "list", "generator": GENERATOR_VERSION}
+    append_runs(store, [dict(run, algorithm="ff", seed=1, time=6.0), dict(run, algorithm="pr", seed=1, time=2.0),
+                        dict(run, algorithm="pr", seed=2, time=4.0), dict(run, algorithm="dinic", seed=2, time=1.0),
+                        dict(run, algorithm="ff", seed=2, time=2.0), dict(run, algorithm="ff", seed=3, time=1.0),
+                        dict(run, algorithm="pr", seed=4, error="ValueError: wrong flow")])
+    assert read_time_ratios(store) == {8: [3.0, 0.5]}
+    assert read_time_ratios(store, family="grid") == {}
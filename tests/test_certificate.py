@@ -0,0 +1,47 @@
+import pytest
+from algorithms import dinic, min_cost_flow
+from certificate import check_flow, check_max_flow, check_min_cost_flow
+from tracing import NULL_TRACER
+from helpers import random_graph
+
+
+def test_wrong_value_is_rejected():
+    graph = random_graph(8, 0.5, 3)
+    value = dinic(graph, tracer=NULL_TRACER)
+    with pytest.raises(ValueError):
+        check_max_flow(graph, value + 1)
+
+def test_flow_that_is_not_maximum_is_rejected():
+    graph = random_graph(8, 0.5, 3)
+    with pytest.raises(ValueError, match="not maximum"):
+        check_max_flow(graph)
+
+def test_broken_skew_symmetry_is_rejected():
+    graph = random_graph(8, 0.5, 3)
+    dinic(graph, tracer=NULL_TRACER)
+    graph.flow[0][1] += 1
+    with pytest.raises(ValueError):
+        check_flow(graph)
+
+def test_cut_capacity_equals_the_flow():
+    graph = random_graph(10, 0.4, 4)
+    value = dinic(graph, tracer=NULL_TRACER)
+    side, arcs, capacity = check_max_flow(graph, value)
+    assert capacity == value and 0 in side and graph.n - 1 not in side
+    assert all(graph.flow[u][v] == c for u, v, c in arcs)
+
+def test_flow_that_is_not_of_minimum_cost_is_rejected():
+    rejected = 0
+    for seed in range(20):
+        graph = random_graph(8, 0.5, seed)
+        target = dinic(graph, tracer=NULL_TRACER) // 2
+        graph.reset()
+        check_min_cost_flow(graph, target, min_cost_flow(graph, target, tracer=NULL_TRACER))
+        used = [(u, v) for u in range(graph.n) for v in range(graph.n) if graph.flow[u][v] > 0]
+        if used:
+            graph.cost[used[0][0]][used[0][1]] = 10 ** 6  # The flow now uses a very expensive arc
+            try:
+                check_min_cost_flow(graph, target)
+            except ValueError:
+                rejected += 1
+    assert rejected > 10
@@ -0,0 +1,44 @@
+import pytest
+from algorithms import dinic, min_cost_flow
+from cost_curve import CostCurve
+from tracing import NULL_TRACER
+from helpers import BACKENDS, random_graph, with_backend
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_curve_matches_one_solve_per_flow(backend):
+    for seed in range(10):
+        reference = random_graph(3 + seed % 6, 0.5, seed, max_capacity=6)
+        max_flow = dinic(reference, tracer=NULL_TRACER)
+        curve = CostCurve(with_backend(reference, backend), tracer=NULL_TRACER)
+        for flow in range(max_flow + 1):
+            reference.reset()
+            assert curve.cost(flow) == min_cost_flow(reference, flow, tracer=NULL_TRACER), (seed, flow)
+        assert curve.cost(max_flow + 1) is None and curve.complete
+        assert curve.slopes == sorted(curve.slopes)  # Convex
+
+def test_extensions_give_the_same_curve():
+    reference = random_graph(9, 0.5, 2)
+    whole = CostCurve(with_backend(reference, "list"), tracer=NULL_TRACER)
+    max_flow = whole.extend()
+    steps = CostCurve(with_backend(reference, "list"), tracer=NULL_TRACER)
+    for target in range(1, max_flow + 1, 3):
+        assert steps.extend(target) == target
+    assert steps.extend() == max_flow
+    assert steps.breakpoints() == whole.breakpoints()
+
+def test_graph_holds_the_last_flow_reached():
+    graph = random_graph(8, 0.5, 3)
+    curve = CostCurve(graph, tracer=NULL_TRACER)
+    curve.extend(4)
+    assert graph.flow_value() == curve.flow == 4
+    assert sum(graph.cost[u][v] * graph.flow[u][v] for u in range(8) for v in range(8) if graph.flow[u][v] > 0) \
+        == curve.total_cost
+
+def test_invalid_curves_are_rejected():
+    graph = random_graph(5, 0.5, 1)
+    with pytest.raises(ValueError):
+        CostCurve(graph, tracer=NULL_TRACER).cost(-1)
+    graph.cost = None
+    with pytest.raises(ValueError, match="costs"):
+        CostCurve(graph, tracer=NULL_TRACER)
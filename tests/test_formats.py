@@ -0,0 +1,79 @@
+import pytest
+from graph import Graphic, SparseGraphic
+from algorithms import min_cost_flow
+from tracing import NULL_TRACER
+from helpers import BACKENDS, random_graph
+
+
+def test_dimacs_max_flow_round_trip(tmp_path):
+    graph = random_graph(9, 0.4, 5)
+    filename = graph.write_dimacs(str(tmp_path / "graph.max"))
+    assert Graphic.read_dimacs(filename).capacity == graph.capacity
+    sparse = SparseGraphic.read_dimacs(filename)
+    assert sparse.capacity_matrix() == graph.capacity
+    assert sparse.target_flow is None
+
+def test_dimacs_min_cost_flow_round_trip(tmp_path):
+    graph = random_graph(9, 0.4, 6)
+    filename = graph.write_dimacs(str(tmp_path / "graph.min"), target_flow=7)
+    read = Graphic.read_dimacs(filename)
+    assert read.capacity == graph.capacity
+    assert read.cost == [[c if graph.capacity[u][v] else 0 for v, c in enumerate(row)] for u, row in enumerate(graph.cost)]
+    assert SparseGraphic.read_dimacs(filename).target_flow == 7
+
+def test_edge_list_round_trip(tmp_path):
+    graph = random_graph(9, 0.4, 7)
+    sparse = SparseGraphic.from_graphic(graph)
+    filename = sparse.write_edge_list(str(tmp_path / "graph.edges"))
+    read = SparseGraphic.read_edge_list(filename)
+    assert (read.head, read.capacity, read.cost) == (sparse.head, sparse.capacity, sparse.cost)
+    assert Graphic.read_edge_list(filename).capacity == graph.capacity
+
+def test_edge_list_without_costs(tmp_path):
+    sparse = SparseGraphic(3)
+    sparse.cost = None
+    sparse.add_edge(0, 1, 4)
+    sparse.add_edge(1, 2, 3)
+    read = SparseGraphic.read_edge_list(sparse.write_edge_list(str(tmp_path / "graph.edges")))
+    assert not read.has_costs()
+    assert read.capacity_matrix() == sparse.capacity_matrix()
+
+def test_parallel_arcs_with_equal_costs_are_merged(tmp_path):
+    filename = tmp_path / "parallel.min"
+    filename.write_text("p min 2 2\nn 1 4\nn 2 -4\na 1 2 0 2 3\na 1 2 0 2 3\n")
+    graph = Graphic.read_dimacs(str(filename))
+    assert (graph.capacity[0][1], graph.cost[0][1]) == (4, 3)
+    assert min_cost_flow(graph, 4, tracer=NULL_TRACER) == 12
+
+def test_parallel_arcs_with_different_costs(tmp_path):
+    filename = tmp_path / "parallel.min"
+    filename.write_text("p min 2 2\nn 1 4\nn 2 -4\na 1 2 0 2 1\na 1 2 0 2 9\n")
+    # Summing the costs into one arc would make it 40
+    assert min_cost_flow(SparseGraphic.read_dimacs(str(filename)), 4, tracer=NULL_TRACER) == 20
+    with pytest.raises(ValueError, match="different costs"):
+        Graphic.read_dimacs(str(filename))
+
+def write_proposition(path, graph, costs=True):
+    rows = graph.capacity + (graph.cost if costs else [])
+    path.write_text(f"{graph.n}\n" + "".join(" ".join(map(str, row)) + "\n" for row in rows))
+    return str(path)
+
+@pytest.mark.parametrize("backend", [backend for backend in BACKENDS if backend != "sparse"])
+@pytest.mark.parametrize("costs", [True, False])
+def test_proposition_read_with_and_without_cache(tmp_path, backend, costs):
+    graph = random_graph(7, 0.5, 8, max_cost=300)  # Costs that need more than one byte in the cache
+    filename = write_proposition(tmp_path / "graph.txt", graph, costs)
+    for cache in (False, True, True):  # Parsing, writing the cache, then reading it
+        read = Graphic.read_graph(filename, backend=backend, cache=cache)
+        as_lists = lambda matrix: matrix.tolist() if backend == "numpy" else matrix
+        assert as_lists(read.capacity) == graph.capacity
+        assert as_lists(read.residual) == graph.capacity
+        assert (as_lists(read.cost) if read.has_costs() else None) == (graph.cost if costs else None)
+    assert (tmp_path / "graph.txt.cache").exists()
+
+@pytest.mark.parametrize("backend", [backend for backend in BACKENDS if backend != "sparse"])
+def test_proposition_with_missing_values(tmp_path, backend):
+    filename = tmp_path / "graph.txt"
+    filename.write_text("3\n0 1 2\n0 0 1\n0 0\n")
+    with pytest.raises(ValueError):
+        Graphic.read_graph(str(filename), backend=backend)
@@ -0,0 +1,39 @@
+import io
+import os
+import shutil
+from graph import Graphic
+from algorithms import push_relabel, min_cost_flow, dinic
+from tracing import NULL_TRACER
+from generate_traces import ALGORITHMS, generate_traces, trace_name
+from helpers import PROPOSITIONS
+
+
+def test_every_trace_starts_from_a_fresh_graph(tmp_path):
+    input_dir, output_dir = tmp_path / "propositions", tmp_path / "traces"
+    input_dir.mkdir()
+    propositions = [PROPOSITIONS[0], PROPOSITIONS[6]]
+    for filename in propositions:
+        shutil.copy(filename, input_dir)
+    generate_traces(str(input_dir), str(output_dir), workers=2)
+    assert sorted(os.listdir(output_dir)) == sorted(trace_name(filename, algo) for filename in propositions
+                                                    for algo in ALGORITHMS)
+
+    for filename in propositions:
+        read = lambda algo: (output_dir / trace_name(filename, algo)).read_text(encoding="utf8")
+        # Push-Relabel must not start from the flow Ford-Fulkerson found
+        graph = Graphic.read_graph(filename)
+        expected = io.StringIO()
+        graph.display(expected)
+        expected.write(f"value of max flow = {push_relabel(graph, output=expected)}")
+        assert read("PR") == expected.getvalue()
+
+        graph = Graphic.read_graph(filename)
+        expected = io.StringIO()
+        graph.display(expected)
+        if graph.has_costs():
+            target = dinic(graph, tracer=NULL_TRACER)
+            graph.reset()
+            min_cost_flow(graph, target, output=expected)
+        else:
+            expected.write("MIN does not apply here")
+        assert read("MIN") == expected.getvalue()
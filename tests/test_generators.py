@@ -0,0 +1,46 @@
+import pytest
+from graph import Graphic, SparseGraphic
+from algorithms import dinic
+from tracing import NULL_TRACER
+from generators import FAMILIES, generate, to_graphic, to_matrices, to_sparse_graphic, write_edge_list, write_matrix
+
+
+@pytest.mark.parametrize("family", FAMILIES)
+def test_instances_fit_the_matrix_format(family):
+    for requested in (2, 3, 10, 37):
+        n, arcs = generate(family, requested, seed=requested)
+        pairs = [(u, v) for u, v, _, _ in arcs]
+        assert len(set(pairs)) == len(pairs), "parallel arcs"
+        assert all(0 <= u < n - 1 and 0 <= v < n and u != v for u, v in pairs)
+        assert all(capacity > 0 and cost >= 0 for _, _, capacity, cost in arcs)
+
+@pytest.mark.parametrize("family", FAMILIES)
+def test_same_seed_gives_the_same_instance(family):
+    assert generate(family, 30, seed=4) == generate(family, 30, seed=4)
+    assert generate(family, 30, seed=4) != generate(family, 30, seed=5)
+
+def test_dense_draws_are_pinned():
+    # If this changes, the dense instances of stored benchmark runs changed too: bump GENERATOR_VERSION
+    n, arcs = generate("dense", 10, seed=0)
+    assert (n, len(arcs), arcs[:2]) == (10, 50, [(5, 4, 91, 9), (5, 9, 25, 73)])
+
+@pytest.mark.parametrize("family", FAMILIES)
+def test_dense_and_sparse_graphs_are_the_same_network(family):
+    n, arcs = generate(family, 20, seed=1)
+    assert dinic(to_graphic(n, arcs), tracer=NULL_TRACER) == dinic(to_sparse_graphic(n, arcs), tracer=NULL_TRACER)
+
+def test_written_instances_read_back(tmp_path):
+    n, arcs = generate("sparse", 15, seed=2)
+    capacity, cost = to_matrices(n, arcs)
+    graph = Graphic.read_graph(write_matrix(str(tmp_path / "instance.txt"), n, arcs))
+    assert (graph.capacity, graph.cost) == (capacity, cost)
+    graph = Graphic.read_graph(write_matrix(str(tmp_path / "capacities.txt"), n, arcs, with_costs=False))
+    assert graph.capacity == capacity and not graph.has_costs()
+    sparse = SparseGraphic.read_edge_list(write_edge_list(str(tmp_path / "instance.edges"), n, arcs))
+    assert sparse.capacity_matrix() == capacity
+
+def test_invalid_requests_are_rejected():
+    with pytest.raises(ValueError, match="Unknown family"):
+        generate("complete", 10)
+    with pytest.raises(ValueError):
+        generate("dense", 1)
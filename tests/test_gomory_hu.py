@@ -0,0 +1,47 @@
+import itertools
+import pytest
+from graph import SparseGraphic
+from gomory_hu import GomoryHuTree, undirected_edges
+from helpers import random_graph
+
+
+def brute_force_min_cut(n, edges, u, v):
+    """Lightest cut between u and v, by trying every side of u (tiny graphs only)."""
+    best = None
+    others = [x for x in range(n) if x not in (u, v)]
+    for size in range(len(others) + 1):
+        for chosen in itertools.combinations(others, size):
+            side = {u, *chosen}
+            value = sum(c for a, b, c in edges if (a in side) != (b in side))
+            best = value if best is None else min(best, value)
+    return best
+
+def test_tree_gives_every_min_cut():
+    for seed in range(8):
+        graph = random_graph(4 + seed % 4, 0.3, seed)
+        n, edges = graph.n, undirected_edges(graph)
+        tree = GomoryHuTree(graph, workers=1)
+        matrix = tree.all_pairs()
+        for u, v in itertools.combinations(range(n), 2):
+            expected = brute_force_min_cut(n, edges, u, v)
+            assert tree.min_cut(u, v) == tree.min_cut(v, u) == matrix[u][v] == matrix[v][u] == expected, (seed, u, v)
+
+def test_workers_build_the_sequential_tree():
+    graph = random_graph(14, 0.3, 3)
+    sequential = GomoryHuTree(graph, workers=1)
+    assert sequential.flows == graph.n - 1
+    parallel = GomoryHuTree(graph, workers=2, batch_size=5)
+    assert parallel.edges() == sequential.edges()
+    assert parallel.flows >= graph.n - 1  # Plus the speculative flows whose parent changed
+    assert GomoryHuTree(SparseGraphic.from_graphic(graph), workers=1).edges() == sequential.edges()
+
+def test_antiparallel_arcs_add_up():
+    graph = random_graph(3, 0, 0)
+    graph.add_edge(0, 1, 4)
+    graph.add_edge(1, 0, 3)
+    graph.add_edge(1, 2, 2)
+    assert sorted(undirected_edges(graph)) == [(0, 1, 7), (1, 2, 2)]
+    tree = GomoryHuTree(graph, workers=1)
+    assert (tree.min_cut(0, 1), tree.min_cut(0, 2)) == (7, 2)
+    with pytest.raises(ValueError):
+        tree.min_cut(1, 1)
@@ -0,0 +1,48 @@
+import pytest
+from graph import SparseGraphic
+from algorithms import ford_fulkerson, dinic
+from certificate import check_max_flow
+from tracing import NULL_TRACER
+from helpers import BACKENDS, random_graph, with_backend
+
+
+def flow_of(graph):
+    """Flow matrix as nested lists, whatever the backend."""
+    if isinstance(graph, SparseGraphic):
+        return graph.flow_matrix()
+    return [list(map(int, row)) for row in graph.flow]
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_restore_gives_back_the_saved_flow(backend):
+    for seed in range(10):
+        graph = with_backend(random_graph(8, 0.5, seed), backend)
+        value = dinic(graph, tracer=NULL_TRACER)
+        state = graph.snapshot()
+        flow = flow_of(graph)
+        for _ in range(2):  # The same state can be restored more than once
+            graph.reset()
+            assert ford_fulkerson(graph, tracer=NULL_TRACER) == value
+            graph.restore(state)
+            assert flow_of(graph) == flow
+            check_max_flow(graph, value)
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_reset_empties_the_flow(backend):
+    reference = random_graph(8, 0.5, 4)
+    graph = with_backend(reference, backend)
+    state = graph.snapshot()
+    value = dinic(graph, tracer=NULL_TRACER)
+    graph.reset()
+    assert flow_of(graph) == [[0] * 8 for _ in range(8)]
+    assert dinic(graph, tracer=NULL_TRACER) == value
+    graph.restore(state)
+    assert flow_of(graph) == [[0] * 8 for _ in range(8)]
+    assert dinic(graph, tracer=NULL_TRACER) == value
+
+def test_snapshot_does_not_follow_the_graph():
+    graph = random_graph(8, 0.5, 5)
+    state = graph.snapshot()
+    dinic(graph, tracer=NULL_TRACER)
+    graph.restore(state)
+    assert graph.flow_value() == 0
+    assert graph.residual == graph.capacity
@@ -0,0 +1,39 @@
+import pytest
+from graph import Graphic
+from algorithms import ford_fulkerson, push_relabel, push_relabel_fifo, dinic, capacity_scaling
+from certificate import check_max_flow
+from tracing import NULL_TRACER
+from helpers import BACKENDS, PROPOSITIONS, random_graph, with_backend
+
+SOLVERS = [ford_fulkerson, push_relabel, push_relabel_fifo, dinic, capacity_scaling]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("solver", SOLVERS, ids=lambda solver: solver.__name__)
+def test_solvers_agree_on_propositions(solver, backend):
+    for filename in PROPOSITIONS:
+        expected = dinic(Graphic.read_graph(filename), tracer=NULL_TRACER)
+        graph = with_backend(Graphic.read_graph(filename), backend)
+        value = solver(graph, tracer=NULL_TRACER)
+        assert value == expected, filename
+        check_max_flow(graph, value)
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("solver", SOLVERS, ids=lambda solver: solver.__name__)
+def test_solvers_agree_on_random_graphs(solver, backend):
+    for seed in range(40):
+        reference = random_graph(2 + seed % 11, 0.4, seed)
+        expected = dinic(reference, tracer=NULL_TRACER)
+        graph = with_backend(reference, backend)
+        value = solver(graph, tracer=NULL_TRACER)
+        assert value == expected, seed
+        check_max_flow(graph, value)
+
+def test_fifo_push_relabel_counts_the_flow_already_there():
+    graph = random_graph(9, 0.5, 3)
+    dinic(graph, tracer=NULL_TRACER)
+    graph.set_capacity(0, 1, graph.capacity[0][1] + 5)
+    expected = random_graph(9, 0.5, 3)
+    expected.capacity[0][1] += 5
+    expected.reset()
+    assert push_relabel_fifo(graph, tracer=NULL_TRACER) == dinic(expected, tracer=NULL_TRACER)
@@ -0,0 +1,62 @@
+import json
+import pytest
+from algorithms import ford_fulkerson, push_relabel, push_relabel_fifo, dinic, capacity_scaling, min_cost_flow, \
+    min_cost_flow_cost_scaling
+from metrics import Metrics, NULL_METRICS
+from tracing import CountingTracer, NULL_TRACER
+from helpers import BACKENDS, random_graph, with_backend
+
+SOLVERS = {
+    "ford_fulkerson": ford_fulkerson,
+    "push_relabel": push_relabel,
+    "push_relabel_fifo": push_relabel_fifo,
+    "dinic": dinic,
+    "capacity_scaling": capacity_scaling,
+    "min_cost_flow": lambda graph, **kwargs: min_cost_flow(graph, 10, **kwargs),
+    "bellman_ford": lambda graph, **kwargs: min_cost_flow(graph, 10, shortest_path="bellman_ford", **kwargs),
+    "dijkstra": lambda graph, **kwargs: min_cost_flow(graph, 10, shortest_path="dijkstra", **kwargs),
+    "cost_scaling": lambda graph, **kwargs: min_cost_flow_cost_scaling(graph, 10, **kwargs),
+}
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("name", SOLVERS)
+def test_metrics_do_not_change_the_result(name, backend):
+    solve = SOLVERS[name]
+    reference = random_graph(10, 0.5, 2)
+    metrics = Metrics()
+    assert solve(with_backend(reference, backend), tracer=NULL_TRACER, metrics=metrics) == \
+        solve(with_backend(reference, backend), tracer=NULL_TRACER)
+    assert metrics.counters and metrics.calls
+    assert all(time >= 0 for time in metrics.times.values())
+    json.dumps(metrics.as_dict())  # Plain values, to be stored with the benchmark runs
+
+def test_counts_match_the_traced_events():
+    graph = random_graph(10, 0.5, 3)
+    counter, metrics = CountingTracer(), Metrics()
+    push_relabel(graph, tracer=counter, metrics=metrics)
+    pushes = metrics.counters["pushes_saturating"] + metrics.counters["pushes_non_saturating"]
+    assert pushes == counter.pushes == metrics.calls["push"]
+    assert metrics.calls["relabel"] == counter.relabels
+
+    graph.reset()
+    counter = CountingTracer()
+    metrics = Metrics()
+    ford_fulkerson(graph, tracer=counter, metrics=metrics)
+    assert metrics.counters["augmentations"] == counter.iterations == metrics.calls["bfs"] - 1
+
+def test_solves_add_up():
+    metrics = Metrics()
+    dinic(random_graph(10, 0.5, 4), tracer=NULL_TRACER, metrics=metrics)
+    once = dict(metrics.counters)
+    dinic(random_graph(10, 0.5, 4), tracer=NULL_TRACER, metrics=metrics)
+    assert metrics.counters == {name: 2 * count for name, count in once.items()}
+
+def test_timed_phases_count_failed_calls():
+    metrics = Metrics()
+    def fail():
+        raise ValueError
+    with pytest.raises(ValueError):
+        metrics.timed("phase", fail)()
+    assert metrics.calls["phase"] == 1
+    assert NULL_METRICS.timed("phase", fail) is fail
@@ -0,0 +1,83 @@
+import random
+import pytest
+from graph import Graphic
+from algorithms import bellman_ford, dinic, min_cost_flow, min_cost_flow_cost_scaling
+from certificate import check_flow, check_min_cost_flow
+from tracing import NULL_TRACER
+from utils import np
+from helpers import BACKENDS, PROPOSITIONS, brute_force_min_cost, random_graph, with_backend
+
+MODES = {
+    "bellman_ford": lambda graph, flow: min_cost_flow(graph, flow, shortest_path="bellman_ford", tracer=NULL_TRACER),
+    "spfa": lambda graph, flow: min_cost_flow(graph, flow, shortest_path="spfa", tracer=NULL_TRACER),
+    "dijkstra": lambda graph, flow: min_cost_flow(graph, flow, shortest_path="dijkstra", tracer=NULL_TRACER),
+    "scaling": lambda graph, flow: min_cost_flow(graph, flow, scaling=True, tracer=NULL_TRACER),
+    "cost_scaling": lambda graph, flow: min_cost_flow_cost_scaling(graph, flow, tracer=NULL_TRACER),
+}
+
+
+@pytest.mark.parametrize("seed", range(60))
+def test_dense_optimum_matches_brute_force(seed):
+    # Tiny graphs with antiparallel arcs, where undoing flow must give its cost back
+    graph = random_graph(4 + seed % 2, 0.5, seed, max_capacity=2, max_cost=9)
+    max_flow = dinic(graph, tracer=NULL_TRACER)
+    for target in range(max_flow + 1):
+        expected = brute_force_min_cost(graph, target)
+        for mode, solve in MODES.items():
+            copy = with_backend(graph, "list")
+            assert solve(copy, target) == expected, (mode, target)
+            check_min_cost_flow(copy, target, expected)
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("mode", MODES)
+def test_modes_and_backends_agree(mode, backend):
+    for seed in range(25):
+        reference = random_graph(3 + seed % 9, 0.5, seed)
+        max_flow = dinic(reference, tracer=NULL_TRACER)
+        for target in {0, max_flow // 2, max_flow}:
+            reference.reset()
+            expected = MODES["bellman_ford"](reference, target)
+            graph = with_backend(reference, backend)
+            cost = MODES[mode](graph, target)
+            assert cost == expected, (seed, target)
+            check_min_cost_flow(graph, target, cost)
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_propositions_with_costs(backend):
+    for filename in PROPOSITIONS:
+        graph = Graphic.read_graph(filename)
+        if not graph.has_costs():
+            continue
+        target = dinic(graph, tracer=NULL_TRACER) // 2 + 1
+        graph.reset()
+        expected = MODES["bellman_ford"](graph, target)
+        for mode, solve in MODES.items():
+            copy = with_backend(Graphic.read_graph(filename), backend)
+            assert solve(copy, target) == expected, (filename, mode)
+
+def test_target_above_max_flow():
+    graph = random_graph(6, 0.5, 1)
+    max_flow = dinic(graph, tracer=NULL_TRACER)
+    graph.reset()
+    assert min_cost_flow(graph, max_flow + 1, tracer=NULL_TRACER) is None
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("mode", MODES)
+def test_unreachable_target_leaves_a_feasible_flow(mode, backend):
+    for seed in range(10):
+        reference = random_graph(4 + seed % 6, 0.5, seed)
+        max_flow = dinic(reference, tracer=NULL_TRACER)
+        graph = with_backend(reference, backend)
+        assert MODES[mode](graph, max_flow + 1) is None
+        check_flow(graph)  # No excess left at the inner vertices
+
+@pytest.mark.skipif(np is None, reason="requires NumPy")
+def test_vectorized_bellman_ford_breaks_ties_like_the_list_one():
+    for seed in range(100):
+        rng = random.Random(seed)
+        n = rng.randint(2, 20)
+        residual = [[rng.randint(0, 2) if u != v else 0 for v in range(n)] for u in range(n)]
+        cost = [[rng.randint(0, 2) for _ in range(n)] for _ in range(n)]
+        source = rng.randrange(n)
+        expected = bellman_ford(residual, cost, source, n)
+        assert bellman_ford(np.array(residual), np.array(cost), source, n) == expected, seed
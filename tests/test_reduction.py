@@ -0,0 +1,57 @@
+import random
+from graph import Graphic, SparseGraphic
+from algorithms import dinic, push_relabel_fifo, min_cost_flow
+from certificate import check_max_flow, check_min_cost_flow
+from reduction import Reduction, solve_reduced
+from tracing import NULL_TRACER
+from helpers import random_graph
+
+
+def chain_graph(n, seed):
+    """Sparse random graph, with dead ends, pass-through vertices and parallel paths."""
+    rng = random.Random(seed)
+    graph = Graphic(n)
+    for _ in range(int(1.3 * n)):
+        u, v = rng.randrange(n - 1), rng.randrange(1, n)
+        if u != v:
+            graph.capacity[u][v] = rng.randint(1, 20)
+            graph.cost[u][v] = rng.choice([1, 2, 3])
+    graph.reset()
+    return graph
+
+def test_reduction_keeps_the_max_flow():
+    for seed in range(60):
+        graph = chain_graph(4 + seed % 12, seed)
+        expected = dinic(graph, tracer=NULL_TRACER)
+        for solver in (dinic, push_relabel_fifo):
+            graph.reset()
+            value = solve_reduced(solver, graph, tracer=NULL_TRACER)
+            assert value == expected, seed
+            check_max_flow(graph, value)
+
+def test_reduction_keeps_the_min_cost():
+    for seed in range(60):
+        graph = chain_graph(4 + seed % 12, seed)
+        target = dinic(graph, tracer=NULL_TRACER) // 2
+        graph.reset()
+        expected = min_cost_flow(graph, target, tracer=NULL_TRACER)
+        graph.reset()
+        cost = solve_reduced(min_cost_flow, graph, target, tracer=NULL_TRACER)
+        assert cost == expected, seed
+        check_min_cost_flow(graph, target, cost)
+
+def test_sparse_graphs_are_reduced_too():
+    graph = SparseGraphic.from_graphic(random_graph(12, 0.3, 2))
+    value = solve_reduced(dinic, graph, tracer=NULL_TRACER)
+    check_max_flow(graph, value)
+
+def test_chain_is_contracted():
+    graph = Graphic(5)
+    for u in range(4):
+        graph.capacity[u][u + 1] = 10 - u
+        graph.cost[u][u + 1] = 1
+    graph.reset()
+    reduction = Reduction(graph)
+    assert (reduction.reduced.n, reduction.reduced.arc_count()) == (2, 1)
+    assert solve_reduced(min_cost_flow, graph, 7, tracer=NULL_TRACER) == 28
+    assert graph.flow[2][3] == 7
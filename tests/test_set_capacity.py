@@ -0,0 +1,47 @@
+import random
+import pytest
+from algorithms import ford_fulkerson, dinic
+from certificate import check_flow, check_max_flow
+from tracing import NULL_TRACER
+from utils import np
+from helpers import random_graph, with_backend
+
+DENSE_BACKENDS = ["list", "numpy"] if np is not None else ["list"]
+
+
+@pytest.mark.parametrize("backend", DENSE_BACKENDS)
+@pytest.mark.parametrize("solver", [ford_fulkerson, dinic], ids=lambda solver: solver.__name__)
+def test_warm_start_finds_the_max_flow_of_the_edited_graph(solver, backend):
+    for seed in range(20):
+        rng = random.Random(seed)
+        reference = random_graph(9, 0.5, seed)
+        graph = with_backend(reference, backend)
+        value = dinic(graph, tracer=NULL_TRACER)
+        for _ in range(4):
+            u, v = rng.randrange(8), rng.randrange(1, 9)
+            if u == v:
+                continue
+            capacity = rng.choice([0, rng.randint(1, 10), int(graph.capacity[u][v]) + 5])
+            value -= graph.set_capacity(u, v, capacity)
+            reference.capacity[u][v] = capacity
+            assert check_flow(graph) == value, seed  # Still a feasible flow, of the announced value
+            value += solver(graph, tracer=NULL_TRACER)
+            check_max_flow(graph, value)
+            reference.reset()
+            assert value == dinic(reference, tracer=NULL_TRACER), seed
+
+def test_lowered_flow_is_rerouted_when_it_can_be():
+    graph = random_graph(4, 0, 0)
+    for u, v in [(0, 1), (0, 2), (1, 3), (2, 3), (1, 2)]:
+        graph.add_edge(u, v, 5)
+    graph.flow[0][1], graph.flow[1][0], graph.flow[1][3], graph.flow[3][1] = 5, -5, 5, -5
+    graph.residual[0][1], graph.residual[1][0], graph.residual[1][3], graph.residual[3][1] = 0, 5, 0, 5
+    assert graph.set_capacity(1, 3, 2) == 0  # Three units go through 1 → 2 → 3 instead
+    assert check_flow(graph) == 5 and graph.flow[1][2] == 3
+
+def test_invalid_capacities_are_rejected():
+    graph = random_graph(5, 0.5, 1)
+    with pytest.raises(ValueError, match="negative"):
+        graph.set_capacity(0, 1, -1)
+    with pytest.raises(ValueError, match="loop"):
+        graph.set_capacity(2, 2, 3)
@@ -0,0 +1,61 @@
+import io
+import pytest
+from graph import Graphic
+from algorithms import ford_fulkerson, push_relabel, push_relabel_fifo, dinic, min_cost_flow
+from tracing import RecordingTracer, TextTracer, NULL_TRACER
+from utils import np
+from helpers import PROPOSITIONS, random_graph, with_backend
+
+SOLVERS = {
+    "ford_fulkerson": ford_fulkerson,
+    "push_relabel": push_relabel,
+    "push_relabel_fifo": push_relabel_fifo,
+    "dinic": dinic,
+    "min_cost_flow": lambda graph, tracer: min_cost_flow(graph, 5, tracer=tracer),
+    "min_cost_flow_bellman_ford": lambda graph, tracer: min_cost_flow(graph, 5, shortest_path="bellman_ford", tracer=tracer),
+    "min_cost_flow_dijkstra": lambda graph, tracer: min_cost_flow(graph, 5, shortest_path="dijkstra", tracer=tracer),
+}
+
+
+def trace_text(solve, graph):
+    """Trace text of a solve followed by the flow it leaves."""
+    output = io.StringIO()
+    solve(graph, tracer=TextTracer(output))
+    graph.display_flow(output=output)
+    return output.getvalue()
+
+
+@pytest.mark.parametrize("name", SOLVERS)
+def test_replay_matches_text_output(name):
+    solve = SOLVERS[name]
+    for filename in PROPOSITIONS:
+        if name.startswith("min_cost_flow") and not Graphic.read_graph(filename).has_costs():
+            continue
+        direct = io.StringIO()
+        solve(Graphic.read_graph(filename), tracer=TextTracer(direct))
+
+        recording = RecordingTracer()
+        solve(Graphic.read_graph(filename), tracer=recording)
+        saved = io.StringIO()
+        recording.dump(saved)
+        saved.seek(0)
+        replayed = io.StringIO()
+        RecordingTracer.load(saved).replay(TextTracer(replayed))
+        assert replayed.getvalue() == direct.getvalue(), filename
+
+def test_null_tracer_gives_the_same_result():
+    for filename in PROPOSITIONS:
+        traced = ford_fulkerson(Graphic.read_graph(filename), tracer=TextTracer(io.StringIO()))
+        assert ford_fulkerson(Graphic.read_graph(filename), tracer=NULL_TRACER) == traced
+
+@pytest.mark.skipif(np is None, reason="requires NumPy")
+@pytest.mark.parametrize("name", SOLVERS)
+def test_numpy_backend_prints_the_same_trace(name):
+    # Same BFS order and same choice among paths of equal cost as the list backend
+    graphs = [Graphic.read_graph(filename) for filename in PROPOSITIONS]
+    graphs += [random_graph(6 + seed % 8, 0.4, seed, max_capacity=4, max_cost=2) for seed in range(30)]
+    for index, graph in enumerate(graphs):
+        if name.startswith("min_cost_flow") and not graph.has_costs():
+            continue
+        expected = trace_text(SOLVERS[name], with_backend(graph, "list"))
+        assert trace_text(SOLVERS[name], with_backend(graph, "numpy")) == expected, index
@@ -0,0 +1,322 @@
+import json
+import sys
+from utils import print_matrix, annotate_matrix, bold
+
+
+def vertex_label(vertex, n):
+    """Returns the label of a vertex in the traces: s, a, b, ..., t."""
+    if vertex == 0:
+        return 's'
+    elif vertex == n - 1:
+        return 't'
+    else:
+        return chr(vertex + 96)
+
+def display_bfs_trace(parent, source, sink, n, output=sys.stdout):
+    """
+        Displays the BFS tree from the last successful augmenting path search.
+    """
+    if output != sys.stdout:
+        print(f"\nBFS trace:", file=output)
+    else:
+        print(bold(f"\nBFS trace:"), file=output)
+    visited_nodes = []
+    for i in range(n):
+        if parent[i] != -1 and i != source:
+            # Convert indices to labels
+            node = 't' if i == sink else chr(i + 96)
+            pred = 's' if parent[i] == source else ('t' if parent[i] == sink else chr(parent[i] + 96))
+            visited_nodes.append(f"Π({node}) = {pred}")
+    print(" → ".join(visited_nodes), file=output)
+
+def path_from_parent(parent, source, sink):
+    """
+        Rebuilds the list of vertices of the path from source to sink stored in a parent array.
+    """
+    path = []
+    v = sink
+    while v != source:
+        path.append(v)
+        v = parent[v]
+    path.append(source)
+    return path[::-1]  # Reverse to get path from source to sink
+
+def display_path(path, n, path_flow, output=sys.stdout):
+    """
+        Displays an augmenting path, given as a list of vertices, and the corresponding flow.
+    """
+    labels = [vertex_label(i, n) for i in path]
+    if output != sys.stdout:
+        print(f"Improving chain : {'[' + ' → '.join(labels) + ']'} with a flow {path_flow}.", file=output)
+    else:
+        print(f"Improving chain : {bold('[' + ' → '.join(labels) + ']')} with a flow {bold(path_flow)}.", file=output)
+
+def display_augmenting_path(parent, source, sink, n, path_flow, output=sys.stdout):
+    """
+        Displays the path found during BFS and the corresponding flow.
+    """
+    display_path(path_from_parent(parent, source, sink), n, path_flow, output)
+
+def display_residual_graph(residual, output=sys.stdout):
+    """
+        Displays the current residual graph.
+    """
+    if output != sys.stdout:
+        print(f"\nRESIDUAL GRAPH", file=output)
+    else:
+        print(bold(f"\nRESIDUAL GRAPH"), file=output)
+
+    annotated = annotate_matrix(residual)
+    print_matrix(annotated, output_file=output)
+
+
+class NullTracer:
+    """
+        Tracer given to the solvers when nothing has to be traced, e.g. for benchmarks.
+        Every event is ignored, and the arguments that are costly to build (matrices) are
+        passed as callables so that they are never computed.
+
+        Events, in the order the solvers emit them:
+            - start(algorithm, n, get_residual_arcs): a solver starts on a graph with n vertices,
+              whose residual arcs are given as (u, v, residual) triplets.
+            - iteration(number) / phase(number, level): an augmenting path iteration, or a
+              Dinic phase with the level of each vertex (-1 if unreachable), begins.
+            - bfs_tree(parent): the parent array of the last BFS.
+            - augmenting_path(path, path_flow): flow is pushed along a list of vertices.
+            - residual(get_residual): the residual matrix after the last updates.
+            - push(u, v, delta) / relabel(u, old_height, new_height) / gap(height, lifted) /
+              global_relabel(reached): Push-Relabel operations.
+            - augmentation(path_flow, flow, total_cost) / message(text): min-cost flow progress.
+    """
+    enabled = False
+
+    def start(self, algorithm, n, get_residual_arcs):
+        pass
+
+    def iteration(self, number):
+        pass
+
+    def phase(self, number, level):
+        pass
+
+    def bfs_tree(self, parent):
+        pass
+
+    def augmenting_path(self, path, path_flow):
+        pass
+
+    def residual(self, get_residual):
+        pass
+
+    def push(self, u, v, delta):
+        pass
+
+    def relabel(self, u, old_height, new_height):
+        pass
+
+    def gap(self, height, lifted):
+        pass
+
+    def global_relabel(self, reached):
+        pass
+
+    def augmentation(self, path_flow, flow, total_cost):
+        pass
+
+    def message(self, text):
+        pass
+
+
+class TextTracer(NullTracer):
+    """
+        Tracer printing every event to output, in the format of the project traces.
+    """
+    enabled = True
+
+    def __init__(self, output=sys.stdout):
+        self.output = output
+        self.n = 0
+
+    def _title(self, text):
+        if self.output != sys.stdout:
+            print(text, file=self.output)
+        else:
+            print(bold(text), file=self.output)
+
+    def start(self, algorithm, n, get_residual_arcs):
+        self.n = n
+
+    def iteration(self, number):
+        self._title(f"\nITERATION {number}")
+
+    def phase(self, number, level):
+        self._title(f"\nPHASE {number}")
+        print("Levels : " + ", ".join(f"{vertex_label(v, self.n)}={level[v]}" for v in range(self.n) if level[v] >= 0), file=self.output)
+
+    def bfs_tree(self, parent):
+        display_bfs_trace(parent, 0, self.n - 1, self.n, self.output)
+
+    def augmenting_path(self, path, path_flow):
+        display_path(path, self.n, path_flow, self.output)
+
+    def residual(self, get_residual):
+        display_residual_graph(get_residual(), self.output)
+
+    def push(self, u, v, delta):
+        print(f"\nPush from {vertex_label(u, self.n)} to {vertex_label(v, self.n)} (excess diff = {delta}):", file=self.output)
+
+    def relabel(self, u, old_height, new_height):
+        print(f"\nRelabel node {vertex_label(u, self.n)} (height {old_height} → {new_height}):", file=self.output)
+
+    def gap(self, height, lifted):
+        print(f"\nGap at height {height} ({lifted} vertices lifted to {self.n + 1})", file=self.output)
+
+    def global_relabel(self, reached):
+        print(f"\nGlobal relabel ({reached} vertices can reach t)", file=self.output)
+
+    def augmentation(self, path_flow, flow, total_cost):
+        print(f"Added flow: {path_flow}, Total flow : {flow}, Total cost : {total_cost}", file=self.output)
+
+    def message(self, text):
+        print(text, file=self.output)
+
+
+class CountingTracer(NullTracer):
+    """
+        Tracer counting the operations of a solve, e.g. for batch results. It stays disabled so that
+        the solvers do not build the arguments of the events it ignores.
+    """
+
+    def __init__(self):
+        self.iterations = 0  # Augmenting path iterations, Dinic phases or min cost flow augmentations
+        self.pushes = 0
+        self.relabels = 0
+
+    def iteration(self, number):
+        self.iterations += 1
+
+    def phase(self, number, level):
+        self.iterations += 1
+
+    def push(self, u, v, delta):
+        self.pushes += 1
+
+    def relabel(self, u, old_height, new_height):
+        self.relabels += 1
+
+    def augmentation(self, path_flow, flow, total_cost):
+        self.iterations += 1
+
+
+class RecordingTracer(NullTracer):
+    """
+        Tracer recording every event as a compact tuple of plain values in memory. The initial
+        residual graph is stored once, as (u, v, residual) triplets, and later residual matrices
+        are rebuilt from the augmenting paths by replay, so the log grows with the number of
+        events, not with n².
+    """
+    enabled = True
+
+    def __init__(self):
+        self.events = []
+
+    def start(self, algorithm, n, get_residual_arcs):
+        triplets = [(u, v, int(value)) for u, v, value in get_residual_arcs() if value != 0]
+        self.events.append(("start", algorithm, n, triplets))
+
+    def iteration(self, number):
+        self.events.append(("iteration", number))
+
+    def phase(self, number, level):
+        self.events.append(("phase", number, list(level)))
+
+    def bfs_tree(self, parent):
+        self.events.append(("bfs_tree", list(parent)))
+
+    def augmenting_path(self, path, path_flow):
+        self.events.append(("path", list(path), int(path_flow)))
+
+    def residual(self, get_residual):
+        self.events.append(("residual",))
+
+    def push(self, u, v, delta):
+        self.events.append(("push", u, v, int(delta)))
+
+    def relabel(self, u, old_height, new_height):
+        self.events.append(("relabel", u, old_height, new_height))
+
+    def gap(self, height, lifted):
+        self.events.append(("gap", height, lifted))
+
+    def global_relabel(self, reached):
+        self.events.append(("global_relabel", reached))
+
+    def augmentation(self, path_flow, flow, total_cost):
+        self.events.append(("augmentation", int(path_flow), int(flow), int(total_cost)))
+
+    def message(self, text):
+        self.events.append(("message", text))
+
+    def dump(self, file):
+        """Writes the log to an open text file, as JSON."""
+        json.dump(self.events, file, separators=(',', ':'))
+
+    @classmethod
+    def load(cls, file):
+        """Reads a log written by dump."""
+        tracer = cls()
+        tracer.events = [tuple(event) for event in json.load(file)]
+        return tracer
+
+    def replay(self, tracer):
+        """
+            Feeds the recorded events to another tracer, e.g. a TextTracer to get the text traces
+            back. Residual matrices are rebuilt by applying each augmenting path to the initial one.
+        """
+        residual = []
+        for event in self.events:
+            kind, args = event[0], event[1:]
+            if kind == "start":
+                algorithm, n, triplets = args
+                residual = [[0] * n for _ in range(n)]
+                for u, v, value in triplets:
+                    residual[u][v] += value  # A sparse graph may have several arcs between u and v
+                tracer.start(algorithm, n, lambda: triplets)
+            elif kind == "path":
+                path, path_flow = args
+                for u, v in zip(path, path[1:]):
+                    residual[u][v] -= path_flow
+                    residual[v][u] += path_flow
+                tracer.augmenting_path(path, path_flow)
+            elif kind == "residual":
+                tracer.residual(lambda: residual)
+            elif kind == "bfs_tree":
+                tracer.bfs_tree(*args)
+            elif kind == "iteration":
+                tracer.iteration(*args)
+            elif kind == "phase":
+                tracer.phase(*args)
+            elif kind == "push":
+                tracer.push(*args)
+            elif kind == "relabel":
+                tracer.relabel(*args)
+            elif kind == "gap":
+                tracer.gap(*args)
+            elif kind == "global_relabel":
+                tracer.global_relabel(*args)
+            elif kind == "augmentation":
+                tracer.augmentation(*args)
+            elif kind == "message":
+                tracer.message(*args)
+
+
+NULL_TRACER = NullTracer()
+
+def make_tracer(tracer, output=sys.stdout, verbose_mode=True):
+    """
+        Returns the tracer a solver should use: the given one, or otherwise a TextTracer on output
+        if verbose_mode is set and the NullTracer if not.
+    """
+    if tracer is not None:
+        return tracer
+    return TextTracer(output) if verbose_mode else NULL_TRACER
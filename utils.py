@@ -1,7 +1,10 @@
 import os
-import copy
 import sys
 from typing import Any
+try:
+    import numpy as np
+except ImportError:  # NumPy is only needed by the "numpy" backend of Graphic
+    np = None
 DISABLE_ANSI = False
 
 
@@ -16,11 +19,17 @@ def bold(text: str) -> str:
     else:
         return f'\033[1m{text}\033[0m'
 
+def is_array(matrix: Any) -> bool:
+    """Returns True if the matrix is a NumPy array, i.e. belongs to a graph using the numpy backend."""
+    return np is not None and isinstance(matrix, np.ndarray)
+
 def annotate_matrix(to_annotate: list[list[Any]], annotation_charset: list[Any] = None) -> list[list[Any]]:
+    if is_array(to_annotate):
+        to_annotate = to_annotate.tolist()
     if not annotation_charset:
         annotation_charset = ["s"] + [chr(l + 96) for l in range(1, len(to_annotate) - 1)] + ["t"]
 
-    annotated_version = copy.deepcopy(to_annotate)
+    annotated_version = [list(row) for row in to_annotate]  # Rows only hold numbers, a shallow copy of each is enough
 
     # Replace 0s with "*"
     for i in range(len(annotated_version)):